@@ -1,9 +1,9 @@
 from langchain_core.prompts import ChatPromptTemplate
-from utils.llm import get_llm
+from utils.llm import get_node_llm
 from state import State
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("general")
 
 def general(state: State) -> State:
     """
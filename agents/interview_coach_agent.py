@@ -1,9 +1,170 @@
+from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from utils.llm import get_llm
+from langchain_core.runnables import RunnableParallel
+from config import INTERVIEW_BEHAVIORAL_QUESTIONS, INTERVIEW_MAX_SKILLS, INTERVIEW_QUESTIONS_PER_SKILL
+from utils.llm import get_node_llm
+from utils.question_bank import (
+    lookup_questions,
+    normalize_level,
+    normalize_role,
+    resolve_role_title,
+    store_questions,
+)
 from state import State
+from typing import List
+
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("interview_coach")
+
+class SkillQuestions(BaseModel):
+    """Technical interview questions for one skill."""
+    skill: str = Field(description="The skill exactly as listed in the request.")
+    questions: List[str] = Field(description="Interview questions for this skill.")
+
+class InterviewPrep(BaseModel):
+    """Personalized interview preparation plan (the questions come from the bank, see BankQuestions)."""
+    role_context: str = Field(description="1–2 lines on the role and what interviewers look for.")
+    key_focus_areas: List[str] = Field(description="Topics the user should focus on.")
+    preparation_tips: List[str] = Field(description="Concrete preparation tips.")
+    bonus_recommendations: List[str] = Field(description="Optional extra recommendations.")
+
+class BankQuestions(BaseModel):
+    """Generic questions for the shared bank, written from role, level and skill only."""
+    technical_questions: List[SkillQuestions] = Field(description="Questions for each listed skill.")
+    behavioral_questions: List[str] = Field(description="Behavioral questions, only if requested (otherwise empty).")
+
+
+# Shared-bank questions are written without any user context (no resume, JD,
+# query or memory), so nothing personal can end up in questions served to other users
+bank_prompt = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """
+        You write interview questions for a question bank shared by all users of
+        CareerGraph AI. Write {per_skill} technical questions for each listed skill,
+        realistic for the role and level, without answers. Write behavioral
+        questions only if the requested count is above zero. Questions must be
+        generic: no names, companies, projects or other candidate details.
+        Plain text only.
+        """
+    ),
+    (
+        "human",
+        """
+        Role: {role_title} (level: {level})
+        Skills: {missing_skills}
+        Behavioral questions needed: {behavioral_needed}
+        """
+    ),
+])
+
+
+def _bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def _render(prep: InterviewPrep, role_title: str, technical: dict, behavioral: List[str]) -> str:
+    """Render the plan as plain text in the same section order as the free-form answer."""
+    sections = [
+        f"1. Role Context\n{prep.role_context}",
+        f"2. Key Focus Areas\n{_bullets(prep.key_focus_areas)}",
+        "3. Likely Technical Questions\n" + "\n\n".join(
+            f"{skill}:\n{_bullets(questions)}" for skill, questions in technical.items()
+        ),
+        f"4. Behavioral Questions\n{_bullets(behavioral)}",
+        f"5. Preparation Tips\n{_bullets(prep.preparation_tips)}",
+    ]
+    if prep.bonus_recommendations:
+        sections.append(f"6. Bonus Recommendations\n{_bullets(prep.bonus_recommendations)}")
+    return f"Interview Preparation — {role_title}\n\n" + "\n\n".join(sections)
+
+
+def _prepare_from_bank(state: State, role_title: str, level_hint: str, skills: List[str],
+                       combined_context: str) -> str:
+    """
+    Assemble the answer from the shared question bank, generating questions only
+    for uncovered skills (and behavioral questions if none are stored), then store
+    the new questions for other users.
+
+    Bank questions are generated from role, level and skills alone
+    (`bank_prompt`); the user's context only goes into the personalized plan
+    around them, which is never stored.
+    """
+    role_key = normalize_role(role_title)
+    level_key = normalize_level(level_hint, role_title)
+    stored = lookup_questions(role_key, level_key, skills, state.get("user_id") or 0)
+    missing = stored["missing_skills"]
+    behavioral_needed = 0 if stored["behavioral"] else INTERVIEW_BEHAVIORAL_QUESTIONS
+
+    prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            """
+            You are the **Interview Coach Agent** for CareerGraph AI.
+
+            Prepare the user for an interview. The technical and behavioral
+            questions come from a shared question bank and are listed below; write
+            the role context, key focus areas, preparation tips and bonus
+            recommendations around them, tailored to the user's context. Use the
+            memory summary for continuity. Keep tone professional, supportive,
+            and realistic. Plain text only.
+            """
+        ),
+        (
+            "human",
+            """
+            Memory Summary:
+            {memory_summary}
+
+            User Query:
+            {input_text}
+
+            Target Role: {role_title} (level: {level})
+
+            Combined Context:
+            {combined_context}
+
+            Skills the questions cover: {skills}
+            """
+        ),
+    ])
+
+    inputs = {
+        "per_skill": INTERVIEW_QUESTIONS_PER_SKILL,
+        "memory_summary": state.get("memory_summary", ""),
+        "input_text": state.get("input_text", ""),
+        "role_title": role_title,
+        "level": level_key,
+        "combined_context": combined_context,
+        "skills": ", ".join(skills),
+        "missing_skills": ", ".join(missing),
+        "behavioral_needed": behavioral_needed,
+    }
+    plan_chain = prompt | llm.with_structured_output(InterviewPrep)
+    if missing or behavioral_needed:
+        # The personalized plan and the generic bank questions are written in parallel
+        results = RunnableParallel(
+            prep=plan_chain, bank=bank_prompt | llm.with_structured_output(BankQuestions)
+        ).invoke(inputs)
+        prep, bank = results["prep"], results["bank"]
+    else:
+        prep, bank = plan_chain.invoke(inputs), BankQuestions(technical_questions=[], behavioral_questions=[])
+
+    # Keep only questions for skills that were actually missing
+    wanted = {skill.lower(): skill for skill in missing}
+    generated = {}
+    for item in bank.technical_questions:
+        skill = wanted.get(item.skill.strip().lower())
+        if skill and item.questions:
+            generated[skill] = item.questions[:INTERVIEW_QUESTIONS_PER_SKILL]
+    behavioral = stored["behavioral"] or bank.behavioral_questions[:INTERVIEW_BEHAVIORAL_QUESTIONS]
+
+    store_questions(role_key, level_key, generated, [] if stored["behavioral"] else behavioral)
+
+    technical = {skill: stored["technical"].get(skill) or generated.get(skill, []) for skill in skills}
+    technical = {skill: questions for skill, questions in technical.items() if questions}
+    return _render(prep, role_title, technical, behavioral)
 
-# Initialize LLM instance
-llm = get_llm()
 
 def interview_coach(state: State) -> State:
     """
@@ -17,6 +178,11 @@ def interview_coach(state: State) -> State:
 
     Also leverages conversation memory (`memory_summary`) for personalized continuity.
 
+    When a target role can be determined (JD title, a role named in the query, or
+    the latest job title), technical and behavioral questions are taken from the
+    shared question bank keyed by role, level and skill; only uncovered skills
+    are generated, and the new questions are stored for other users.
+
     Output includes:
     1. Role Context
     2. Key Focus Areas
@@ -79,6 +245,24 @@ def interview_coach(state: State) -> State:
     # Combine all context parts
     combined_context = "\n\n".join(context_parts)
 
+    # Prefer the shared question bank when the target role is known
+    has_jd = bool(job_description and job_description.get("is_job_description", False))
+    role_title = resolve_role_title(
+        job_description.get("job_title") if has_jd else None, input_text, experience,
+    )
+    if has_jd:
+        focus_skills = job_description.get("required_skills", [])
+    elif resume_data and resume_data.get("is_resume", False):
+        focus_skills = resume_data.get("skills", [])
+    else:
+        focus_skills = skills
+    focus_skills = list(dict.fromkeys(s for s in focus_skills if s))[:INTERVIEW_MAX_SKILLS]
+
+    if role_title and focus_skills:
+        level_hint = job_description.get("experience_level", "") if has_jd else ""
+        state["response"] = _prepare_from_bank(state, role_title, level_hint, focus_skills, combined_context)
+        return state
+
     # Define the LLM prompt
     prompt = ChatPromptTemplate.from_messages([
         (
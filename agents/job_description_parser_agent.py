@@ -1,11 +1,18 @@
+import hashlib
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from typing import List
-from utils.llm import get_llm
+from utils.deadline import has_time_for
+from utils.llm import get_node_llm
+from utils.job_library import find_near_duplicate, link_job_posting, posting_to_jd, save_job_posting
+from utils.metrics import metrics
 from state import State
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("job_description_parser")
+
+# Messages shorter than this are treated as follow-ups about an already parsed JD
+FOLLOW_UP_MAX_WORDS = 40
 
 class JobDescriptionModel(BaseModel):
     """Structured schema representing extracted details from a job description."""
@@ -18,18 +25,16 @@ class JobDescriptionModel(BaseModel):
     summary: str = Field(default="", description="2-line summary of what the role is about.")
 
 
-def job_description_parser(state: State) -> State:
+def parse_job_description(text: str) -> JobDescriptionModel:
     """
-    Agent Node: Parses structured job description data from the user's input.
+    Parse free text into a JobDescriptionModel with one structured LLM call.
 
-    This agent:
-    - Detects whether the text is a job description.
-    - Extracts relevant structured information.
-    - Stores it under `state['metadata']['job_description']`.
-    - Does NOT produce direct output; it's used for internal data enrichment.
-    """
-    user_query = state.get("input_text", "")
+    Args:
+        text (str): User message or raw job post.
 
+    Returns:
+        JobDescriptionModel: Parsed fields (`is_job_description=False` if the text is not a JD).
+    """
     jd_prompt = ChatPromptTemplate.from_messages([
         (
             "system",
@@ -58,13 +63,69 @@ def job_description_parser(state: State) -> State:
 
     # Structured LLM call
     chain = jd_prompt | llm.with_structured_output(JobDescriptionModel)
-    response = chain.invoke({"user_query": user_query})
+    return chain.invoke({"user_query": text})
+
+
+def job_description_parser(state: State) -> State:
+    """
+    Agent Node: Parses structured job description data from the user's input.
+
+    This agent:
+    - Detects whether the text is a job description.
+    - Extracts relevant structured information.
+    - Stores it under `state['metadata']['job_description']`.
+    - Keeps a JD parsed on an earlier turn (state is checkpointed per conversation):
+      the same text is never parsed twice, short follow-up messages reuse it without
+      an LLM call, and a non-JD message does not erase it.
+    - Adds every newly parsed JD to the shared job library (`JobPosting`) used by
+      the job matcher.
+    - Reuses the stored parse instead of calling the LLM when the text is a near
+      duplicate of a JD already in the library (MinHash/LSH, e.g. the same post
+      re-pasted with tracking links, whitespace or sections moved).
+    - Skips parsing new text when the turn is short on time (deadline); the
+      agent then answers without it (or with the JD stored earlier).
+    - Does NOT produce direct output; it's used for internal data enrichment.
+    """
+    user_query = state.get("input_text", "")
 
     # Initialize metadata container if missing
     if state.get("metadata") is None:
         state["metadata"] = {}
+    metadata = state["metadata"]
+
+    stored_jd = metadata.get("job_description") or {}
+    has_stored_jd = stored_jd.get("is_job_description", False)
+    source = hashlib.sha256(user_query.encode("utf-8")).hexdigest()
+
+    # Same input as the stored parse, or a short follow-up about the stored JD
+    if metadata.get("job_description_source") == source and stored_jd:
+        return state
+    if has_stored_jd and len(user_query.split()) < FOLLOW_UP_MAX_WORDS:
+        return state
+
+    # A long message may be a re-paste of a JD already in the library
+    duplicate = None
+    if len(user_query.split()) >= FOLLOW_UP_MAX_WORDS:
+        duplicate = find_near_duplicate(user_query)
+        metrics.incr("jd_parser.near_duplicate", result="hit" if duplicate else "miss")
+
+    if duplicate is not None:
+        posting, _ = duplicate
+        response = JobDescriptionModel(**posting_to_jd(posting))
+        # The posting may have been added by another user; it is now one of this user's too
+        link_job_posting(posting, state.get("user_id"))
+    elif not has_time_for("jd_parser", state):
+        return state
+    else:
+        response = parse_job_description(user_query)
+
+        # Keep the parse in the job library (deduplicated by text)
+        if response.is_job_description:
+            save_job_posting(response.model_dump(), user_query, state.get("user_id"))
 
-    # Store extracted job description details
-    state["metadata"]["job_description"] = response.model_dump()
+    # Store extracted job description details (a non-JD message keeps the earlier JD)
+    if response.is_job_description or not has_stored_jd:
+        metadata["job_description"] = response.model_dump()
+        metadata["job_description_source"] = source
 
     return state
@@ -0,0 +1,72 @@
+import json
+import re
+from config import JOB_MATCH_TOP_K
+from models import JobPosting
+from utils.job_library import job_index, profile_experience_years, profile_skill_keys, user_posting_ids
+from utils.question_bank import normalize_skill_key
+from utils.skill_graph import get_skill_graph
+from utils.text_index import tokenize
+from state import State
+
+# "which of these / my saved jobs fit me" → only postings the user shared
+OWN_POSTINGS_PATTERN = re.compile(r"\b(these|those|my|i (?:pasted|shared|sent|added|saved))\b.{0,20}\b(jobs?|roles?|postings?|jds?|openings?)\b", re.I)
+
+
+def job_matcher(state: State) -> State:
+    """
+    Agent Node: Ranks stored job descriptions by fit with the user's profile.
+
+    Every JD parsed in chat is kept in the shared job library (`JobPosting`).
+    This agent scores the library locally — no LLM call — from the user's
+    skills (plus certifications and implied prerequisites), job titles and
+    years of experience, using an in-memory inverted index over required skills
+    and title terms.
+
+    If the user refers to "these"/"my" jobs, only the postings they shared are
+    ranked (including ones another user pasted first, see `JobPostingUser`).
+    """
+    input_text = state.get("input_text", "")
+    skills = state.get("skills", []) or []
+    experience = state.get("experience", []) or []
+    certifications = state.get("certifications", []) or []
+
+    skill_keys = profile_skill_keys(skills, certifications)
+    title_terms = set(tokenize(" ".join(e.get("title", "") or "" for e in experience)))
+    role = get_skill_graph().find_role(input_text)
+    if role:
+        title_terms |= set(tokenize(get_skill_graph().role_name(role)))
+    years = profile_experience_years(experience)
+
+    allowed_ids = None
+    if OWN_POSTINGS_PATTERN.search(input_text):
+        allowed_ids = user_posting_ids(state.get("user_id"))
+
+    job_index.refresh()
+    matches = job_index.search(skill_keys, title_terms, years, top_k=JOB_MATCH_TOP_K, allowed_ids=allowed_ids)
+
+    if not matches:
+        scope = "the jobs you shared" if allowed_ids is not None else "the job library"
+        state["response"] = (
+            f"I couldn't find a good match in {scope} yet. Paste a few job descriptions "
+            "(or add skills and experience to your profile) and ask again."
+        )
+        return state
+
+    postings = {p.id: p for p in JobPosting.query.filter(JobPosting.id.in_([m[0] for m in matches]))}
+    lines = [f"💼 Best-fitting jobs for your profile ({len(job_index)} postings searched):\n"]
+    for position, (posting_id, score, coverage, title, fit) in enumerate(matches, start=1):
+        posting = postings[posting_id]
+        required = json.loads(posting.required_skills or "[]")
+        have = [s for s in required if normalize_skill_key(s) in skill_keys]
+        missing = [s for s in required if normalize_skill_key(s) not in skill_keys]
+        lines.append(
+            f"{position}. {posting.job_title or 'Untitled role'}"
+            + (f" at {posting.company}" if posting.company else "")
+            + f" — match {score * 100:.0f}%\n"
+            f"   ✅ You have: {', '.join(have) or 'none of the listed skills'}\n"
+            f"   ⬜ To learn: {', '.join(missing) or 'nothing — you cover every listed skill'}\n"
+            f"   🧭 Level: {posting.experience_level or 'not stated'} (you: {years:g} yrs)"
+        )
+
+    state["response"] = "\n".join(lines)
+    return state
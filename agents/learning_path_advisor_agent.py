@@ -1,37 +1,95 @@
+import json
+import re
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from utils.llm import get_llm
+from utils.llm import get_node_llm
+from utils.learning_path_store import (
+    commit_update,
+    diff_profiles,
+    format_learning_path,
+    get_latest_path,
+    mark_completed,
+    normalize_skill,
+    profile_snapshot,
+    save_new_path,
+)
+from utils.skill_graph import get_skill_graph
 from state import State
 from typing import List
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("learning_path_advisor")
+
+# Phrases that ask for a brand-new roadmap instead of updating the stored one
+NEW_PATH_PATTERN = re.compile(r"\b(new|another|different|fresh|regenerate|redo|start over|from scratch)\b", re.I)
+ROLE_CHANGE_PATTERN = re.compile(r"\b(become|switch to|transition to|move into|pivot to)\b", re.I)
+
+# "finished step 3", "done with 2", "completed step #4"
+STEP_COMPLETION_PATTERN = re.compile(r"\b(?:finished|completed|done with|did)\s+(?:step\s*)?#?(\d+)\b", re.I)
+COMPLETION_VERB_PATTERN = re.compile(r"\b(finished|completed|done with|learned|learnt|mastered)\b", re.I)
+STEP_REFERENCE_PATTERN = re.compile(r"\bstep\s*#?(\d+)\b", re.I)
+
+class RoadmapStep(BaseModel):
+    """One ordered milestone of a learning roadmap."""
+    skill: str = Field(description="The single skill or topic this step teaches.")
+    description: str = Field(description="What to do in this step (milestone, project or portfolio task).")
 
 class LearningPath(BaseModel):
     """Structured schema representing a user's personalized learning roadmap."""
     target_role: str = Field(description="The career goal or target role the user aims to achieve.")
     required_skills: List[str] = Field(description="New or complementary skills the user needs to learn.")
-    roadmap_steps: List[str] = Field(description="Ordered learning steps or milestones.")
+    roadmap_steps: List[RoadmapStep] = Field(description="Ordered learning steps or milestones.")
     recommended_resources: List[str] = Field(description="Suggested learning materials or platforms.")
     summary: str = Field(description="A concise overview of the personalized learning roadmap.")
 
+class StepNote(BaseModel):
+    """Explanation for one step of a pre-ordered roadmap."""
+    skill: str = Field(description="The skill exactly as listed in the plan.")
+    description: str = Field(description="What to do in this step (milestone, project or portfolio task).")
 
-def learning_path_advisor(state: State) -> State:
-    """
-    Agent Node: Generates a step-by-step learning roadmap toward the user's target role.
+class RoadmapAnnotation(BaseModel):
+    """LLM annotations for a roadmap whose skills and order are already fixed."""
+    step_notes: List[StepNote] = Field(description="One entry per planned step, in the given order.")
+    recommended_resources: List[str] = Field(description="Suggested learning materials or platforms.")
+    summary: str = Field(description="A concise overview of the personalized learning roadmap.")
 
-    This agent analyzes the user's background, known skills, and career goals to design
-    a progressive, goal-oriented learning plan. It avoids recommending already-known topics
-    and emphasizes real-world applicability and measurable growth.
-    """
-    # Extract key profile elements from the shared state
-    user_input = state.get("input_text", "")
+class StepRevision(BaseModel):
+    """Replacement content for one existing roadmap step."""
+    position: int = Field(description="Number of the step being revised.")
+    skill: str = Field(description="The single skill or topic this step teaches.")
+    description: str = Field(description="Updated milestone, project or portfolio task for this step.")
+
+class RoadmapRevision(BaseModel):
+    """Revisions for a subset of roadmap steps."""
+    steps: List[StepRevision] = Field(description="One entry per step that was asked to be revised.")
+
+
+def _mentions(text: str, skill: str) -> bool:
+    """Whole-word, case-insensitive check that `skill` appears in `text` (safe for "C", "R", "C++")."""
+    skill = normalize_skill(skill)
+    return bool(skill) and re.search(rf"(?<![\w+#]){re.escape(skill)}(?![\w+#])", normalize_skill(text)) is not None
+
+
+def _step_known(graph, skill: str, known: set, covered_keys: set) -> bool:
+    """True if the profile covers a step's skill: by graph key when the skill is in the graph, else by name."""
+    key = graph.skill_key(skill)
+    return key in covered_keys if key else normalize_skill(skill) in known
+
+
+def _wants_new_path(user_input: str, target_role: str) -> bool:
+    """True if the user asks for a fresh roadmap or names a different goal than the stored one."""
+    if NEW_PATH_PATTERN.search(user_input):
+        return True
+    graph = get_skill_graph()
+    role = graph.find_role(user_input)
+    if role and role != graph.find_role(target_role):
+        return True
+    return bool(ROLE_CHANGE_PATTERN.search(user_input)) and not _mentions(user_input, target_role)
+
+
+def _generate_full_path(state: State, user_input: str, memory_summary: str) -> LearningPath:
+    """Ask the LLM for a complete roadmap (used when no usable stored path exists)."""
     known_skills = ", ".join(state.get("skills", []))
-    certifications = state.get("certifications", [])
-    education = state.get("education", [])
-    experience = state.get("experience", [])
-    projects = state.get("projects", [])
-    memory_summary = state.get("memory_summary", "") 
 
     # Build the structured LLM prompt
     learning_prompt = ChatPromptTemplate.from_messages([
@@ -46,6 +104,7 @@ def learning_path_advisor(state: State) -> State:
             - Recommend only NEW or relevant skills (avoid known ones).
             - Exclude any courses, certifications, or topics the user already completed.
             - Keep steps chronological, measurable, and realistic.
+            - Each roadmap step focuses on ONE skill or topic.
             - Include real-world projects, milestones, and portfolio tasks.
             - Use the conversation memory to maintain context continuity.
             - If no goal is provided, infer a likely target role.
@@ -68,7 +127,7 @@ def learning_path_advisor(state: State) -> State:
             Provide a structured learning roadmap with:
             - target_role
             - required_skills (excluding known ones)
-            - roadmap_steps (in logical order)
+            - roadmap_steps (in logical order, each with skill + description)
             - recommended_resources
             - summary
             """
@@ -79,25 +138,229 @@ def learning_path_advisor(state: State) -> State:
     chain = learning_prompt | llm.with_structured_output(LearningPath)
 
     # Invoke the LLM with user context and memory
-    response = chain.invoke({
+    return chain.invoke({
         "user_input": user_input,
         "known_skills": known_skills,
-        "certifications": certifications,
-        "education": education,
-        "experience": experience,
-        "projects": projects,
+        "certifications": state.get("certifications", []),
+        "education": state.get("education", []),
+        "experience": state.get("experience", []),
+        "projects": state.get("projects", []),
+        "memory_summary": memory_summary,
+    })
+
+
+def _annotate_plan(state: State, plan: dict, user_input: str, memory_summary: str) -> RoadmapAnnotation:
+    """Ask the LLM only to explain a roadmap whose steps were ordered by the skill graph."""
+    annotation_prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            """
+            You are the LearningPath Advisor for CareerGraph AI.
+            The skills of the roadmap and their order are already decided from a
+            prerequisite graph. Do NOT add, remove or reorder steps. For each step,
+            write one short, concrete milestone (project or portfolio task) that fits
+            the user's background, then suggest resources and a brief summary.
+            """
+        ),
+        (
+            "human",
+            """
+            User Query: {user_input}
+
+            Memory Summary: {memory_summary}
+
+            Target Role: {target_role}
+            Known Skills: {known_skills}
+            Experience: {experience}
+
+            Planned Steps (in order):
+            {steps}
+            """
+        ),
+    ])
+
+    chain = annotation_prompt | llm.with_structured_output(RoadmapAnnotation)
+    return chain.invoke({
+        "user_input": user_input,
         "memory_summary": memory_summary,
+        "target_role": plan["target_role"],
+        "known_skills": ", ".join(state.get("skills", [])),
+        "experience": state.get("experience", []),
+        "steps": "\n".join(f"{i}. {skill}" for i, skill in enumerate(plan["steps"], start=1)),
     })
 
-    # Format output into a user-friendly text block
-    formatted_output = (
-        f"🎯 Target Role: {response.target_role}\n\n"
-        f"🧩 Required Skills: {', '.join(response.required_skills)}\n\n"
-        f"🪜 Learning Roadmap:\n" + "\n".join([f"- {step}" for step in response.roadmap_steps]) + "\n\n"
-        f"📘 Recommended Resources:\n" + "\n".join([f"- {r}" for r in response.recommended_resources]) + "\n\n"
-        f"📝 Summary: {response.summary}"
+
+def _plan_from_graph(state: State, user_input: str, memory_summary: str):
+    """
+    Build a roadmap from the local skill graph when the target role can be resolved
+    from the query (or from the conversation memory if the query names no new goal).
+
+    Returns:
+        tuple | None: (target_role, required_skills, steps, resources, summary), or
+        None when no known role matches (the caller falls back to full generation).
+    """
+    graph = get_skill_graph()
+    role = graph.find_role(user_input)
+    if role is None and not (ROLE_CHANGE_PATTERN.search(user_input) or NEW_PATH_PATTERN.search(user_input)):
+        role = graph.find_role(memory_summary)
+    if role is None:
+        return None
+
+    known = list(state.get("skills") or []) + [c.get("name", "") for c in state.get("certifications") or []]
+    plan = graph.plan_for_role(role, known)
+    if not plan["steps"]:
+        summary = f"Your profile already covers the core skills of a {plan['target_role']}."
+        return plan["target_role"], [], [], [], summary
+
+    annotation = _annotate_plan(state, plan, user_input, memory_summary)
+    notes = {normalize_skill(note.skill): note.description for note in annotation.step_notes}
+    steps = [(skill, notes.get(normalize_skill(skill), f"Learn {skill}.")) for skill in plan["steps"]]
+    return plan["target_role"], plan["required_skills"], steps, annotation.recommended_resources, annotation.summary
+
+
+def _revise_steps(record, steps_to_revise, user_input: str, memory_summary: str,
+                  known_skills: List[str], profile_changes: dict) -> List[StepRevision]:
+    """Ask the LLM to rewrite only the given steps, with the rest of the roadmap as context."""
+    roadmap = "\n".join(
+        f"{s.position}. [{'done' if s.completed else 'pending'}] {s.skill} — {s.description}"
+        for s in record.steps
     )
 
+    revision_prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            """
+            You are the LearningPath Advisor for CareerGraph AI.
+            The user already has a roadmap. Revise ONLY the listed steps so they reflect
+            the user's request and recent profile changes. Keep each step focused on one
+            skill, concrete and measurable. Do not add, remove or renumber steps.
+            """
+        ),
+        (
+            "human",
+            """
+            User Query: {user_input}
+
+            Memory Summary: {memory_summary}
+
+            Target Role: {target_role}
+            Known Skills: {known_skills}
+            Recent Profile Changes: {profile_changes}
+
+            Current Roadmap:
+            {roadmap}
+
+            Steps to revise: {positions}
+            """
+        ),
+    ])
+
+    chain = revision_prompt | llm.with_structured_output(RoadmapRevision)
+    response = chain.invoke({
+        "user_input": user_input,
+        "memory_summary": memory_summary,
+        "target_role": record.target_role,
+        "known_skills": ", ".join(known_skills),
+        "profile_changes": profile_changes,
+        "roadmap": roadmap,
+        "positions": ", ".join(str(s.position) for s in steps_to_revise),
+    })
+    return response.steps
+
+
+def learning_path_advisor(state: State) -> State:
+    """
+    Agent Node: Generates a step-by-step learning roadmap toward the user's target role.
+
+    This agent analyzes the user's background, known skills, and career goals to design
+    a progressive, goal-oriented learning plan. It avoids recommending already-known topics
+    and emphasizes real-world applicability and measurable growth.
+
+    Roadmaps are stored per user with per-step completion state. When a stored roadmap
+    exists, a request is handled as an incremental update:
+    - steps the user reports as finished, or whose skill is now on their profile, are
+      marked completed without an LLM call;
+    - only steps the user asks about, or that mention skills added/removed since the
+      last update, are regenerated;
+    - a full regeneration happens only for a new goal or an explicit "new roadmap" request.
+
+    New roadmaps for roles in the local skill graph (data/skill_graph.json) are
+    ordered deterministically from the user's known skills; the LLM only writes
+    the step descriptions, resources and summary.
+    """
+    # Extract key profile elements from the shared state
+    user_id = state.get("user_id")
+    user_input = state.get("input_text", "")
+    memory_summary = state.get("memory_summary", "")
+    snapshot = profile_snapshot(state)
+
+    record = get_latest_path(user_id)
+
+    # No stored roadmap (or the user wants a different one) → generate from scratch
+    if record is None or _wants_new_path(user_input, record.target_role):
+        planned = _plan_from_graph(state, user_input, memory_summary)
+        if planned is None:
+            response = _generate_full_path(state, user_input, memory_summary)
+            planned = (
+                response.target_role,
+                response.required_skills,
+                [(step.skill, step.description) for step in response.roadmap_steps],
+                response.recommended_resources,
+                response.summary,
+            )
+        target_role, required_skills, steps, resources, summary = planned
+        record = save_new_path(
+            user_id=user_id,
+            target_role=target_role,
+            required_skills=required_skills,
+            steps=steps,
+            recommended_resources=resources,
+            summary=summary,
+            snapshot=snapshot,
+        )
+        state["response"] = format_learning_path(record)
+        return state
+
+    updates = []
+    steps_by_position = {step.position: step for step in record.steps}
+    changes = diff_profiles(json.loads(record.profile_snapshot or "{}"), snapshot)
+    known = set(snapshot["skills"]) | set(snapshot["certifications"])
+    # Profile skills resolved through the graph aliases ("bash" → Linux & Command Line)
+    graph = get_skill_graph()
+    covered_keys = graph.satisfied(known)
+
+    # 1. Completion: explicit "finished step N" / "learned <skill>", or skill now on the profile
+    explicit = {int(n) for n in STEP_COMPLETION_PATTERN.findall(user_input)}
+    if COMPLETION_VERB_PATTERN.search(user_input):
+        explicit |= {s.position for s in record.steps if _mentions(user_input, s.skill)}
+    to_complete = [steps_by_position[p] for p in sorted(explicit) if p in steps_by_position]
+    to_complete += [s for s in record.steps if _step_known(graph, s.skill, known, covered_keys)]
+    completed = mark_completed(record, to_complete)
+    for step in completed:
+        updates.append(f"step {step.position} ({step.skill}) marked as completed")
+
+    # 2. Partial regeneration: steps the user refers to, or that mention changed skills
+    changed_skills = changes["added_skills"] + changes["removed_skills"]
+    referenced = {int(n) for n in STEP_REFERENCE_PATTERN.findall(user_input)} - explicit
+    steps_to_revise = [
+        s for s in record.steps
+        if not s.completed and (
+            s.position in referenced
+            or any(_mentions(s.description or "", skill) for skill in changed_skills)
+        )
+    ]
+    if steps_to_revise:
+        revisions = _revise_steps(record, steps_to_revise, user_input, memory_summary, snapshot["skills"], changes)
+        allowed = {s.position for s in steps_to_revise}
+        for revision in revisions:
+            if revision.position in allowed:
+                step = steps_by_position[revision.position]
+                step.skill = revision.skill
+                step.description = revision.description
+                updates.append(f"step {step.position} revised")
+
+    commit_update(record, snapshot, changed=bool(updates))
+
     # Store result back in shared state
-    state["response"] = formatted_output
+    state["response"] = format_learning_path(record, updates)
     return state
@@ -0,0 +1,83 @@
+from typing import List
+from flask import current_app, has_app_context
+from langgraph.types import Send
+from agents.general_agent import general
+from agents.course_recommender_agent import course_recommender
+from agents.project_recommender_agent import project_recommender
+from agents.interview_coach_agent import interview_coach
+from agents.learning_path_advisor_agent import learning_path_advisor
+from agents.resume_builder_agent import resume_builder
+from agents.skill_analyzer_agent import skill_analyzer
+from agents.job_matcher_agent import job_matcher
+from state import State
+
+# Agents that need the resume / job description parsers to run first
+PARSER_AGENTS = ["interview_coach", "resume_builder", "job_matcher"]
+
+INTENT_AGENTS = {
+    "skill_analyzer": skill_analyzer,
+    "course_recommender": course_recommender,
+    "project_recommender": project_recommender,
+    "learning_path_advisor": learning_path_advisor,
+    "resume_builder": resume_builder,
+    "interview_coach": interview_coach,
+    "job_matcher": job_matcher,
+    "general": general,
+}
+
+# Section headings of the merged reply
+INTENT_TITLES = {
+    "skill_analyzer": "🧠 Skill Analysis",
+    "course_recommender": "📚 Course Recommendations",
+    "project_recommender": "🛠️ Project Ideas",
+    "learning_path_advisor": "🗺️ Learning Path",
+    "resume_builder": "📄 Resume",
+    "interview_coach": "🎤 Interview Preparation",
+    "job_matcher": "💼 Job Matches",
+    "general": "💬 Answer",
+}
+
+
+def fan_out(state: State) -> List[Send]:
+    """
+    Conditional edge: one `intent_worker` task per routed agent, run in parallel.
+    Agents that already answered (a speculative hit) are skipped; if none is
+    left, go straight to the merge.
+    """
+    done = state.get("intent_responses") or {}
+    sends = [
+        Send("intent_worker", {**state, "agent_action": agent})
+        for agent in state.get("agent_actions") or [] if agent not in done
+    ]
+    return sends or [Send("merge_responses", state)]
+
+
+def intent_worker(state: State) -> dict:
+    """
+    Agent Node: Runs one routed agent for a multi-part message.
+
+    Receives the full state with `agent_action` set to its agent and writes only
+    that agent's reply to `intent_responses`, so parallel workers don't conflict.
+    Workers run on separate threads, so each gets its own app context and
+    therefore its own DB session (the request's session is not thread-safe).
+    """
+    agent = state["agent_action"]
+    if has_app_context():
+        with current_app._get_current_object().app_context():
+            result = INTENT_AGENTS[agent](dict(state))
+    else:
+        result = INTENT_AGENTS[agent](dict(state))
+    return {"intent_responses": {agent: result.get("response") or ""}}
+
+
+def merge_responses(state: State) -> dict:
+    """
+    Agent Node: Combines the parallel agents' replies into one response,
+    one titled section per agent in the order the user asked.
+    """
+    replies = state.get("intent_responses") or {}
+    sections = [
+        f"{INTENT_TITLES.get(agent, agent)}\n\n{replies[agent]}"
+        for agent in state.get("agent_actions") or [] if replies.get(agent)
+    ]
+    return {"response": "\n\n---\n\n".join(sections)}
@@ -1,9 +1,40 @@
 from langchain_core.prompts import ChatPromptTemplate
-from utils.llm import get_llm
+from utils.deadline import has_time_for
+from utils.llm import get_node_llm
 from state import State
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("resume_builder")
+
+RESUME_STRUCTURE = """
+                ======================
+                [FULL NAME]
+                [PROFESSIONAL SUMMARY]
+                [SKILLS]
+                [EXPERIENCE]
+                [PROJECTS]
+                [EDUCATION]
+                [CERTIFICATIONS]
+                ======================"""
+
+# Default: five drafts, then an HR-style pick of the best one
+MULTI_DRAFT_PROCESS = f"""=== PROCESS ===
+            Phase 1 — ATS Engine:
+              • Generate FIVE unique, ATS-optimized resume drafts (technical, managerial, concise, academic, creative).
+              • Each follows this structure:{RESUME_STRUCTURE}
+
+            Phase 2 — HR Reviewer:
+              • Choose the ONE resume version most likely to pass both ATS and human review.
+              • Output ONLY that chosen resume.
+              • Do NOT include the other drafts or your reasoning.
+              • Keep formatting consistent and professional."""
+
+# Turn short on time (deadline): a single direct draft
+SINGLE_DRAFT_PROCESS = f"""=== PROCESS ===
+              • Write ONE ATS-optimized resume that would pass both ATS and human review.
+              • Follow this structure:{RESUME_STRUCTURE}
+              • Output ONLY the resume, without reasoning.
+              • Keep formatting consistent and professional."""
 
 def resume_builder(state: State) -> State:
     """
@@ -19,6 +50,8 @@ def resume_builder(state: State) -> State:
         • Produces 5 ATS-optimized variations (technical, managerial, concise, etc.)
     Phase 2 — HR Reviewer:
         • Picks the most impactful version and outputs only that resume.
+
+    When the turn is short on time (deadline), a single draft is written directly.
     """
 
     # Extract metadata safely
@@ -111,6 +144,9 @@ def resume_builder(state: State) -> State:
 
     combined_context = "\n".join(context_parts)
 
+    # Five drafts + review when the turn has time for it, otherwise one draft
+    process = MULTI_DRAFT_PROCESS if has_time_for("resume_drafts", state) else SINGLE_DRAFT_PROCESS
+
     # Prompt definition
     prompt = ChatPromptTemplate.from_messages([
         (
@@ -122,25 +158,7 @@ def resume_builder(state: State) -> State:
 
             Use the information and memory context below to generate your output.
 
-            === PROCESS ===
-            Phase 1 — ATS Engine:
-              • Generate FIVE unique, ATS-optimized resume drafts (technical, managerial, concise, academic, creative).
-              • Each follows this structure:
-                ======================
-                [FULL NAME]
-                [PROFESSIONAL SUMMARY]
-                [SKILLS]
-                [EXPERIENCE]
-                [PROJECTS]
-                [EDUCATION]
-                [CERTIFICATIONS]
-                ======================
-
-            Phase 2 — HR Reviewer:
-              • Choose the ONE resume version most likely to pass both ATS and human review.
-              • Output ONLY that chosen resume.
-              • Do NOT include the other drafts or your reasoning.
-              • Keep formatting consistent and professional.
+            {process}
             """
         ),
         (
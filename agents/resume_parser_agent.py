@@ -1,12 +1,16 @@
 from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 from typing import List
-from utils.llm import get_llm
+from utils.llm import get_node_llm
+from utils.deadline import remaining
+from utils.metrics import metrics
 from state import State
 from utils.extract_resume import extract_resume_text
+from utils.resume_preparser import preparse_resume
+from utils.resume_prefetch import resume_prefetcher
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("resume_parser")
 
 class ResumeModel(BaseModel):
     """Structured schema representing parsed resume information."""
@@ -23,30 +27,8 @@ class ResumeModel(BaseModel):
     total_experience_years: float = Field(default=0.0, description="Approximate total years of experience.")
 
 
-def resume_parser(state: State) -> State:
-    """
-    Resume Parser Agent — extracts structured data from resumes.
-
-    This agent uses LLM parsing to convert unstructured resume text into a 
-    structured dictionary that downstream agents (like Interview Coach or 
-    Resume Builder) can consume.
-
-    Behavior:
-    - Reads text from the provided resume file (PDF or DOCX).
-    - Parses fields like name, email, skills, experience, etc.
-    - Stores results inside `state['metadata']['resume_data']`.
-    - Does NOT overwrite main state-level user info.
-    """
-
-    # Get the file path to the user's uploaded resume
-    resume_path = state.get("resume_path", None)
-
-    # Extract text using the unified loader
-    if resume_path is not None:
-        resume_text = extract_resume_text(resume_path)
-    else:
-        resume_text = "None"
-
+def _parse_full_text(resume_text: str) -> ResumeModel:
+    """Parse the whole resume with the LLM (used when the text has no recognizable sections)."""
     # Build the LLM prompt
     resume_prompt = ChatPromptTemplate.from_messages([
         (
@@ -78,10 +60,122 @@ def resume_parser(state: State) -> State:
     chain = resume_prompt | llm.with_structured_output(ResumeModel)
     response = chain.invoke({"resume_text": resume_text})
 
-    # Store parsed data in the metadata section of the state
+    return response
+
+
+def parse_resume_text(resume_text: str) -> ResumeModel:
+    """
+    Parse resume text into a ResumeModel.
+
+    Contact details, headings, list-like sections and date spans are extracted
+    locally (see utils/resume_preparser.py). Only the fields that need judgement
+    (experience/education/project entries, plus name, summary or skills when they
+    can't be read directly, and `is_resume` without contact details and an
+    experience or education section) are sent to the LLM, together with just the
+    sections they come from, using a schema restricted to those fields.
+
+    Args:
+        resume_text (str): Output of `extract_resume_text`.
+
+    Returns:
+        ResumeModel: Parsed resume.
+    """
+    pre = preparse_resume(resume_text)
+    if not pre["structured"]:
+        metrics.incr("resume_parser.mode", mode="full_llm")
+        return _parse_full_text(resume_text)
+
+    fields = dict(pre["fields"])
+    if not pre["pending"]:
+        metrics.incr("resume_parser.mode", mode="local")
+        return ResumeModel(**fields)
+
+    # Schema limited to the pending fields (same types and descriptions as ResumeModel)
+    PartialResume = create_model(
+        "PartialResume",
+        **{name: (ResumeModel.model_fields[name].annotation, ResumeModel.model_fields[name])
+           for name in pre["pending"]},
+    )
+    sections_text = "\n\n".join(f"[{name.upper()}]\n{text}" for name, text in pre["sections"].items())
+
+    partial_prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            """
+            You are the ResumeParser Agent for CareerGraph AI.
+            Contact details, headings and dates were already extracted from this
+            document. From the sections below, extract ONLY these fields: {fields}.
+            - is_resume: true only if this is a person's resume/CV (false for job
+              descriptions, cover letters and other documents).
+            - experience / education / projects: one concise string per entry.
+            - summary: 2–3 lines, written from the sections if none is given.
+            - skills: individual skill names.
+            Return output strictly following the structured schema.
+            """
+        ),
+        ("human", "Resume sections:\n{sections}")
+    ])
+
+    metrics.incr("resume_parser.mode", mode="partial_llm")
+    chain = partial_prompt | llm.with_structured_output(PartialResume)
+    response = chain.invoke({"fields": ", ".join(pre["pending"]), "sections": sections_text})
+
+    fields.update(response.model_dump())
+    if not fields.get("is_resume"):
+        # Not a resume (e.g. a job description with resume-like headings): keep nothing from it
+        metrics.incr("resume_parser.not_resume")
+        return ResumeModel(is_resume=False)
+    return ResumeModel(**fields)
+
+
+def resume_parser(state: State) -> State:
+    """
+    Resume Parser Agent — extracts structured data from resumes.
+
+    This agent combines deterministic pre-parsing with LLM parsing to convert
+    unstructured resume text into a structured dictionary that downstream agents
+    (like Interview Coach or Resume Builder) can consume.
+
+    Behavior:
+    - Uses the background parse started at upload (`resume_prefetcher`) when
+      there is one; otherwise reads the file (PDF or DOCX) and parses it here.
+    - Parses fields like name, email, skills, experience, etc. (see `parse_resume_text`).
+    - Stores results inside `state['metadata']['resume_data']`.
+    - Reuses the stored result when the same file was already parsed in this
+      conversation (state is checkpointed across turns), and skips the LLM
+      entirely when no resume was uploaded.
+    - Does NOT overwrite main state-level user info.
+    """
+
+    # Get the file path to the user's uploaded resume
+    resume_path = state.get("resume_path", None)
+
+    # Initialize metadata container if missing
     if state.get("metadata") is None:
         state["metadata"] = {}
+    metadata = state["metadata"]
+
+    # Same upload as an earlier turn → keep the parsed result
+    if metadata.get("resume_data") is not None and metadata.get("resume_source") == resume_path:
+        return state
+
+    # Nothing uploaded → nothing to parse
+    if resume_path is None:
+        metadata["resume_data"] = ResumeModel(is_resume=False).model_dump()
+        metadata["resume_source"] = None
+        return state
+
+    # Parse started at upload time (waits if it is still running, at most until the turn's deadline)
+    response = resume_prefetcher.take(resume_path, timeout=remaining(state))
+
+    if response is None:
+        # Extract text using the unified loader
+        resume_text = extract_resume_text(resume_path)
+
+        response = parse_resume_text(resume_text)
 
-    state["metadata"]["resume_data"] = response.model_dump()
+    # Store parsed data (and which file it came from) in the metadata section of the state
+    metadata["resume_data"] = response.model_dump()
+    metadata["resume_source"] = resume_path
 
     return state
@@ -1,22 +1,45 @@
+from typing import List
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from utils.llm import get_llm
+from utils.deadline import has_time_for
+from utils.llm import get_node_llm
+from utils.speculation import keyword_agents, speculative_executor
 from state import State
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instance (model tier and output budget from NODE_MODEL_CONFIG)
+llm = get_node_llm("router")
 
 class AgentType(BaseModel):
-    """Schema defining which agent should handle the user's query."""
-    agent_name: str = Field(
-        description="The name of the agent that should handle this query."
+    """Schema defining which agents should handle the user's query."""
+    agent_names: List[str] = Field(
+        description="The agents that should handle this query, one per distinct request, in the order asked."
     )
 
-def router(state: State) -> State:
+AGENT_NAMES = [
+    "skill_analyzer",
+    "project_recommender",
+    "course_recommender",
+    "learning_path_advisor",
+    "resume_builder",
+    "interview_coach",
+    "job_matcher",
+    "general",
+]
+
+# Upper bound on agents run for one message (each is a full agent call)
+MAX_INTENTS = 3
+
+# Number of routed agents remembered per conversation (feeds the speculation predictor)
+RECENT_AGENTS_KEPT = 5
+
+def route(state: State) -> List[str]:
     """
-    Context-aware router for CareerGraph AI.
-    Determines which specialized agent should handle the user's query
+    Ask the LLM which specialized agents should handle the user's query,
     using both the latest input and memory summary for context.
+
+    Returns:
+        List[str]: Known agent names without duplicates, at most MAX_INTENTS
+        ("general" if the model returned none).
     """
 
     router_prompt = ChatPromptTemplate.from_messages([
@@ -27,7 +50,9 @@ def router(state: State) -> State:
 
             Your goal:
             - Analyze the user's current query and overall context (from memory).
-            - Determine which specialized agent should respond next.
+            - Determine which specialized agent(s) should respond next.
+            - A message may contain several distinct requests (e.g. "analyze my skills and
+              suggest some courses") — return one agent per request, in the order asked.
 
             **Available agents:**
             1. "skill_analyzer" → For analyzing or improving the user’s skills.
@@ -36,12 +61,15 @@ def router(state: State) -> State:
             4. "learning_path_advisor" → For structured learning or career roadmaps.
             5. "resume_builder" → For creating or optimizing resumes.
             6. "interview_coach" → For interview guidance and preparation.
-            7. "general" → For general assistance outside the above.
+            7. "job_matcher" → For finding which job postings/descriptions best fit the user.
+            8. "general" → For general assistance outside the above.
 
             **Output format:**
-            Return ONLY one of the agent names listed above as a plain string (no punctuation, no explanations).
-            Example:
-            skill_analyzer
+            Return a list of agent names from the list above (no explanations).
+            Use a single agent unless the user clearly asks for several different things.
+            Examples:
+            ["skill_analyzer"]
+            ["skill_analyzer", "course_recommender", "project_recommender"]
             """
         ),
         (
@@ -63,5 +91,52 @@ def router(state: State) -> State:
         "memory_summary": state.get("memory_summary", "")
     })
 
-    # Return updated state with the chosen agent
-    return {**state, "agent_action": response.agent_name}
+    agent_names = []
+    for name in response.agent_names:
+        name = name.strip().strip('"').lower()
+        if name in AGENT_NAMES and name not in agent_names:
+            agent_names.append(name)
+    return agent_names[:MAX_INTENTS] or ["general"]
+
+
+def local_route(state: State) -> List[str]:
+    """Keyword-only routing (no LLM) for turns short on time."""
+    return keyword_agents(state.get("input_text", ""))[:MAX_INTENTS] or ["general"]
+
+
+def router(state: State) -> State:
+    """
+    Context-aware router for CareerGraph AI.
+    Determines which specialized agents should handle the user's query.
+
+    `agent_actions` holds every routed agent; `agent_action` is the first one.
+    With more than one, the graph fans out to all of them in parallel and
+    merges their replies (see `agents.multi_intent_agent`).
+
+    When the next agent is predictable (recent turns all went to it, or the
+    message clearly names it), that agent is started speculatively alongside
+    the routing call. If the router picks it, its result is reused: as the
+    whole response (`speculative_hit`, the graph ends here) or as that agent's
+    part of a multi-agent reply. Otherwise it is cancelled.
+
+    When the turn is short on time (deadline), keyword routing replaces the LLM call.
+    """
+    speculation = speculative_executor.start(state)
+    agent_names = []
+    try:
+        agent_names = route(state) if has_time_for("router", state) else local_route(state)
+    finally:
+        result = speculative_executor.resolve(speculation, agent_names)
+
+    # Remember recent decisions for the predictor (checkpointed with the conversation)
+    metadata = dict(state.get("metadata") or {})
+    metadata["recent_agents"] = (metadata.get("recent_agents", []) + agent_names)[-RECENT_AGENTS_KEPT:]
+
+    # Return updated state with the chosen agents; `None` clears last turn's partial replies
+    update = {**state, "agent_action": agent_names[0], "agent_actions": agent_names,
+              "metadata": metadata, "intent_responses": None, "speculative_hit": False}
+    if result is not None and len(agent_names) == 1:
+        update.update(response=result.get("response"), speculative_hit=True)
+    elif result is not None:
+        update["intent_responses"] = {speculation.agent: result.get("response")}
+    return update
@@ -1,25 +1,36 @@
+import hashlib
+import json
+import uuid
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, abort, send_file
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 from models import db, User, Education, Certification, Project, Skill, Experience
 from utils.get_profile import get_user_profile_from_db
-from config import SECRET_KEY
+from config import MODEL_OVERRIDES_ENABLED, SECRET_KEY
 from conversation_manager import manager
+from utils.conversation_memory import conversation_memory
+from utils.database import init_database
+from utils.deadline import new_deadline
+from utils.llm import validate_model_overrides
+from utils.metrics import metrics
+from utils.request_coalescer import chat_coalescer, chat_request_key
+from utils.resume_prefetch import resume_prefetcher
+from utils.tracing import traced_request
+from utils.usage import QUOTA_ECONOMY, QUOTA_EXCEEDED, economy_overrides, usage_ledger
+from utils.profiling import PROFILE_MODES, is_admin, profiled_request, request_profiler
 import os
 from werkzeug.utils import secure_filename
 
 app = Flask(__name__)
 app.config.from_object('config')
 
-db.init_app(app)
+# Database from DATABASE_URL (SQLite tuned for concurrent workers; missing tables and indexes created)
+init_database(app)
 bcrypt = Bcrypt(app)
 CORS(app)
 app.secret_key = SECRET_KEY
 
-with app.app_context():
-    db.create_all()
-
 # Ensure temp directory exists
 TEMP_DIR = os.path.join(os.path.dirname(__file__), 'temp')
 os.makedirs(TEMP_DIR, exist_ok=True)
@@ -86,6 +97,7 @@ def profile_page():
     return render_template("profile.html", profile=profile)
 
 @app.route("/profile/add", methods=["GET", "POST"])
+@profiled_request("add_profile")
 def add_profile_page():
     if "user_id" not in session:
         return redirect(url_for("login_page"))
@@ -192,6 +204,8 @@ def add_profile_page():
     return render_template("add_profile.html")
 
 @app.route("/chat", methods=["GET", "POST"])
+@traced_request("chat")
+@profiled_request("chat")
 def chat_page():
     if "user_id" not in session:
         return redirect(url_for("login_page"))
@@ -200,44 +214,159 @@ def chat_page():
     if "chat_history" not in session:
         session["chat_history"] = []
 
+    # One LangGraph thread per chat session (parsed JD/resume persist across its turns)
+    if "conversation_id" not in session:
+        session["conversation_id"] = uuid.uuid4().hex
+
     if request.method == "POST":
 
-        memory = []
-        for i in session["chat_history"][-10:]:
-            memory.append(f"{i['sender']} : {i['text']}")
+        # The whole turn must answer within CHAT_DEADLINE_SECONDS of arriving
+        deadline = new_deadline()
+
+        user_id = session["user_id"]
+        thread_id = f"{user_id}:{session['conversation_id']}"
         user_message = request.form.get("message", "").strip()
 
+        # Per-request model settings for experiments, e.g. {"router": {"tier": "standard"}}
+        model_overrides = None
+        if MODEL_OVERRIDES_ENABLED and request.headers.get("X-Model-Overrides"):
+            try:
+                model_overrides = json.loads(request.headers["X-Model-Overrides"])
+            except ValueError:
+                return jsonify({"error": "X-Model-Overrides must be a JSON object"}), 400
+            invalid = validate_model_overrides(model_overrides)
+            if invalid:
+                return jsonify({"error": f"X-Model-Overrides: {invalid}"}), 400
+
         # Handle file upload
         uploaded_file_path = None
+        upload_hash = None
         if 'file' in request.files:
             file = request.files['file']
             if file and file.filename != '' and allowed_file(file.filename):
+                # Hash the content so a re-submitted upload is recognized as the same request
+                upload_hash = hashlib.sha256(file.read()).hexdigest()
+                file.seek(0)
+
                 filename = secure_filename(file.filename)
                 # Add user_id and timestamp to avoid conflicts
                 import time
-                unique_filename = f"{session['user_id']}_{int(time.time())}_{filename}"
+                unique_filename = f"{user_id}_{int(time.time())}_{filename}"
                 uploaded_file_path = os.path.join(TEMP_DIR, unique_filename)
                 file.save(uploaded_file_path)
 
+                # Start extracting/parsing now; it overlaps with the rest of the turn.
+                # Same quota rules as the turn: economy models near the quota, no parse over it
+                quota, _ = usage_ledger.quota_status(user_id)
+                if quota != QUOTA_EXCEEDED:
+                    economy = quota == QUOTA_ECONOMY
+                    resume_prefetcher.submit(
+                        uploaded_file_path, upload_hash, user_id, deadline=deadline, economy=economy,
+                        model_overrides=economy_overrides(model_overrides) if economy else model_overrides,
+                    )
+
                 # Store file info in session for later cleanup
                 if 'uploaded_files' not in session:
                     session['uploaded_files'] = []
                 session['uploaded_files'].append(uploaded_file_path)
                 session.modified = True
 
-        if uploaded_file_path:
-            response = manager(user_message, memory, session["user_id"], uploaded_file_path)
-        else:
-            response = manager(user_message, memory, session["user_id"])
+        def run_chat_turn() -> str:
+            # Retrieve the most relevant past turns (bounded by a token budget)
+            memory = conversation_memory.retrieve(user_id, user_message)
 
-        if user_message:
+            if uploaded_file_path:
+                response = manager(user_message, memory, user_id, uploaded_file_path, thread_id=thread_id,
+                                   model_overrides=model_overrides, deadline=deadline)
+            else:
+                response = manager(user_message, memory, user_id, thread_id=thread_id,
+                                   model_overrides=model_overrides, deadline=deadline)
+
+            if user_message:
+                # Index the turn for retrieval on later messages
+                conversation_memory.record_turn(user_id, user_message, response)
+            return response
+
+        # Duplicate submissions (double-click, refresh, retry) share one pipeline run
+        request_key = chat_request_key(
+            user_id, session["conversation_id"], user_message, upload_hash, len(session["chat_history"])
+        )
+        response, coalesced = chat_coalescer.run(
+            request_key, user_id, run_chat_turn, request.form.get("idempotency_key") or None, deadline=deadline
+        )
+
+        # A shared response is already in the history if this session saw the original
+        # submission (refresh resubmit); a double-click's second request has not
+        last_turn = session["chat_history"][-2:]
+        is_replay = coalesced and last_turn == [
+            {"sender": "user", "text": user_message}, {"sender": "bot", "text": response}
+        ]
+        if user_message and not is_replay:
             # Append user message
             session["chat_history"].append({"sender": "user", "text": user_message})
             
             session["chat_history"].append({"sender": "bot", "text": response})
             session.modified = True  # Important for session updates
 
-    return render_template("chat.html", chat_history=session["chat_history"])
+    # Fresh idempotency key per rendered form; a resubmitted form reuses it
+    return render_template(
+        "chat.html", chat_history=session["chat_history"], idempotency_key=uuid.uuid4().hex
+    )
     
+@app.route("/metrics")
+def metrics_page():
+    if "user_id" not in session:
+        return redirect(url_for("login_page"))
+    if not is_admin(session["user_id"]):
+        abort(403)
+    # Per-process counters, latency histograms and LLM queue gauges
+    return jsonify(metrics.snapshot())
+
+@app.route("/admin/profiles", methods=["GET", "POST"])
+@app.route("/admin/profiles/<request_id>")
+def admin_profiles_page(request_id=None):
+    if "user_id" not in session:
+        return redirect(url_for("login_page"))
+    if not is_admin(session["user_id"]):
+        abort(403)
+
+    # Runtime switch for sampled profiling (this worker process only)
+    if request.method == "POST":
+        try:
+            request_profiler.sample_rate = min(max(float(request.form.get("sample_rate", 0)), 0.0), 1.0)
+        except ValueError:
+            flash("⚠️ Sample rate must be a number between 0 and 1", "error")
+        if request.form.get("mode") in PROFILE_MODES:
+            request_profiler.mode = request.form["mode"]
+        return redirect(url_for("admin_profiles_page"))
+
+    dump = None
+    if request_id:
+        dump = request_profiler.load(request_id)
+        if dump is None:
+            abort(404)
+    return render_template(
+        "admin_profiles.html", dumps=request_profiler.list_dumps(), dump=dump,
+        sample_rate=request_profiler.sample_rate, mode=request_profiler.mode, modes=PROFILE_MODES,
+    )
+
+@app.route("/admin/profiles/<request_id>/download")
+def admin_profile_download(request_id):
+    if "user_id" not in session or not is_admin(session["user_id"]):
+        abort(403)
+    path = request_profiler.raw_path(request_id)
+    if path is None:
+        abort(404)
+    return send_file(path, as_attachment=True)
+
+@app.route("/admin/usage")
+def admin_usage_page():
+    if "user_id" not in session or not is_admin(session["user_id"]):
+        abort(403)
+    # Heaviest users by LLM tokens over the last ?days= days, with a per-node breakdown
+    usage_ledger.flush()
+    days = min(max(request.args.get("days", 1, type=int), 1), 90)
+    return jsonify({"days": days, "daily_quota": usage_ledger.daily_quota, "users": usage_ledger.top_users(days)})
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,263 @@
+"""
+Offline batch runner for CareerGraph AI agents.
+
+Runs one agent node (e.g. nightly skill analyses or learning paths) for every
+user in the database and stores the output in the `AgentResult` table.
+
+Users are streamed from the `User` table in id order, profiles are loaded one
+chunk at a time, and the agent runs on a small thread pool. After each chunk
+the results and a checkpoint (last processed user id) are committed together,
+so an interrupted run picks up where it stopped when started again with the
+same --run-name. Users whose result is "failed" are retried first when a run
+is resumed.
+
+The LLM governor (utils/llm_governor.py) is per process: this CLI's "batch"
+priority only orders calls inside this process and does not compete with the
+web workers, which neither see its calls nor its 429 cooldowns. The safeguard
+for interactive chat is the provider quota split:
+- web: LLM_REQUESTS_PER_MINUTE × gunicorn workers ≤ ~80% of the provider's RPM
+- batch: --max-rpm ≤ the remaining ~20% (the default of 30 suits a 150+ RPM quota)
+
+Usage:
+    python batch_runner.py skill_analyzer
+    python batch_runner.py learning_path_advisor --concurrency 4 --max-rpm 60
+    python batch_runner.py skill_analyzer --run-name skill_analyzer-2025-01-31   # resume
+    python batch_runner.py skill_analyzer --model-overrides '{"skill_analyzer": {"tier": "fast"}}'
+"""
+import argparse
+import importlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from models import db, User, AgentResult, BatchCheckpoint
+from utils.get_profile import get_user_profiles_from_db
+from utils.llm_governor import llm_context
+from utils.usage import usage_ledger
+
+# Agent node name → (module, function, default query sent as `input_text`)
+BATCH_AGENTS = {
+    "skill_analyzer": (
+        "agents.skill_analyzer_agent", "skill_analyzer",
+        "Analyze my current skills and tell me where I should upskill next.",
+    ),
+    "learning_path_advisor": (
+        "agents.learning_path_advisor_agent", "learning_path_advisor",
+        "Create a learning roadmap toward the role that best fits my profile.",
+    ),
+    "course_recommender": (
+        "agents.course_recommender_agent", "course_recommender",
+        "Suggest courses that would help me progress in my career.",
+    ),
+    "project_recommender": (
+        "agents.project_recommender_agent", "project_recommender",
+        "Suggest projects that would strengthen my portfolio.",
+    ),
+    "interview_coach": (
+        "agents.interview_coach_agent", "interview_coach",
+        "Help me prepare for interviews for roles that fit my profile.",
+    ),
+    "resume_builder": (
+        "agents.resume_builder_agent", "resume_builder",
+        "Build an ATS-optimized resume from my profile.",
+    ),
+}
+
+
+class Throttle:
+    """Spaces out call starts across threads to at most `max_per_minute` (0 = unlimited)."""
+
+    def __init__(self, max_per_minute: float):
+        self.interval = 60.0 / max_per_minute if max_per_minute else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def iter_user_id_chunks(after_id: int, chunk_size: int, limit: int = None):
+    """
+    Stream user ids greater than `after_id` in ascending chunks (keyset pagination).
+
+    Each chunk is a fresh query, so commits between chunks are safe.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        ids = [
+            row.id for row in
+            db.session.query(User.id).filter(User.id > after_id).order_by(User.id).limit(size).all()
+        ]
+        if not ids:
+            return
+        yield ids
+        after_id = ids[-1]
+        if remaining is not None:
+            remaining -= len(ids)
+
+
+def build_state(user_id: int, profile: dict, query: str) -> dict:
+    """Build the agent input state the same way the graph does after `get_user_profile`."""
+    return {
+        "input_text": query,
+        "memory_summary": "",
+        "user_id": user_id,
+        "metadata": {},
+        "skills": profile.get("skills", []),
+        "education": profile.get("education", []),
+        "experience": profile.get("experience", []),
+        "projects": profile.get("projects", []),
+        "certifications": profile.get("certifications", []),
+    }
+
+
+def run_batch(flask_app, agent: str, run_name: str, query: str = None, concurrency: int = 2,
+              chunk_size: int = 50, max_rpm: float = 30, limit: int = None,
+              model_overrides: dict = None) -> BatchCheckpoint:
+    """
+    Run `agent` for every user after the run's checkpoint and persist the results.
+
+    Args:
+        flask_app: Flask app providing the database context.
+        agent (str): Key of BATCH_AGENTS.
+        run_name (str): Checkpoint key; reuse it to resume an interrupted run.
+        query (str, optional): Overrides the agent's default `input_text`.
+        concurrency (int): Number of users processed in parallel.
+        chunk_size (int): Users loaded and checkpointed per chunk.
+        max_rpm (float): Cap on agent calls started per minute (0 = unlimited).
+        limit (int, optional): Stop after this many users.
+        model_overrides (dict, optional): Per-node model settings for this run
+            (see `utils.llm.node_model_settings`).
+
+    Returns:
+        BatchCheckpoint: Final checkpoint row for the run.
+    """
+    module_name, func_name, default_query = BATCH_AGENTS[agent]
+    agent_fn = getattr(importlib.import_module(module_name), func_name)
+    query = query or default_query
+    throttle = Throttle(max_rpm)
+
+    def process(user_id: int, profile: dict):
+        throttle.wait()
+        # Each worker gets its own app context (and therefore its own DB session);
+        # --max-rpm (throttle above), not the priority, keeps chat's share of the quota
+        with flask_app.app_context(), llm_context(priority="batch", user_id=user_id, model_overrides=model_overrides):
+            try:
+                result = agent_fn(build_state(user_id, profile, query))
+                return user_id, "ok", result.get("response", ""), None
+            except Exception as e:
+                return user_id, "failed", None, repr(e)
+
+    with flask_app.app_context():
+        checkpoint = BatchCheckpoint.query.filter_by(run_name=run_name).first()
+        if checkpoint is None:
+            checkpoint = BatchCheckpoint(run_name=run_name, agent=agent, last_user_id=0, processed=0, failed=0)
+            db.session.add(checkpoint)
+            db.session.commit()
+        elif checkpoint.agent != agent:
+            raise ValueError(f"Run '{run_name}' was started for agent '{checkpoint.agent}', not '{agent}'.")
+
+        # Users that failed before the checkpoint (earlier attempts of this run)
+        retry_ids = sorted({
+            user_id for (user_id,) in
+            db.session.query(AgentResult.user_id).filter_by(run_name=run_name, status="failed")
+        })
+        print(f"▶ {run_name}: agent={agent}, resuming after user_id={checkpoint.last_user_id}"
+              + (f", retrying {len(retry_ids)} failed users" if retry_ids else ""))
+        started = time.monotonic()
+        done_this_run = 0
+
+        def run_chunk(user_ids: list, retry: bool = False) -> tuple:
+            profiles = get_user_profiles_from_db(user_ids)
+            outcomes = list(executor.map(
+                lambda uid: process(uid, profiles[uid]),
+                [uid for uid in user_ids if uid in profiles],
+            ))
+
+            # Results and checkpoint are committed atomically per chunk
+            failed = sum(1 for o in outcomes if o[1] != "ok")
+            if retry:
+                # Update the failed results in place; the checkpoint does not move
+                rows = {
+                    row.user_id: row for row in
+                    AgentResult.query.filter(AgentResult.run_name == run_name, AgentResult.status == "failed",
+                                             AgentResult.user_id.in_(user_ids))
+                }
+                for user_id, status, response, error in outcomes:
+                    row = rows[user_id]
+                    row.status, row.response, row.error = status, response, error
+                checkpoint.failed -= len(outcomes) - failed
+            else:
+                for user_id, status, response, error in outcomes:
+                    db.session.add(AgentResult(
+                        run_name=run_name, user_id=user_id, agent=agent,
+                        status=status, response=response, error=error,
+                    ))
+                checkpoint.last_user_id = user_ids[-1]
+                checkpoint.processed += len(outcomes)
+                checkpoint.failed += failed
+            db.session.commit()
+            usage_ledger.flush()   # LLM tokens per user (TokenUsage)
+            return outcomes, failed
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for start in range(0, len(retry_ids), chunk_size):
+                outcomes, failed = run_chunk(retry_ids[start:start + chunk_size], retry=True)
+                print(f"  ↻ retried {len(outcomes)} failed users: {len(outcomes) - failed} recovered, {failed} failed again")
+
+            for user_ids in iter_user_id_chunks(checkpoint.last_user_id, chunk_size, limit):
+                outcomes, failed = run_chunk(user_ids)
+
+                done_this_run += len(outcomes)
+                rate = done_this_run / max(time.monotonic() - started, 1e-9) * 60
+                print(
+                    f"  ✓ users ≤ {checkpoint.last_user_id}: {len(outcomes)} done, {failed} failed "
+                    f"(total {checkpoint.processed}, {rate:.1f} users/min)"
+                )
+
+        print(f"■ {run_name}: finished — {checkpoint.processed} processed, {checkpoint.failed} failed")
+        return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a CareerGraph AI agent for all users.")
+    parser.add_argument("agent", choices=sorted(BATCH_AGENTS), help="Agent node to run.")
+    parser.add_argument("--run-name", help="Checkpoint key (default: <agent>-<today>). Reuse to resume.")
+    parser.add_argument("--query", help="Override the default query passed to the agent.")
+    parser.add_argument("--concurrency", type=int, default=2, help="Users processed in parallel (default: 2).")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Users per chunk/checkpoint (default: 50).")
+    parser.add_argument("--max-rpm", type=float, default=30,
+                        help="Max agent calls started per minute, 0 for unlimited (default: 30). Keep it "
+                             "within the share of the provider quota not used by the web workers.")
+    parser.add_argument("--limit", type=int, help="Stop after this many users.")
+    parser.add_argument("--model-overrides", type=json.loads, default=None,
+                        help='Per-node model settings as JSON, e.g. \'{"skill_analyzer": {"tier": "fast"}}\'.')
+    args = parser.parse_args()
+
+    from app import app as flask_app
+
+    run_batch(
+        flask_app,
+        agent=args.agent,
+        run_name=args.run_name or f"{args.agent}-{date.today().isoformat()}",
+        query=args.query,
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        max_rpm=args.max_rpm,
+        limit=args.limit,
+        model_overrides=args.model_overrides,
+    )
+
+
+if __name__ == "__main__":
+    main()
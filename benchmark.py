@@ -0,0 +1,352 @@
+"""
+Micro-benchmarks for the non-LLM hot paths of CareerGraph AI.
+
+Measures, on synthetic fixtures (benchmarks/fixtures.py) in a throwaway SQLite
+database:
+- `extract_resume_text` throughput on generated PDF/DOCX resumes of 1–20 pages
+- `get_user_profile_from_db` latency for a typical and a large profile
+  (hundreds of rows per table)
+- `build_graph()` compile time
+- the prompt-building code of each LLM agent, up to the model call, and the
+  size of the prompt it builds (estimated tokens) for the fixed profiles
+
+No LLM is called: each agent's `llm` is swapped for a stub that records the
+prompt and stops the agent there.
+
+Results are written as JSON. When a baseline file exists, the run is compared
+against it and regressions (slower timings, bigger prompts) are listed; the
+exit code is 1 if there are any, so the numbers can be checked in review.
+
+Usage:
+    python benchmark.py run --save-baseline                 # on the base branch
+    python benchmark.py run                                 # on the change; compares with the baseline
+    python benchmark.py run --only prompts --repeat 50
+    python benchmark.py compare benchmarks/baseline.json benchmarks/results/latest.json
+"""
+import argparse
+import copy
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import Flask
+from langchain_core.runnables import RunnableLambda
+
+from benchmarks.fixtures import PROFILE_SIZES, make_resume_docx, make_resume_pdf, resume_lines, seed_user
+from models import db
+from utils.database import init_database
+from utils.tokens import estimate_tokens
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+GROUPS = ("extract", "profile", "graph", "prompts")
+RESUME_PAGES = (1, 5, 20)
+
+# Relative change treated as a regression (timings are noisy; prompt sizes are deterministic)
+TIME_THRESHOLD = 0.25
+TOKEN_THRESHOLD = 0.0
+# Timing differences below this are ignored whatever the ratio
+MIN_TIME_DELTA_SECONDS = 0.0005
+
+JOB_DESCRIPTION = (
+    "Senior Data Engineer at Globex. We are looking for an engineer to design and operate batch and "
+    "streaming pipelines. Required skills: Python, SQL, Spark, Airflow, Kafka, AWS, Terraform. "
+    "Responsibilities: build reliable ETL pipelines, own the data warehouse model, mentor junior "
+    "engineers, work with analysts on reporting, improve data quality checks and on-call tooling. "
+    "5+ years of experience with distributed data systems is expected."
+)
+
+# Agent node → (module, function, input). The function is called with an agent
+# state built from the fixed profile and `input` as the query; for the resume
+# parser it gets the text of the 2-page fixture resume instead.
+PROMPT_BENCHMARKS = {
+    "router": ("agents.router_agent", "route", "Analyze my skills and suggest some courses."),
+    "general": ("agents.general_agent", "general", "How should I negotiate a job offer?"),
+    "skill_analyzer": ("agents.skill_analyzer_agent", "skill_analyzer",
+                       "Analyze my current skills and tell me where I should upskill next."),
+    "course_recommender": ("agents.course_recommender_agent", "course_recommender",
+                           "Suggest courses that would help me progress in my career."),
+    "project_recommender": ("agents.project_recommender_agent", "project_recommender",
+                            "Suggest projects that would strengthen my portfolio."),
+    "learning_path_advisor": ("agents.learning_path_advisor_agent", "learning_path_advisor",
+                              "Create a learning roadmap to become a data engineer."),
+    "interview_coach": ("agents.interview_coach_agent", "interview_coach",
+                        "Help me prepare for a data engineer interview."),
+    "resume_builder": ("agents.resume_builder_agent", "resume_builder",
+                       "Build an ATS-optimized resume from my profile."),
+    "job_description_parser": ("agents.job_description_parser_agent", "job_description_parser", JOB_DESCRIPTION),
+    "resume_parser": ("agents.resume_parser_agent", "parse_resume_text", None),
+}
+
+
+class PromptCaptured(Exception):
+    """Raised by CaptureLLM in place of a model call; carries the prompt."""
+
+    def __init__(self, prompt):
+        super().__init__("prompt captured")
+        self.prompt = prompt
+
+
+class CaptureLLM(RunnableLambda):
+    """Stand-in for an agent's `llm`: records the prompt and stops the chain."""
+
+    def __init__(self):
+        super().__init__(self._capture, name="capture_llm")
+
+    def _capture(self, value):
+        raise PromptCaptured(value)
+
+    def with_structured_output(self, schema, **kwargs):
+        return self
+
+
+@contextmanager
+def captured_llm(module):
+    """Swap `module.llm` for a CaptureLLM for the duration of the block."""
+    original = module.llm
+    module.llm = CaptureLLM()
+    try:
+        yield
+    finally:
+        module.llm = original
+
+
+def measure(fn, repeat: int, warmup: int = 1, setup=None) -> dict:
+    """
+    Run `fn` `warmup + repeat` times; timing statistics of the measured runs (seconds).
+
+    With `setup`, each run calls `fn(setup())` and only `fn` is timed.
+    """
+    durations = []
+    for i in range(warmup + repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        if i >= warmup:
+            durations.append(time.perf_counter() - start)
+    durations.sort()
+    return {
+        "unit": "s",
+        "value": statistics.median(durations),
+        "min": durations[0],
+        "p95": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        "runs": repeat,
+    }
+
+
+def bench_extract(workdir: str, repeat: int) -> dict:
+    from utils.extract_resume import extract_resume_text
+
+    results = {}
+    for pages in RESUME_PAGES:
+        for kind, make in (("pdf", make_resume_pdf), ("docx", make_resume_docx)):
+            path = make(os.path.join(workdir, f"resume-{pages}p.{kind}"), pages)
+            result = measure(lambda: extract_resume_text(path), repeat)
+            result["pages_per_second"] = round(pages / result["value"], 1)
+            results[f"extract_resume.{kind}.{pages}p"] = result
+    return results
+
+
+def bench_profile(user_ids: dict, repeat: int) -> dict:
+    from utils.get_profile import get_user_profile_from_db
+
+    def load(user_id):
+        get_user_profile_from_db(user_id)
+        db.session.expunge_all()   # measure the queries, not the identity map
+
+    return {f"get_profile.{size}": measure(lambda: load(user_id), repeat) for size, user_id in user_ids.items()}
+
+
+def bench_graph(repeat: int) -> dict:
+    from graph_builder import build_graph
+
+    return {"build_graph": measure(build_graph, max(3, repeat // 4))}
+
+
+def bench_prompts(user_ids: dict, repeat: int) -> dict:
+    from batch_runner import build_state
+    from utils.get_profile import get_user_profile_from_db
+
+    resume_text = "\n".join(resume_lines(2))
+    results = {}
+    for node, (module_name, function_name, query) in PROMPT_BENCHMARKS.items():
+        module = importlib.import_module(module_name)
+        agent = getattr(module, function_name)
+
+        # One input per fixed profile (the resume parser only sees the resume text)
+        if node == "resume_parser":
+            inputs = {"resume-2p": resume_text}
+        else:
+            inputs = {size: build_state(user_id, get_user_profile_from_db(user_id), query)
+                      for size, user_id in user_ids.items()}
+
+        for label, argument in inputs.items():
+            captured = {}
+
+            def build_prompt(value):
+                try:
+                    agent(value)
+                except PromptCaptured as e:
+                    captured["prompt"] = e.prompt
+
+            # Agents update the state in place: each run gets a fresh copy (not timed)
+            with captured_llm(module):
+                results[f"prompt_build.{node}.{label}"] = measure(
+                    build_prompt, repeat, setup=lambda: copy.deepcopy(argument)
+                )
+
+            messages = captured["prompt"].to_messages() if "prompt" in captured else []
+            text = "\n".join(str(m.content) for m in messages)
+            results[f"prompt_tokens.{node}.{label}"] = {"unit": "tokens", "value": estimate_tokens(text), "chars": len(text)}
+    return results
+
+
+def run(groups, repeat: int) -> dict:
+    """Run the selected benchmark groups in a temporary database; returns the results document."""
+    workdir = tempfile.mkdtemp(prefix="careergraph-bench-")
+    flask_app = Flask(__name__)
+    flask_app.config.from_object("config")
+    flask_app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    init_database(flask_app)
+
+    benchmarks = {}
+    with flask_app.app_context():
+        user_ids = {size: seed_user(size) for size in PROFILE_SIZES}
+
+        if "extract" in groups:
+            benchmarks.update(bench_extract(workdir, repeat))
+        if "profile" in groups:
+            benchmarks.update(bench_profile(user_ids, repeat))
+        if "graph" in groups:
+            benchmarks.update(bench_graph(repeat))
+        if "prompts" in groups:
+            benchmarks.update(bench_prompts(user_ids, repeat))
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "groups": list(groups),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(baseline: dict, current: dict, time_threshold: float = TIME_THRESHOLD,
+            token_threshold: float = TOKEN_THRESHOLD) -> list:
+    """
+    Compare two results documents.
+
+    Returns:
+        list: (name, unit, baseline value, current value, relative change, regressed)
+        for every benchmark present in both.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None or base["unit"] != result["unit"]:
+            continue
+        change = (result["value"] - base["value"]) / base["value"] if base["value"] else 0.0
+        if result["unit"] == "s":
+            regressed = change > time_threshold and result["value"] - base["value"] > MIN_TIME_DELTA_SECONDS
+        else:
+            regressed = change > token_threshold
+        rows.append((name, result["unit"], base["value"], result["value"], change, regressed))
+    return rows
+
+
+def _format_value(value: float, unit: str) -> str:
+    return f"{value * 1000:.3f} ms" if unit == "s" else f"{value:.0f} tok"
+
+
+def print_results(results: dict) -> None:
+    for name, result in results["benchmarks"].items():
+        extra = ""
+        if result["unit"] == "s":
+            extra = f"  (min {result['min'] * 1000:.3f}, p95 {result['p95'] * 1000:.3f})"
+        if "pages_per_second" in result:
+            extra += f"  {result['pages_per_second']} pages/s"
+        print(f"{name:<48} {_format_value(result['value'], result['unit']):>14}{extra}")
+
+
+def print_comparison(rows: list) -> int:
+    """Print the comparison table; returns the number of regressions."""
+    print(f"\n{'benchmark':<48} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, unit, base, value, change, regressed in rows:
+        print(f"{name:<48} {_format_value(base, unit):>14} {_format_value(value, unit):>14} "
+              f"{change * 100:>+7.1f}%" + ("  ❌ regression" if regressed else ""))
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{regressions} regression(s) in {len(rows)} benchmarks.")
+    return regressions
+
+
+def _write(path: str, document: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CareerGraph AI's non-LLM hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks (and compare with the baseline).")
+    run_parser.add_argument("--only", help=f"Comma-separated groups to run (default: all of {', '.join(GROUPS)}).")
+    run_parser.add_argument("--repeat", type=int, default=20, help="Measured runs per benchmark (default: 20).")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results file (JSON).")
+    run_parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline to compare with, if it exists.")
+    run_parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the baseline.")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD,
+                         help=f"Relative slowdown reported as a regression (default: {TIME_THRESHOLD}).")
+        sub.add_argument("--token-threshold", type=float, default=TOKEN_THRESHOLD,
+                         help=f"Relative prompt growth reported as a regression (default: {TOKEN_THRESHOLD}).")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        rows = compare(baseline, current, args.time_threshold, args.token_threshold)
+        sys.exit(1 if print_comparison(rows) else 0)
+
+    groups = [g.strip() for g in args.only.split(",")] if args.only else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+
+    results = run(groups, args.repeat)
+    print_results(results)
+    _write(args.output, results)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        _write(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, results, args.time_threshold, args.token_threshold)
+        sys.exit(1 if print_comparison(rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Synthetic, deterministic fixtures for benchmark.py.
+
+Everything is generated from a fixed seed, so two runs (or two commits) measure
+the same inputs: resumes of a given page count render the same text, and a
+profile size always produces the same rows.
+"""
+import random
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+from docx import Document
+
+from models import db, User, Education, Certification, Project, Skill, Experience
+
+SEED = 2024
+
+# Text lines rendered per resume "page" (DOCX has no pages; the same line count is used)
+LINES_PER_PAGE = 48
+
+# Rows per profile table for each benchmark profile size
+PROFILE_SIZES = {
+    "typical": {"education": 2, "certifications": 3, "projects": 4, "experience": 4, "skills": 15},
+    "large": {"education": 100, "certifications": 200, "projects": 300, "experience": 300, "skills": 500},
+}
+
+SKILLS = [
+    "Python", "SQL", "Docker", "Kubernetes", "AWS", "GCP", "Terraform", "React", "TypeScript",
+    "Java", "Go", "Rust", "Spark", "Airflow", "Kafka", "PostgreSQL", "Redis", "Pandas", "NumPy",
+    "PyTorch", "TensorFlow", "scikit-learn", "FastAPI", "Flask", "Django", "Git", "Linux",
+    "CI/CD", "GraphQL", "Machine Learning", "Data Modeling", "Leadership", "Communication",
+]
+TITLES = ["Software Engineer", "Data Engineer", "Backend Developer", "ML Engineer", "Data Analyst", "DevOps Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Analytics"]
+UNIVERSITIES = ["State University", "Institute of Technology", "City College", "National University"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Scaled", "Maintained"]
+OBJECTS = ["a data pipeline", "the billing service", "an internal dashboard", "CI workflows",
+           "a recommendation model", "the REST API", "the search index", "reporting jobs"]
+
+
+def _sentence(rng: random.Random) -> str:
+    return (f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} and "
+            f"{rng.choice(SKILLS)}, improving throughput by {rng.randint(10, 90)}%.")
+
+
+def resume_lines(pages: int) -> List[str]:
+    """Text of a synthetic resume, LINES_PER_PAGE lines per page."""
+    rng = random.Random(SEED + pages)
+    lines = [
+        "Jordan Example",
+        "jordan.example@example.com | +1 555 010 2030 | linkedin.com/in/jordan-example",
+        "SUMMARY",
+        "Engineer with experience building data-intensive backend systems.",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 12)),
+        "EXPERIENCE",
+    ]
+    while len(lines) < pages * LINES_PER_PAGE - 4:
+        start = rng.randint(2012, 2022)
+        lines.append(f"{rng.choice(TITLES)} — {rng.choice(COMPANIES)} ({start} – {start + rng.randint(1, 3)})")
+        lines.extend(f"• {_sentence(rng)}" for _ in range(rng.randint(3, 6)))
+    lines += ["EDUCATION", f"B.Sc. Computer Science — {rng.choice(UNIVERSITIES)} (2008 – 2012)"]
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def make_resume_pdf(path: str, pages: int) -> str:
+    """Write a `pages`-page PDF resume to `path` (returns the path)."""
+    lines = resume_lines(pages)
+    with fitz.open() as pdf:
+        for start in range(0, len(lines), LINES_PER_PAGE):
+            page = pdf.new_page()
+            page.insert_textbox(fitz.Rect(40, 40, page.rect.width - 40, page.rect.height - 40),
+                                "\n".join(lines[start:start + LINES_PER_PAGE]), fontsize=9)
+        pdf.save(path)
+    return path
+
+
+def make_resume_docx(path: str, pages: int) -> str:
+    """Write a DOCX resume with the same text as the `pages`-page PDF (returns the path)."""
+    document = Document()
+    for line in resume_lines(pages):
+        document.add_paragraph(line)
+    document.save(path)
+    return path
+
+
+def make_profile_rows(size: str) -> Dict[str, list]:
+    """Profile rows (as model keyword arguments) for one of PROFILE_SIZES."""
+    counts = PROFILE_SIZES[size]
+    rng = random.Random(f"{SEED}-{size}")
+    return {
+        "education": [
+            dict(degree=f"{rng.choice(['B.Sc.', 'M.Sc.', 'Diploma'])} Computer Science #{i}",
+                 university=rng.choice(UNIVERSITIES), start_date="2010-09", end_date="2014-06", cgpa="3.7")
+            for i in range(counts["education"])
+        ],
+        "certifications": [
+            dict(name=f"{rng.choice(SKILLS)} Certified Professional #{i}", organization=rng.choice(COMPANIES))
+            for i in range(counts["certifications"])
+        ],
+        "projects": [
+            dict(name=f"{rng.choice(OBJECTS).title()} #{i}", start_date="2021-01", end_date="2021-06",
+                 description=" ".join(_sentence(rng) for _ in range(2)))
+            for i in range(counts["projects"])
+        ],
+        "experience": [
+            dict(title=rng.choice(TITLES), company=rng.choice(COMPANIES), start_date="2015-01",
+                 end_date="2019-12", location="Remote", description=" ".join(_sentence(rng) for _ in range(3)))
+            for i in range(counts["experience"])
+        ],
+        "skills": [dict(name=f"{SKILLS[i % len(SKILLS)]}" + (f" {i // len(SKILLS)}" if i >= len(SKILLS) else ""))
+                   for i in range(counts["skills"])],
+    }
+
+
+def seed_user(size: str) -> int:
+    """Create a benchmark user with a `size` profile (call inside an app context); returns the user id."""
+    user = User(name=f"Benchmark {size.title()}", email=f"benchmark-{size}@example.com", password="x")
+    db.session.add(user)
+    db.session.flush()
+
+    rows = make_profile_rows(size)
+    models = {"education": Education, "certifications": Certification, "projects": Project,
+              "experience": Experience, "skills": Skill}
+    for table, model in models.items():
+        db.session.add_all(model(user_id=user.id, **values) for values in rows[table])
+    db.session.commit()
+    return user.id
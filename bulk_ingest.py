@@ -0,0 +1,239 @@
+"""
+Bulk resume ingestion for career-services staff.
+
+Loads a zip archive or a directory of PDF/DOCX resumes into the
+`CandidateResume` table, parsed into `ResumeModel` fields.
+
+Files flow through a two-stage pipeline:
+    1. Text extraction on a process pool (PyMuPDF / python-docx are CPU-bound).
+    2. Parsing on a small thread pool (`parse_resume_text`: local pre-parse plus
+       one partial LLM call). LLM calls use the "batch" priority, which only
+       orders calls within this process: the governor is per process, so keep
+       --parse-workers low enough to stay within the share of the provider
+       quota not used by the web workers (see batch_runner.py).
+
+The stages are connected by a bounded queue: when parsing falls behind,
+extraction stops submitting new files instead of piling up text in memory.
+Files whose content hash is already stored as parsed are skipped, so re-running
+on the same archive only processes new or previously failed files.
+
+Usage:
+    python bulk_ingest.py resumes.zip
+    python bulk_ingest.py ./resumes --extract-workers 4 --parse-workers 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from models import db, CandidateResume
+from utils.extract_resume import extract_resume_bytes
+from utils.llm_governor import llm_context
+from utils.usage import usage_ledger
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+
+def iter_resume_files(source: str):
+    """
+    Yield (name, bytes) for every PDF/DOCX file in a zip archive or directory tree.
+
+    Files are read one at a time, so large archives are never loaded at once.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or not name.lower().endswith(RESUME_EXTENSIONS):
+                    continue
+                if os.path.basename(name).startswith(("._", "~$")):  # macOS / Office artifacts
+                    continue
+                yield name, archive.read(info)
+        return
+
+    if not os.path.isdir(source):
+        raise ValueError(f"{source} is neither a zip archive nor a directory.")
+    for root, _, files in os.walk(source):
+        for filename in sorted(files):
+            if filename.lower().endswith(RESUME_EXTENSIONS) and not filename.startswith(("._", "~$")):
+                path = os.path.join(root, filename)
+                with open(path, "rb") as f:
+                    yield os.path.relpath(path, source), f.read()
+
+
+def _extract(name: str, data: bytes, digest: str) -> tuple:
+    """Process-pool task: (name, digest, text, error)."""
+    try:
+        return name, digest, extract_resume_bytes(data, name), None
+    except Exception as e:
+        return name, digest, None, repr(e)
+
+
+def _store(digest: str, name: str, status: str, text: str = None, parsed: dict = None, error: str = None) -> None:
+    """Insert or update the row of one file (failed rows are retried on the next run)."""
+    row = CandidateResume.query.filter_by(content_hash=digest).first()
+    if row is None:
+        row = CandidateResume(content_hash=digest)
+        db.session.add(row)
+    row.filename = name
+    row.status = status
+    row.resume_text = text
+    row.error = error
+    if parsed is not None:
+        row.name = parsed.get("name")
+        row.email = parsed.get("email")
+        row.total_experience_years = parsed.get("total_experience_years")
+        row.data = json.dumps(parsed)
+    db.session.commit()
+
+
+class IngestReport:
+    """Thread-safe per-file status log with throughput figures."""
+
+    def __init__(self):
+        self.counts = {"parsed": 0, "not_resume": 0, "failed": 0, "skipped": 0}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, status: str, detail: str = "") -> None:
+        with self._lock:
+            self.counts[status] += 1
+            done = sum(self.counts.values())
+            processed = done - self.counts["skipped"]
+            rate = processed / max(time.monotonic() - self.started, 1e-9) * 60
+        icon = {"parsed": "✓", "not_resume": "–", "failed": "✗", "skipped": "↷"}[status]
+        print(f"  {icon} [{done}] {name}: {status}{' — ' + detail if detail else ''} ({rate:.1f} files/min)")
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        processed = sum(v for k, v in self.counts.items() if k != "skipped")
+        return {
+            **self.counts,
+            "elapsed_seconds": round(elapsed, 1),
+            "files_per_minute": round(processed / max(elapsed, 1e-9) * 60, 1),
+        }
+
+
+def run_ingest(flask_app, source: str, extract_workers: int = None, parse_workers: int = 4,
+               queue_size: int = 32) -> dict:
+    """
+    Ingest every resume under `source` and return the status counts.
+
+    Args:
+        flask_app: Flask app providing the database context.
+        source (str): Zip archive or directory of PDF/DOCX files.
+        extract_workers (int, optional): Extraction processes (default: CPU count).
+        parse_workers (int): Concurrent parse (LLM) workers.
+        queue_size (int): Extracted texts allowed to wait for a parse worker.
+
+    Returns:
+        dict: Counts per status plus elapsed time and throughput.
+    """
+    # Imported here so the extraction processes don't build an LLM client
+    from agents.resume_parser_agent import parse_resume_text
+
+    extract_workers = extract_workers or os.cpu_count() or 2
+    report = IngestReport()
+    parse_queue = queue.Queue(maxsize=queue_size)
+
+    def parse_worker():
+        with flask_app.app_context(), llm_context(priority="batch"):
+            while True:
+                item = parse_queue.get()
+                if item is None:
+                    return
+                name, digest, text = item
+                started = time.monotonic()
+                try:
+                    parsed = parse_resume_text(text).model_dump()
+                    status = "parsed" if parsed.get("is_resume") else "not_resume"
+                    _store(digest, name, status, text=text, parsed=parsed)
+                    report.record(name, status, f"{time.monotonic() - started:.1f}s")
+                except Exception as e:
+                    db.session.rollback()
+                    detail = repr(e)
+                    # The worker must survive a failing store, or the producer blocks on a full queue
+                    try:
+                        _store(digest, name, "failed", text=text, error=detail)
+                    except Exception as store_error:
+                        db.session.rollback()
+                        detail += f" (status not stored: {store_error!r})"
+                    report.record(name, "failed", detail)
+
+    def forward(result: tuple) -> None:
+        name, digest, text, error = result
+        if error or not text:
+            _store(digest, name, "failed", error=error or "No text could be extracted.")
+            report.record(name, "failed", error or "empty text")
+        else:
+            # Blocks while the parse stage is saturated (backpressure)
+            parse_queue.put((name, digest, text))
+
+    with flask_app.app_context():
+        done_hashes = {
+            digest for (digest,) in
+            db.session.query(CandidateResume.content_hash).filter(CandidateResume.status.in_(["parsed", "not_resume"]))
+        }
+        print(f"▶ Ingesting {source}: {extract_workers} extract processes, {parse_workers} parse workers "
+              f"({len(done_hashes)} files already ingested)")
+
+        workers = [threading.Thread(target=parse_worker, daemon=True) for _ in range(parse_workers)]
+        for worker in workers:
+            worker.start()
+
+        try:
+            with ProcessPoolExecutor(max_workers=extract_workers) as pool:
+                pending, seen = set(), set()
+                for name, data in iter_resume_files(source):
+                    digest = hashlib.sha256(data).hexdigest()
+                    if digest in done_hashes or digest in seen:
+                        report.record(name, "skipped", "already ingested" if digest in done_hashes else "duplicate")
+                        continue
+                    seen.add(digest)
+                    pending.add(pool.submit(_extract, name, data, digest))
+                    # Keep only a couple of files per process in flight
+                    if len(pending) >= extract_workers * 2:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            forward(future.result())
+                for future in pending:
+                    forward(future.result())
+        finally:
+            for _ in workers:
+                parse_queue.put(None)
+            for worker in workers:
+                worker.join()
+            usage_ledger.flush()   # LLM tokens of the parse stage (TokenUsage)
+
+    summary = report.summary()
+    print(f"■ Done: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest PDF/DOCX resumes into CareerGraph AI.")
+    parser.add_argument("source", help="Zip archive or directory of resumes.")
+    parser.add_argument("--extract-workers", type=int, help="Text extraction processes (default: CPU count).")
+    parser.add_argument("--parse-workers", type=int, default=4, help="Concurrent LLM parse workers (default: 4).")
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="Extracted resumes buffered between the stages (default: 32).")
+    args = parser.parse_args()
+
+    from app import app as flask_app
+
+    run_ingest(
+        flask_app,
+        source=args.source,
+        extract_workers=args.extract_workers,
+        parse_workers=args.parse_workers,
+        queue_size=args.queue_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 from langchain_core.prompts import ChatPromptTemplate
-from utils.llm import get_llm
+from utils.llm import get_node_llm
 from graph_builder import build_graph
+from utils.checkpointer import get_checkpointer
+from utils.deadline import DEADLINE_FALLBACK_RESPONSE, has_time_for
+from utils.llm_governor import DeadlineExceeded, llm_context
+from utils.metrics import metrics
+from utils.small_talk import match_small_talk, small_talk_response
+from utils.tracing import tracer
+from utils.usage import QUOTA_ECONOMY, QUOTA_EXCEEDED, QUOTA_EXCEEDED_RESPONSE, economy_overrides, usage_ledger
 
-# Initialize LLM instance
-llm = get_llm()
+# Initialize LLM instances: memory summary and exit detection (cheap tier, see NODE_MODEL_CONFIG)
+llm = get_node_llm("memory_summary")
+exit_llm = get_node_llm("exit_check")
 
-# Initialize LangGraph Multi-Agent
-app = build_graph()
+# Initialize LangGraph Multi-Agent (state is checkpointed per conversation thread)
+app = build_graph(checkpointer=get_checkpointer())
 
 # Exit Detection Prompt
 exit_prompt = ChatPromptTemplate.from_template(
@@ -24,26 +32,69 @@ exit_prompt = ChatPromptTemplate.from_template(
 )
 
 # Combine prompt with the language model
-exit_chain = exit_prompt | llm
+exit_chain = exit_prompt | exit_llm
 
-def manager(user_input: str, memory: list, user_id: int, file_path: str = None) -> str:
+def manager(user_input: str, memory: list, user_id: int, file_path: str = None, thread_id: str = None,
+            model_overrides: dict = None, deadline: float = None) -> str:
+    # Every LLM call in this turn is interactive and attributed to the user;
+    # `model_overrides` ({node or "*": {tier/model/temperature/...}}) is for experiments.
+    # `deadline` (epoch seconds, see utils/deadline.py) bounds every LLM call of the turn
+    # Near the daily token quota the turn runs in economy mode: fast models, optional stages skipped
+    quota, _ = usage_ledger.quota_status(user_id)
+    economy = quota == QUOTA_ECONOMY
+    if economy:
+        model_overrides = economy_overrides(model_overrides)
+
+    with llm_context(priority="interactive", user_id=user_id, model_overrides=model_overrides, deadline=deadline,
+                     economy=economy):
+        try:
+            return _run_turn(user_input, memory, user_id, file_path, thread_id, deadline,
+                             quota_exceeded=quota == QUOTA_EXCEEDED)
+        except DeadlineExceeded:
+            metrics.incr("deadline.exceeded")
+            return DEADLINE_FALLBACK_RESPONSE
+        finally:
+            # Store this turn's token usage (see utils/usage.py)
+            usage_ledger.flush()
+
+def _run_turn(user_input: str, memory: list, user_id: int, file_path: str = None, thread_id: str = None,
+              deadline: float = None, quota_exceeded: bool = False) -> str:
     # Initialize Memory
     memory_summary = ""  # Compressed summary of recent context
 
-    # Check if user wants to end the conversation
-    should_continue = exit_chain.invoke({'user_input': user_input}).content.strip()
+    # Greetings, thanks, goodbyes and off-topic questions get a canned reply (no LLM calls)
+    previous_reply = next((line[len("bot : "):] for line in reversed(memory) if line.startswith("bot : ")), None)
+    small_talk = None if file_path else match_small_talk(user_input, previous_reply)
+    if small_talk:
+        metrics.incr("small_talk.hit", category=small_talk)
+        tracer.current_span().set(small_talk=small_talk)
+        return small_talk_response(small_talk, user_id)
+
+    # Today's token quota is used up: no LLM calls until it resets
+    if quota_exceeded:
+        metrics.incr("quota.exceeded")
+        return QUOTA_EXCEEDED_RESPONSE
+
+    # Check if user wants to end the conversation (skipped when the turn is short on time)
+    if has_time_for("exit_check"):
+        with tracer.span("exit_check"):
+            should_continue = exit_chain.invoke({'user_input': user_input}).content.strip()
 
-    if should_continue == "exit":
-        return "Goodbye 👋"
+        if should_continue == "exit":
+            return "Goodbye 👋"
 
     # If there’s existing conversation, summarize it
-    if len(memory) != 0:
+    # (short on time: pass the retrieved turns as they are; they are already token-bounded)
+    if len(memory) != 0 and not has_time_for("memory_summary"):
+        memory_summary = "\n".join(memory)
+    elif len(memory) != 0:
         summary_prompt = ChatPromptTemplate.from_template(
             "Summarize the key context of this conversation in 5 concise sentences:\n\n{conversation}"
         )
         formatted = "\n".join(memory)
         chain = summary_prompt | llm
-        memory_summary = chain.invoke({"conversation": formatted}).content.strip()
+        with tracer.span("memory_summary", turns=len(memory)):
+            memory_summary = chain.invoke({"conversation": formatted}).content.strip()
     else:
         memory_summary = ""
 
@@ -53,17 +104,23 @@ def manager(user_input: str, memory: list, user_id: int, file_path: str = None)
             "input_text": user_input,
             "memory_summary": memory_summary,
             "user_id" : user_id,
-            "resume_path" : file_path
+            "resume_path" : file_path,
+            "deadline": deadline,
         }
     else:
          state = {
             "input_text": user_input,
             "memory_summary": memory_summary,
             "user_id" : user_id,
+            "deadline": deadline,
         }       
 
-    # Invoke the main LangGraph app (routes to the right agent)
-    result = app.invoke(state)
+    # Invoke the main LangGraph app (routes to the right agent).
+    # The thread's previous state (parsed JD / resume, last upload) is restored by the
+    # checkpointer; keys set above overwrite it. Only the final state is persisted.
+    config = {"configurable": {"thread_id": thread_id or f"user-{user_id}"}}
+    with tracer.span("graph", thread_id=config["configurable"]["thread_id"]):
+        result = app.invoke(state, config, durability="exit")
     response = result.get("response", "(No response)")
 
     # Display AI response
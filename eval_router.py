@@ -0,0 +1,271 @@
+"""
+Evaluate the router: accuracy, confusion matrix, latency and tokens per decision.
+
+Runs `route()` (or the keyword `local_route()`) over a labeled dataset of user
+queries + memory summaries (evals/router_dataset.jsonl) on a small thread pool
+and reports:
+- exact accuracy (the routed agents equal the expected ones, in any order) and
+  primary accuracy (the first routed agent is the first expected one)
+- a confusion matrix of expected vs. routed primary agent
+- p50 / p95 latency and input / output tokens per decision
+
+LLM runs can be recorded (raw model output, latency, tokens per case) and
+replayed offline: replay feeds the recorded model output back through
+`route()`, so changes to the validation code are measured without an API key.
+Model swaps are compared with the usual per-node overrides.
+
+Usage:
+    python eval_router.py                                   # live LLM, default router model
+    python eval_router.py --record evals/recordings/router-flash-lite.jsonl
+    python eval_router.py --replay evals/recordings/router-flash-lite.jsonl
+    python eval_router.py --model-overrides '{"router": {"tier": "standard"}}' --concurrency 8
+    python eval_router.py --router local                    # keyword routing (no LLM)
+"""
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from langchain_core.callbacks import get_usage_metadata_callback
+from langchain_core.runnables import RunnableLambda
+
+import agents.router_agent as router_agent
+from agents.router_agent import AGENT_NAMES, AgentType
+from utils.llm_governor import llm_context
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evals", "router_dataset.jsonl")
+
+# Column labels of the confusion matrix
+AGENT_ABBREVIATIONS = {
+    "skill_analyzer": "skill", "project_recommender": "proj", "course_recommender": "course",
+    "learning_path_advisor": "path", "resume_builder": "resume", "interview_coach": "intvw",
+    "job_matcher": "jobs", "general": "gen",
+}
+
+
+def load_cases(path: str) -> List[dict]:
+    """Read the labeled cases: {"id", "input_text", "memory_summary", "expected": [agent, ...]}."""
+    with open(path, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    for case in cases:
+        unknown = set(case["expected"]) - set(AGENT_NAMES)
+        if unknown:
+            raise SystemExit(f"Case {case['id']}: unknown agent(s) {sorted(unknown)}.")
+    return cases
+
+
+class RecordingLLM:
+    """
+    Wraps the router's LLM and keeps the raw structured output of the last call
+    in the calling thread (the dataset runs on a thread pool).
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.local = threading.local()
+
+    def with_structured_output(self, schema, **kwargs):
+        structured = self.llm.with_structured_output(schema, **kwargs)
+
+        def invoke(value, config):
+            self.local.raw = structured.invoke(value, config)
+            return self.local.raw
+
+        return RunnableLambda(invoke, name="recording_llm")
+
+
+class ReplayLLM:
+    """
+    Stands in for the router's LLM, returning the recorded model output of the
+    case being routed in the calling thread (set by `evaluate_case`).
+    """
+
+    def __init__(self, recordings: Dict[tuple, dict]):
+        self.recordings = recordings
+        self.local = threading.local()
+
+    def with_structured_output(self, schema, **kwargs):
+        def invoke(value, config):
+            record = self.recordings.get(self.local.key)
+            if record is None or record.get("raw") is None:
+                raise KeyError("No recording for this case.")
+            return AgentType(agent_names=record["raw"])
+
+        return RunnableLambda(invoke, name="replay_llm")
+
+
+def load_recordings(path: str) -> Dict[tuple, dict]:
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {(r["input_text"], r["memory_summary"]): r for r in records}
+
+
+def evaluate_case(case: dict, mode: str, recorder: RecordingLLM = None, replayer: ReplayLLM = None,
+                  model_overrides: dict = None) -> dict:
+    """Route one case; returns the case with `routed`, `latency`, token counts and `error`."""
+    state = {"input_text": case["input_text"], "memory_summary": case.get("memory_summary", "")}
+    result = {**case, "routed": [], "raw": None, "error": None, "input_tokens": 0, "output_tokens": 0}
+    key = (case["input_text"], case.get("memory_summary", ""))
+    if replayer is not None:
+        replayer.local.key = key
+
+    with llm_context(priority="batch", model_overrides=model_overrides), get_usage_metadata_callback() as usage:
+        start = time.perf_counter()
+        try:
+            result["routed"] = router_agent.local_route(state) if mode == "local" else router_agent.route(state)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["latency"] = time.perf_counter() - start
+
+    if mode == "replay":
+        # Latency and tokens of the recorded live call
+        record = replayer.recordings.get(key, {})
+        for field in ("latency", "input_tokens", "output_tokens", "model", "raw"):
+            result[field] = record.get(field, result.get(field))
+        return result
+
+    for model, counts in usage.usage_metadata.items():
+        result["model"] = model
+        result["input_tokens"] += counts.get("input_tokens", 0)
+        result["output_tokens"] += counts.get("output_tokens", 0)
+    if recorder is not None:
+        raw = getattr(recorder.local, "raw", None)
+        result["raw"] = raw.agent_names if raw is not None else None
+        recorder.local.raw = None
+    return result
+
+
+def run_eval(cases: List[dict], mode: str = "llm", concurrency: int = 4, replay: str = None,
+             model_overrides: dict = None) -> List[dict]:
+    """
+    Route every case on a thread pool.
+
+    Args:
+        cases (List[dict]): Output of `load_cases`.
+        mode (str): "llm" (`route`), "local" (`local_route`) or "replay" (recorded LLM output).
+        concurrency (int): Cases routed at once.
+        replay (str, optional): Recording file for the "replay" mode.
+        model_overrides (dict, optional): Per-node model overrides (see utils/llm.py).
+
+    Returns:
+        List[dict]: One result per case, in dataset order.
+    """
+    original_llm = router_agent.llm
+    recorder = replayer = None
+    if mode == "llm":
+        recorder = router_agent.llm = RecordingLLM(original_llm)
+    elif mode == "replay":
+        replayer = router_agent.llm = ReplayLLM(load_recordings(replay))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            return list(pool.map(
+                lambda case: evaluate_case(case, mode, recorder, replayer, model_overrides), cases
+            ))
+    finally:
+        router_agent.llm = original_llm
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def summarize(results: List[dict]) -> dict:
+    """Accuracy, confusion matrix (expected → routed primary agent), latency and token statistics."""
+    scored = [r for r in results if r["error"] is None]
+    confusion = {expected: Counter() for expected in AGENT_NAMES}
+    for r in scored:
+        confusion[r["expected"][0]][r["routed"][0] if r["routed"] else "general"] += 1
+
+    latencies = [r["latency"] for r in scored if r.get("latency") is not None]
+    count = max(len(scored), 1)
+    return {
+        "cases": len(results),
+        "errors": len(results) - len(scored),
+        "exact_accuracy": sum(set(r["routed"]) == set(r["expected"]) for r in scored) / count,
+        "primary_accuracy": sum(bool(r["routed"]) and r["routed"][0] == r["expected"][0] for r in scored) / count,
+        "multi_intent_accuracy": (
+            sum(set(r["routed"]) == set(r["expected"]) for r in scored if len(r["expected"]) > 1)
+            / max(sum(1 for r in scored if len(r["expected"]) > 1), 1)
+        ),
+        "latency_p50": statistics.median(latencies) if latencies else 0.0,
+        "latency_p95": _percentile(latencies, 0.95),
+        "input_tokens_per_decision": sum(r["input_tokens"] for r in scored) / count,
+        "output_tokens_per_decision": sum(r["output_tokens"] for r in scored) / count,
+        "confusion": {expected: dict(row) for expected, row in confusion.items() if row},
+    }
+
+
+def print_report(summary: dict, results: List[dict]) -> None:
+    print(f"cases: {summary['cases']}  errors: {summary['errors']}")
+    print(f"exact accuracy:        {summary['exact_accuracy']:.1%}")
+    print(f"primary accuracy:      {summary['primary_accuracy']:.1%}")
+    print(f"multi-intent accuracy: {summary['multi_intent_accuracy']:.1%}")
+    print(f"latency p50 / p95:     {summary['latency_p50'] * 1000:.0f} ms / {summary['latency_p95'] * 1000:.0f} ms")
+    print(f"tokens per decision:   {summary['input_tokens_per_decision']:.0f} in / "
+          f"{summary['output_tokens_per_decision']:.0f} out")
+
+    # Rows: expected primary agent; columns: routed primary agent
+    columns = [AGENT_ABBREVIATIONS[a] for a in AGENT_NAMES]
+    print(f"\nconfusion (rows: expected, columns: routed)\n{'':<22}" + "".join(f"{c:>7}" for c in columns))
+    for expected in AGENT_NAMES:
+        row = summary["confusion"].get(expected)
+        if row:
+            print(f"{expected:<22}" + "".join(f"{row.get(a, 0) or '.':>7}" for a in AGENT_NAMES))
+
+    misses = [r for r in results if r["error"] or set(r["routed"]) != set(r["expected"])]
+    if misses:
+        print("\nmisrouted:")
+        for r in misses:
+            outcome = r["error"] or ", ".join(r["routed"])
+            print(f"  {r['id']:<14} expected {', '.join(r['expected'])} → {outcome}  | {r['input_text'][:60]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate CareerGraph AI's router on a labeled dataset.")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Labeled cases (JSONL).")
+    parser.add_argument("--router", choices=["llm", "local"], default="llm",
+                        help="LLM routing (route) or keyword routing (local_route).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cases routed at once (default: 4).")
+    parser.add_argument("--record", help="Write the raw LLM output, latency and tokens per case to this JSONL file.")
+    parser.add_argument("--replay", help="Route offline from a recording made with --record.")
+    parser.add_argument("--model-overrides", type=json.loads,
+                        help='Per-node model overrides, e.g. \'{"router": {"tier": "standard"}}\'.')
+    parser.add_argument("--output", help="Write the summary and per-case results to this JSON file.")
+    args = parser.parse_args()
+
+    if args.replay and (args.record or args.router == "local"):
+        parser.error("--replay cannot be combined with --record or --router local")
+    if args.record and args.router == "local":
+        parser.error("--record needs LLM routing")
+
+    mode = "replay" if args.replay else args.router
+    cases = load_cases(args.dataset)
+    results = run_eval(cases, mode, args.concurrency, args.replay, args.model_overrides)
+    summary = summarize(results)
+    print_report(summary, results)
+
+    if args.record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.record)), exist_ok=True)
+        with open(args.record, "w", encoding="utf-8") as f:
+            for r in results:
+                if r["error"] is None:
+                    f.write(json.dumps({key: r.get(key) for key in (
+                        "id", "input_text", "memory_summary", "raw", "latency", "input_tokens",
+                        "output_tokens", "model",
+                    )}) + "\n")
+        print(f"\nRecording written to {args.record}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"mode": mode, "summary": summary, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
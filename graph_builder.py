@@ -11,20 +11,46 @@ from agents.resume_builder_agent import resume_builder
 from agents.skill_analyzer_agent import skill_analyzer
 from agents.resume_parser_agent import resume_parser
 from agents.job_description_parser_agent import job_description_parser
+from agents.job_matcher_agent import job_matcher
 from agents.get_user_profile_agent import get_user_profile
+from agents.multi_intent_agent import PARSER_AGENTS, fan_out, intent_worker, merge_responses
 from state import State 
+from utils.tracing import traced_node
 
 
-def build_graph() -> StateGraph:
+def after_router(state: State):
+    """Next step after routing: end (speculative hit), parsers, fan-out, or the single agent."""
+    if state.get("speculative_hit"):   # speculative agent already answered
+        return "end"
+    agent_actions = state.get("agent_actions") or [state["agent_action"]]
+    if any(agent in PARSER_AGENTS for agent in agent_actions):
+        return "parser"
+    if len(agent_actions) > 1:
+        return fan_out(state)
+    return state["agent_action"]
+
+
+def after_parsers(state: State):
+    """Next step after the parsers: fan-out for multi-part messages, else the routed agent."""
+    if len(state.get("agent_actions") or []) > 1:
+        return fan_out(state)
+    return state["agent_action"]
+
+
+def build_graph(checkpointer=None) -> StateGraph:
     """
     Build and compile the full CareerGraph AI workflow using LangGraph.
 
     This function:
     - Initializes the state graph with the shared `State` class.
-    - Adds all agent nodes to the graph.
+    - Adds all agent nodes to the graph (each traced as a `node:<name>` span).
     - Defines routing and conditional edges for dynamic flow control.
     - Compiles and returns the final executable graph.
 
+    Args:
+        checkpointer (optional): LangGraph checkpointer used to persist state per
+            `thread_id` across invocations. Without one, every invoke starts fresh.
+
     Returns:
         Graph: A compiled LangGraph app instance ready for use.
     """
@@ -33,17 +59,20 @@ def build_graph() -> StateGraph:
     graph = StateGraph(State)
 
     # Add All Agent Nodes
-    graph.add_node("get_user_profile", get_user_profile)       # Fetch or initialize user data
-    graph.add_node("router", router)                           # Routes user queries to agents
-    graph.add_node("general", general)                         # Handles general/fallback queries
-    graph.add_node("course_recommender", course_recommender)   # Suggests learning courses
-    graph.add_node("project_recommender", project_recommender) # Recommends projects
-    graph.add_node("interview_coach", interview_coach)         # Prepares user for interviews
-    graph.add_node("learning_path_advisor", learning_path_advisor) # Suggests learning paths
-    graph.add_node("resume_builder", resume_builder)           # Builds or optimizes resumes
-    graph.add_node("skill_analyzer", skill_analyzer)           # Analyzes user skills
-    graph.add_node("resume_parser", resume_parser)             # Parses resume content
-    graph.add_node("job_description_parser", job_description_parser) # Parses job descriptions
+    graph.add_node("get_user_profile", traced_node(get_user_profile))           # Fetch or initialize user data
+    graph.add_node("router", traced_node(router))                               # Routes user queries to agents
+    graph.add_node("general", traced_node(general))                             # Handles general/fallback queries
+    graph.add_node("course_recommender", traced_node(course_recommender))       # Suggests learning courses
+    graph.add_node("project_recommender", traced_node(project_recommender))     # Recommends projects
+    graph.add_node("interview_coach", traced_node(interview_coach))             # Prepares user for interviews
+    graph.add_node("learning_path_advisor", traced_node(learning_path_advisor)) # Suggests learning paths
+    graph.add_node("resume_builder", traced_node(resume_builder))               # Builds or optimizes resumes
+    graph.add_node("skill_analyzer", traced_node(skill_analyzer))               # Analyzes user skills
+    graph.add_node("resume_parser", traced_node(resume_parser))                 # Parses resume content
+    graph.add_node("job_description_parser", traced_node(job_description_parser)) # Parses job descriptions
+    graph.add_node("job_matcher", traced_node(job_matcher))                     # Ranks stored JDs for the user
+    graph.add_node("intent_worker", traced_node(intent_worker))                 # Runs one agent of a multi-part message
+    graph.add_node("merge_responses", traced_node(merge_responses))             # Joins the parallel agents' replies
 
     # Define Graph Edges and Logic
 
@@ -52,14 +81,12 @@ def build_graph() -> StateGraph:
     graph.add_edge("get_user_profile", "router")
 
     # Conditional routing from router to the appropriate agent
+    # (several agents → parallel `intent_worker` tasks via Send, then merge_responses)
     graph.add_conditional_edges(
         "router",
-        lambda state: (
-            state["agent_action"]
-            if state["agent_action"] not in ["interview_coach", "resume_builder"]
-            else "parser"
-        ),
+        after_router,
         {
+            "end": END,
             "course_recommender": "course_recommender",
             "project_recommender": "project_recommender",
             "parser": "resume_parser",
@@ -70,16 +97,21 @@ def build_graph() -> StateGraph:
     )
 
     # Parser flow: resume → job description → specific agent
+    # (job_matcher too, so JDs pasted with the question join the library first)
     graph.add_edge("resume_parser", "job_description_parser")
     graph.add_conditional_edges(
         "job_description_parser",
-        lambda state: state["agent_action"],
+        after_parsers,
         {
             "resume_builder": "resume_builder",
             "interview_coach": "interview_coach",
+            "job_matcher": "job_matcher",
         },
     )
 
+    # Fan-in: merge once every worker has answered
+    graph.add_edge("intent_worker", "merge_responses")
+
     # Define Endpoints
     for end_node in [
         "course_recommender",
@@ -88,11 +120,13 @@ def build_graph() -> StateGraph:
         "learning_path_advisor",
         "resume_builder",
         "skill_analyzer",
+        "job_matcher",
         "general",
+        "merge_responses",
     ]:
         graph.add_edge(end_node, END)
 
     # Compile Final Graph App
-    app = graph.compile()
+    app = graph.compile(checkpointer=checkpointer)
 
     return app
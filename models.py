@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
@@ -10,7 +11,7 @@ class User(db.Model):
 
 class Education(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     degree = db.Column(db.String(100))
     university = db.Column(db.String(200))
     start_date = db.Column(db.String(50))
@@ -19,13 +20,13 @@ class Education(db.Model):
 
 class Certification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     name = db.Column(db.String(200))
     organization = db.Column(db.String(200))
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     name = db.Column(db.String(200))
     start_date = db.Column(db.String(50))
     end_date = db.Column(db.String(50))
@@ -33,7 +34,7 @@ class Project(db.Model):
 
 class Experience(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     title = db.Column(db.String(200))
     company = db.Column(db.String(200))
     start_date = db.Column(db.String(50))
@@ -43,5 +44,134 @@ class Experience(db.Model):
 
 class Skill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     name = db.Column(db.String(100))
+
+class ChatTurn(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    user_text = db.Column(db.Text)
+    bot_text = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AgentResult(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    run_name = db.Column(db.String(100), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    agent = db.Column(db.String(50))
+    status = db.Column(db.String(20))
+    response = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class BatchCheckpoint(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    run_name = db.Column(db.String(100), unique=True, nullable=False)
+    agent = db.Column(db.String(50))
+    last_user_id = db.Column(db.Integer, default=0)
+    processed = db.Column(db.Integer, default=0)
+    failed = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TokenUsage(db.Model):
+    # Daily rollup of LLM tokens per user, node and model (user_id NULL: calls outside a user's turn)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    day = db.Column(db.Date, nullable=False)
+    node = db.Column(db.String(50))
+    model = db.Column(db.String(100))
+    input_tokens = db.Column(db.Integer, default=0)
+    output_tokens = db.Column(db.Integer, default=0)
+    calls = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'node', 'model', name='uq_token_usage_key'),
+        db.Index('ix_token_usage_user_day', 'user_id', 'day'),
+    )
+
+class ChatRequest(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    request_key = db.Column(db.String(64), unique=True, nullable=False)
+    idempotency_key = db.Column(db.String(64), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    status = db.Column(db.String(20))
+    response = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+class LearningPathRecord(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    target_role = db.Column(db.String(200))
+    required_skills = db.Column(db.Text)       # JSON list
+    recommended_resources = db.Column(db.Text) # JSON list
+    summary = db.Column(db.Text)
+    profile_snapshot = db.Column(db.Text)      # JSON: profile the path was last reconciled with
+    version = db.Column(db.Integer, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    steps = db.relationship('LearningPathStep', backref='path', order_by='LearningPathStep.position',
+                            cascade='all, delete-orphan')
+
+class LearningPathStep(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    path_id = db.Column(db.Integer, db.ForeignKey('learning_path_record.id'), index=True)
+    position = db.Column(db.Integer)
+    skill = db.Column(db.String(100))
+    description = db.Column(db.Text)
+    completed = db.Column(db.Boolean, default=False)
+    completed_at = db.Column(db.DateTime)
+
+class InterviewQuestion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    role_key = db.Column(db.String(200), nullable=False)   # normalized job title
+    level_key = db.Column(db.String(20), nullable=False)   # entry / mid / senior / any
+    skill_key = db.Column(db.String(100), nullable=False)  # normalized skill ('' for behavioral)
+    kind = db.Column(db.String(20), default='technical')   # technical / behavioral
+    question = db.Column(db.Text, nullable=False)
+    question_hash = db.Column(db.String(64), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_interview_question_lookup', 'role_key', 'level_key', 'skill_key'),)
+
+class CandidateResume(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of the file bytes
+    filename = db.Column(db.String(300))
+    status = db.Column(db.String(20))             # parsed / not_resume / failed
+    name = db.Column(db.String(200))
+    email = db.Column(db.String(200))
+    total_experience_years = db.Column(db.Float)
+    data = db.Column(db.Text)                     # JSON: ResumeModel fields
+    resume_text = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class JobPosting(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)   # who added it first
+    source_hash = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of the normalized JD text
+    job_title = db.Column(db.String(200))
+    company = db.Column(db.String(200))
+    required_skills = db.Column(db.Text)     # JSON list
+    responsibilities = db.Column(db.Text)    # JSON list
+    experience_level = db.Column(db.String(100))
+    summary = db.Column(db.Text)
+    minhash = db.Column(db.LargeBinary)      # MinHash signature of the JD text
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    bands = db.relationship('JobPostingBand', backref='posting', cascade='all, delete-orphan')
+
+class JobPostingBand(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    posting_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), index=True)
+    band_key = db.Column(db.String(40), index=True)   # LSH bucket: "<band>:<hash>"
+
+class JobPostingUser(db.Model):
+    # Users who shared a posting (the library row is shared; ownership is per user)
+    id = db.Column(db.Integer, primary_key=True)
+    posting_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (db.UniqueConstraint('posting_id', 'user_id', name='uq_job_posting_user'),)
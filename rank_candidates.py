@@ -0,0 +1,133 @@
+"""
+Rank ingested candidate resumes against one job description.
+
+Scores every parsed `CandidateResume` (see bulk_ingest.py) locally with NumPy:
+skill coverage, experience-level match and TF-IDF similarity between the JD and
+the resume text. Only the optional narratives for the shortlist use the LLM
+(one call for the whole shortlist).
+
+Usage:
+    python rank_candidates.py job_post.txt --top-k 20
+    python rank_candidates.py parsed_jd.json --top-k 10 --narratives 5
+    python rank_candidates.py job_post.txt --json > ranking.json
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import BaseModel, Field
+from langchain_core.prompts import ChatPromptTemplate
+
+from utils.candidate_ranker import load_candidate_matrix
+from utils.llm_governor import llm_context
+from utils.usage import usage_ledger
+
+
+class CandidateNarrative(BaseModel):
+    """Recruiter-facing note about one shortlisted candidate."""
+    candidate_id: int = Field(description="Id of the candidate as given in the shortlist.")
+    narrative: str = Field(description="2–3 sentences on fit, strengths and gaps for this role.")
+
+class ShortlistNarratives(BaseModel):
+    """Notes for every shortlisted candidate."""
+    narratives: List[CandidateNarrative] = Field(description="One entry per shortlisted candidate.")
+
+
+def load_job_description(path: str) -> dict:
+    """
+    Load a JD: a JSON file with `JobDescriptionModel` fields is used as-is,
+    any other text file is parsed with the JD parser (one LLM call).
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+
+    from agents.job_description_parser_agent import parse_job_description
+    parsed = parse_job_description(content)
+    if not parsed.is_job_description:
+        raise ValueError(f"{path} does not look like a job description.")
+    return parsed.model_dump()
+
+
+def write_narratives(jd: dict, shortlist: List[dict]) -> dict:
+    """Ask the LLM for a short narrative per shortlisted candidate. Returns {candidate_id: text}."""
+    from utils.llm import get_node_llm
+
+    prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            """
+            You are a recruiting assistant for CareerGraph AI. For each shortlisted
+            candidate, write 2–3 factual sentences on fit for the role, based only on
+            the scores and skills given. Do not invent experience.
+            """
+        ),
+        (
+            "human",
+            """
+            Role: {job_title} ({experience_level})
+            Required Skills: {required_skills}
+
+            Shortlist:
+            {shortlist}
+            """
+        ),
+    ])
+    chain = prompt | get_node_llm("candidate_narratives").with_structured_output(ShortlistNarratives)
+    response = chain.invoke({
+        "job_title": jd.get("job_title", ""),
+        "experience_level": jd.get("experience_level", "") or "level not stated",
+        "required_skills": ", ".join(jd.get("required_skills", [])),
+        "shortlist": "\n".join(f"- id={c['candidate_id']} {c['name']}: {c['explanation']}" for c in shortlist),
+    })
+    return {n.candidate_id: n.narrative for n in response.narratives}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank ingested candidates against a job description.")
+    parser.add_argument("jd", help="Job description text file, or JSON with JobDescriptionModel fields.")
+    parser.add_argument("--top-k", type=int, default=10, help="Candidates to return (default: 10).")
+    parser.add_argument("--narratives", type=int, default=0,
+                        help="Write LLM narratives for the best N candidates (default: 0 = none).")
+    parser.add_argument("--json", action="store_true", help="Print the ranking as JSON.")
+    args = parser.parse_args()
+
+    from app import app as flask_app
+
+    with flask_app.app_context(), llm_context(priority="batch"):
+        jd = load_job_description(args.jd)
+
+        started = time.perf_counter()
+        matrix = load_candidate_matrix()
+        loaded = time.perf_counter()
+        ranking = matrix.rank(jd, top_k=args.top_k)
+        scored = time.perf_counter()
+
+        if args.narratives and ranking:
+            notes = write_narratives(jd, ranking[:args.narratives])
+            for candidate in ranking:
+                if candidate["candidate_id"] in notes:
+                    candidate["narrative"] = notes[candidate["candidate_id"]]
+            usage_ledger.flush()   # LLM tokens (TokenUsage)
+
+    if args.json:
+        print(json.dumps({"job_description": jd, "ranking": ranking}, indent=2))
+        return
+
+    print(f"🎯 {jd.get('job_title') or 'Job description'} — {len(matrix)} candidates "
+          f"(loaded in {loaded - started:.2f}s, scored in {(scored - loaded) * 1000:.0f} ms)\n")
+    for position, candidate in enumerate(ranking, start=1):
+        print(f"{position}. {candidate['name']} (id {candidate['candidate_id']}) — score {candidate['score']:.3f}")
+        print(f"   {candidate['explanation']}")
+        if candidate.get("narrative"):
+            print(f"   📝 {candidate['narrative']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 # Import typing utilities for structured data representation
-from typing import TypedDict, Literal, List, Dict, Optional, Any
+from typing import TypedDict, Literal, List, Dict, Optional, Any, Annotated
 
 # Define a schema for user projects
 class Project(TypedDict):
@@ -31,6 +31,13 @@ class Experience(TypedDict):
     location: str
     description: str
 
+# Reducer for replies of agents running in parallel: each adds its own entry;
+# `None` resets (the state is checkpointed, so old replies would otherwise carry over)
+def merge_intent_responses(current: Optional[Dict[str, str]], new: Optional[Dict[str, str]]) -> Dict[str, str]:
+    if new is None:
+        return {}
+    return {**(current or {}), **new}
+
 # Define the central state structure used by agents
 class State(TypedDict):
     # User input text or query
@@ -45,9 +52,16 @@ class State(TypedDict):
             "learning_path_advisor",
             "resume_builder",
             "skill_analyzer",
+            "job_matcher",
         ]
     ]
 
+    # Every agent routed for this message, in the order asked (agent_action is the first)
+    agent_actions: Optional[List[str]]
+
+    # Replies of agents run in parallel for a multi-part message, keyed by agent
+    intent_responses: Annotated[Optional[Dict[str, str]], merge_intent_responses]
+
     # Structured user information
     skills: Optional[List[str]]
     certifications: Optional[List[Certification]]
@@ -61,6 +75,12 @@ class State(TypedDict):
     # Model-generated response text
     response: Optional[str]
 
+    # True when the router reused a speculatively started agent's response
+    speculative_hit: Optional[bool]
+
+    # Epoch seconds by which this turn must answer (None = no limit); see utils/deadline.py
+    deadline: Optional[float]
+
     # Additional metadata or runtime information
     metadata: Optional[Dict]
     user_id: Optional[int]
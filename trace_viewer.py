@@ -0,0 +1,181 @@
+"""
+Inspect request traces written by utils/tracing.py.
+
+Lists the slowest traced chat turns, draws the waterfall of one turn, or shows
+where time goes across many turns as a flame view (aggregated span tree, or
+folded stacks for flamegraph.pl / speedscope).
+
+Usage:
+    python trace_viewer.py slowest -n 20
+    python trace_viewer.py show 3f9a1c            # trace id or unique prefix
+    python trace_viewer.py flame --slowest 50      # aggregate the 50 slowest turns
+    python trace_viewer.py flame 3f9a1c --folded > turn.folded
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from config import TRACE_BACKUP_COUNT, TRACE_FILE
+
+# Span attributes shown next to each waterfall row
+SHOWN_ATTRIBUTES = (
+    "node", "model", "schema", "agent", "table", "rows", "input_tokens", "output_tokens",
+    "queue_wait", "retries", "small_talk", "prefetch", "file",
+)
+
+
+def load_traces(path: str = TRACE_FILE) -> List[dict]:
+    """Read all traces from the JSONL file and its rotated backups (oldest first)."""
+    # Backups rotate as <file>.1 (newest) … <file>.N (oldest)
+    backups = [f"{path}.{i}" for i in range(TRACE_BACKUP_COUNT, 0, -1)]
+    traces = []
+    for name in [f for f in backups + [path] if os.path.exists(f)]:
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        traces.append(json.loads(line))
+                    except ValueError:
+                        continue   # partially written line
+    return traces
+
+
+def find_trace(traces: List[dict], trace_id: str) -> dict:
+    matches = [t for t in traces if t["trace_id"].startswith(trace_id)]
+    if len(matches) != 1:
+        raise SystemExit(f"{len(matches)} traces match '{trace_id}'.")
+    return matches[0]
+
+
+def _children(spans: List[dict]) -> Dict[str, List[dict]]:
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+    for group in children.values():
+        group.sort(key=lambda s: s["start"])
+    return children
+
+
+def _walk(children: Dict[str, List[dict]], parent_id=None, depth: int = 0):
+    for span in children.get(parent_id, []):
+        yield span, depth
+        yield from _walk(children, span["span_id"], depth + 1)
+
+
+def _label(span: dict) -> str:
+    attributes = span.get("attributes") or {}
+    details = " ".join(f"{k}={attributes[k]}" for k in SHOWN_ATTRIBUTES if attributes.get(k) not in (None, ""))
+    return f"{span['name']} {details}".strip() + (" ❌" if span.get("error") else "")
+
+
+def print_slowest(traces: List[dict], count: int) -> None:
+    print(f"{'trace':<10} {'started':<19} {'ms':>8}  {'spans':>5}  {'llm':>3}  slowest span")
+    for trace in sorted(traces, key=lambda t: t["duration"], reverse=True)[:count]:
+        spans = [s for s in trace["spans"] if s["parent_id"] is not None and s["duration"] is not None]
+        slowest = max(spans, key=lambda s: s["duration"], default=None)
+        llm_calls = sum(1 for s in spans if s["name"] == "llm")
+        print(
+            f"{trace['trace_id'][:8]:<10} "
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(trace['start']))} "
+            f"{trace['duration'] * 1000:>8.0f}  {len(trace['spans']):>5}  {llm_calls:>3}  "
+            + (f"{_label(slowest)} ({slowest['duration'] * 1000:.0f} ms)" if slowest else "-")
+            + (f"  ❌ {trace['error']}" if trace.get("error") else "")
+        )
+
+
+def print_waterfall(trace: dict, width: int = 50) -> None:
+    """One row per span, indented by depth, with a bar placed on the trace's timeline."""
+    total = max(trace["duration"], 1e-9)
+    print(f"trace {trace['trace_id']}  {trace['name']}  {total * 1000:.0f} ms  {trace.get('attributes') or ''}\n")
+    for span, depth in _walk(_children(trace["spans"])):
+        duration = span["duration"] or 0.0
+        offset = int((span["start"] - trace["start"]) / total * width)
+        length = max(1, int(round(duration / total * width)))
+        bar = " " * min(offset, width - 1) + "█" * min(length, width - min(offset, width - 1))
+        print(f"{bar:<{width}} │ {duration * 1000:>7.0f} ms  {'  ' * depth}{_label(span)}")
+
+
+def flame_tree(traces: List[dict]) -> Dict[tuple, list]:
+    """Aggregate span time by stack (root → span names): {stack: [total seconds, count]}."""
+    stacks = defaultdict(lambda: [0.0, 0])
+    for trace in traces:
+        children = _children(trace["spans"])
+        path = {}
+        for span, _ in _walk(children):
+            name = span["name"] + (f"({span['attributes']['node']})" if (span.get("attributes") or {}).get("node") else "")
+            stack = path.get(span["parent_id"], ()) + (name,)
+            path[span["span_id"]] = stack
+            stacks[stack][0] += span["duration"] or 0.0
+            stacks[stack][1] += 1
+    return stacks
+
+
+def print_flame(traces: List[dict], folded: bool, width: int = 40) -> None:
+    stacks = flame_tree(traces)
+    if folded:
+        # Self time per stack, in microseconds (flamegraph.pl / speedscope input)
+        for stack, (total, _) in sorted(stacks.items()):
+            child_time = sum(t for s, (t, _) in stacks.items() if len(s) == len(stack) + 1 and s[:-1] == stack)
+            self_time = max(total - child_time, 0.0)
+            if self_time > 0:
+                print(f"{';'.join(stack)} {int(self_time * 1e6)}")
+        return
+
+    roots = sum(t for s, (t, _) in stacks.items() if len(s) == 1) or 1e-9
+    print(f"{len(traces)} traces, {roots * 1000:.0f} ms total\n")
+
+    def visit(prefix: tuple):
+        level = sorted(
+            ((s, v) for s, v in stacks.items() if len(s) == len(prefix) + 1 and s[:-1] == prefix),
+            key=lambda item: -item[1][0],
+        )
+        for stack, (total, count) in level:
+            # Parallel spans (fan-out workers) can add up to more than their parent
+            bar = "█" * min(width, max(1, int(round(total / roots * width))))
+            print(f"{bar:<{width}} {total / roots * 100:5.1f}% {total * 1000:>9.0f} ms ×{count:<4} {'  ' * (len(stack) - 1)}{stack[-1]}")
+            visit(stack)
+
+    visit(())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect CareerGraph AI request traces.")
+    parser.add_argument("--file", default=TRACE_FILE, help=f"Trace file (default: {TRACE_FILE}).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    slowest = commands.add_parser("slowest", help="List the slowest traces.")
+    slowest.add_argument("-n", type=int, default=10, help="Number of traces (default: 10).")
+
+    show = commands.add_parser("show", help="Waterfall view of one trace.")
+    show.add_argument("trace_id", help="Trace id or a unique prefix.")
+    show.add_argument("--width", type=int, default=50, help="Timeline width in characters.")
+
+    flame = commands.add_parser("flame", help="Flame view: time per span stack.")
+    flame.add_argument("trace_id", nargs="?", help="Only this trace (default: all traces).")
+    flame.add_argument("--slowest", type=int, help="Only the N slowest traces.")
+    flame.add_argument("--folded", action="store_true", help="Print folded stacks (flamegraph.pl / speedscope).")
+
+    args = parser.parse_args()
+    traces = load_traces(args.file)
+    if not traces:
+        sys.exit(f"No traces in {args.file}.")
+
+    if args.command == "slowest":
+        print_slowest(traces, args.n)
+    elif args.command == "show":
+        print_waterfall(find_trace(traces, args.trace_id), args.width)
+    else:
+        if args.trace_id:
+            traces = [find_trace(traces, args.trace_id)]
+        elif args.slowest:
+            traces = sorted(traces, key=lambda t: t["duration"], reverse=True)[:args.slowest]
+        print_flame(traces, args.folded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+
+from config import RANK_WEIGHTS
+from models import db, CandidateResume
+from utils.question_bank import normalize_level, normalize_skill_key
+from utils.text_index import tokenize
+
+# Experience level → (min, max) years considered a full match
+LEVEL_YEARS = {"entry": (0.0, 2.0), "mid": (2.0, 5.0), "senior": (5.0, math.inf)}
+MIN_YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:-\s*(\d+(?:\.\d+)?)\s*)?(?:years|yrs)", re.I)
+
+
+def experience_range(experience_level: str) -> Optional[Tuple[float, float]]:
+    """
+    Years-of-experience range a JD asks for ("3-5 years", "5+ years", "Senior").
+
+    Returns:
+        tuple | None: (min, max) years, or None if the JD states no level.
+    """
+    match = MIN_YEARS_PATTERN.search(experience_level or "")
+    if match:
+        low = float(match.group(1))
+        high = float(match.group(2)) if match.group(2) else math.inf
+        return low, high
+    return LEVEL_YEARS.get(normalize_level(experience_level or ""))
+
+
+def _csr(rows: List[List[Tuple[int, float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(row id per entry, column ids, values) of a ragged list of (column, value) rows."""
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    row_ids = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+    cols = np.fromiter((c for r in rows for c, _ in r), dtype=np.int64, count=int(lengths.sum()))
+    vals = np.fromiter((v for r in rows for _, v in r), dtype=np.float32, count=int(lengths.sum()))
+    return row_ids, cols, vals
+
+
+class CandidateMatrix:
+    """
+    Column-oriented snapshot of all parsed candidates for vectorized scoring.
+
+    - Skills: sparse candidate × skill incidence (skill names normalized with the
+      skill graph, so "JS" and "JavaScript" match).
+    - Text: sparse, L2-normalized TF-IDF rows over the resume text.
+    - Experience: dense array of total years.
+
+    Scoring a JD is a handful of NumPy gathers and `bincount` reductions over the
+    non-zero entries, independent of Python-level loops over candidates.
+    """
+
+    def __init__(self, candidates: List[dict]):
+        self.ids = np.asarray([c["id"] for c in candidates], dtype=np.int64)
+        self.names = [c["name"] for c in candidates]
+        self.skills = [c["skills"] for c in candidates]
+        self.years = np.asarray([c["years"] or 0.0 for c in candidates], dtype=np.float32)
+        n = len(candidates)
+
+        # Skill incidence
+        self.skill_vocab: Dict[str, int] = {}
+        skill_rows = []
+        for skills in self.skills:
+            keys = {normalize_skill_key(s) for s in skills if s}
+            skill_rows.append([(self.skill_vocab.setdefault(k, len(self.skill_vocab)), 1.0) for k in keys if k])
+        self.skill_row, self.skill_col, _ = _csr(skill_rows)
+
+        # TF-IDF over resume text
+        self.term_vocab: Dict[str, int] = {}
+        counts = []
+        for c in candidates:
+            tf = Counter(tokenize(c["text"]))
+            counts.append([(self.term_vocab.setdefault(t, len(self.term_vocab)), float(v)) for t, v in tf.items()])
+        self.text_row, self.text_col, tf_vals = _csr(counts)
+        df = np.bincount(self.text_col, minlength=len(self.term_vocab)).astype(np.float32)
+        self.idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        weights = (1.0 + np.log(tf_vals)) * self.idf[self.text_col] if len(tf_vals) else tf_vals
+        norms = np.sqrt(np.bincount(self.text_row, weights=weights ** 2, minlength=n))
+        self.text_val = (weights / np.maximum(norms[self.text_row], 1e-9)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _query_vector(self, text: str) -> np.ndarray:
+        """Dense L2-normalized TF-IDF vector of `text` over the candidate vocabulary."""
+        vector = np.zeros(len(self.term_vocab), dtype=np.float32)
+        for term, count in Counter(tokenize(text)).items():
+            col = self.term_vocab.get(term)
+            if col is not None:
+                vector[col] = (1.0 + math.log(count)) * self.idf[col]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def score(self, jd: dict) -> Dict[str, np.ndarray]:
+        """
+        Score every candidate against a parsed job description.
+
+        Args:
+            jd (dict): `JobDescriptionModel` fields.
+
+        Returns:
+            dict: Arrays of shape (len(self),): `coverage`, `experience`,
+            `similarity` and the weighted `total`.
+        """
+        n = len(self)
+        required = {normalize_skill_key(s) for s in jd.get("required_skills", []) if s}
+        required_cols = np.asarray([self.skill_vocab[k] for k in required if k in self.skill_vocab], dtype=np.int64)
+
+        # Skill coverage: share of the JD's skills the candidate lists
+        if required and len(required_cols):
+            hits = np.isin(self.skill_col, required_cols)
+            coverage = np.bincount(self.skill_row[hits], minlength=n) / len(required)
+        else:
+            coverage = np.zeros(n)
+
+        # Experience match: 1 inside the range, decaying with the distance to it
+        years_range = experience_range(jd.get("experience_level", ""))
+        if years_range is None:
+            experience = np.ones(n)
+        else:
+            low, high = years_range
+            gap = np.maximum(low - self.years, 0) + np.maximum(self.years - high, 0) * 0.5
+            experience = np.exp(-gap / 2.0)
+
+        # TF-IDF cosine similarity between the JD and each resume
+        jd_text = " ".join([
+            jd.get("job_title", ""), " ".join(jd.get("required_skills", [])),
+            " ".join(jd.get("responsibilities", [])), jd.get("summary", ""),
+        ])
+        query = self._query_vector(jd_text)
+        similarity = np.bincount(self.text_row, weights=self.text_val * query[self.text_col], minlength=n)
+
+        total = (
+            RANK_WEIGHTS["coverage"] * coverage
+            + RANK_WEIGHTS["experience"] * experience
+            + RANK_WEIGHTS["similarity"] * similarity
+        )
+        return {"coverage": coverage, "experience": experience, "similarity": similarity, "total": total}
+
+    def rank(self, jd: dict, top_k: int = 10) -> List[dict]:
+        """
+        Return the `top_k` best candidates for a JD with score breakdowns and explanations.
+
+        Args:
+            jd (dict): `JobDescriptionModel` fields.
+            top_k (int): Number of candidates to return.
+
+        Returns:
+            List[dict]: Best first; each with `candidate_id`, `name`, `score`, the
+            component scores, `matched_skills`, `missing_skills` and `explanation`.
+        """
+        if not len(self) or top_k <= 0:
+            return []
+        scores = self.score(jd)
+        total = scores["total"]
+        top_k = min(top_k, len(self))
+        best = np.argpartition(-total, top_k - 1)[:top_k]
+        best = best[np.argsort(-total[best], kind="stable")]
+
+        years_range = experience_range(jd.get("experience_level", ""))
+        results = []
+        for i in best:
+            candidate_keys = {normalize_skill_key(s): s for s in self.skills[i] if s}
+            matched = [s for s in jd.get("required_skills", []) if normalize_skill_key(s) in candidate_keys]
+            missing = [s for s in jd.get("required_skills", []) if normalize_skill_key(s) not in candidate_keys]
+            years = float(self.years[i])
+            if years_range is None:
+                experience_note = f"{years:g} yrs (no level stated)"
+            else:
+                low, high = years_range
+                wanted = f"{low:g}+" if math.isinf(high) else f"{low:g}–{high:g}"
+                experience_note = f"{years:g} yrs vs {wanted} wanted"
+            results.append({
+                "candidate_id": int(self.ids[i]),
+                "name": self.names[i],
+                "score": round(float(total[i]), 4),
+                "coverage": round(float(scores["coverage"][i]), 3),
+                "experience": round(float(scores["experience"][i]), 3),
+                "similarity": round(float(scores["similarity"][i]), 3),
+                "matched_skills": matched,
+                "missing_skills": missing,
+                "explanation": (
+                    f"Covers {len(matched)}/{len(jd.get('required_skills', []))} required skills"
+                    + (f" ({', '.join(matched)})" if matched else "")
+                    + f"; {experience_note}; text similarity {float(scores['similarity'][i]):.2f}"
+                    + (f"; missing: {', '.join(missing)}" if missing else "")
+                ),
+            })
+        return results
+
+
+_cache = {"key": None, "matrix": None}
+_cache_lock = threading.Lock()
+
+
+def load_candidate_matrix() -> CandidateMatrix:
+    """
+    Build (or reuse) the matrix of all parsed candidates.
+
+    The snapshot is cached per process and rebuilt only when candidates were
+    added or re-parsed since it was built.
+    """
+    key = db.session.query(
+        func.count(CandidateResume.id), func.max(CandidateResume.id), func.max(CandidateResume.updated_at),
+    ).filter(CandidateResume.status == "parsed").one()
+    with _cache_lock:
+        if _cache["key"] == tuple(key) and _cache["matrix"] is not None:
+            return _cache["matrix"]
+
+        candidates = []
+        query = (
+            db.session.query(CandidateResume.id, CandidateResume.name, CandidateResume.data,
+                             CandidateResume.resume_text, CandidateResume.total_experience_years)
+            .filter(CandidateResume.status == "parsed")
+            .order_by(CandidateResume.id)
+        )
+        for row_id, name, data, text, years in query.yield_per(1000):
+            parsed = json.loads(data or "{}")
+            candidates.append({
+                "id": row_id, "name": name or parsed.get("name") or f"Candidate {row_id}",
+                "skills": parsed.get("skills", []), "years": years, "text": text or "",
+            })
+        _cache["key"], _cache["matrix"] = tuple(key), CandidateMatrix(candidates)
+        return _cache["matrix"]
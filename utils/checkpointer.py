@@ -0,0 +1,26 @@
+import sqlite3
+from langgraph.checkpoint.sqlite import SqliteSaver
+from config import CHECKPOINT_DB_PATH
+
+
+def get_checkpointer(db_path: str = CHECKPOINT_DB_PATH) -> SqliteSaver:
+    """
+    Create a SQLite-backed LangGraph checkpointer.
+
+    Graph state (including parsed `metadata.job_description` / `metadata.resume_data`)
+    is stored per `thread_id`, so later turns of the same conversation start from
+    where the previous turn ended instead of from an empty state.
+
+    Args:
+        db_path (str, optional): SQLite file for checkpoints. Defaults to CHECKPOINT_DB_PATH.
+
+    Returns:
+        SqliteSaver: Checkpointer to pass to `build_graph()`.
+    """
+    # One connection per process, shared by request threads (SqliteSaver serializes access)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+    return SqliteSaver(conn)
@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from config import MEMORY_MAX_TURNS, MEMORY_RECENT_TURNS, MEMORY_TOKEN_BUDGET
+from models import db, ChatTurn
+from utils.text_index import BM25Index
+from utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+class _UserIndex:
+    """BM25 index over one user's chat turns, plus the turn texts it points to."""
+
+    def __init__(self):
+        self.index = BM25Index()
+        self.turns: List[Tuple[str, str]] = []
+        self.last_turn_id = 0
+
+
+class ConversationMemory:
+    """
+    Per-user retrieval memory over the full chat history.
+
+    Every completed turn (user message + bot reply) is stored in the `ChatTurn`
+    table and indexed with BM25. For each new message only the most recent
+    turn(s) plus the most relevant older turns are returned, capped by a token
+    budget, so the context passed to `manager()` stays constant in size no
+    matter how long the conversation gets.
+
+    Indexes live in-process and are synced incrementally from the database,
+    so several workers can serve the same user without missing turns.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = MEMORY_TOKEN_BUDGET,
+        max_turns: int = MEMORY_MAX_TURNS,
+        recent_turns: int = MEMORY_RECENT_TURNS,
+        max_cached_users: int = 256,
+    ):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.recent_turns = recent_turns
+        self.max_cached_users = max_cached_users
+        self._indexes: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record_turn(self, user_id: int, user_text: str, bot_text: str) -> None:
+        """
+        Persist a completed turn so it becomes retrievable on later messages.
+
+        Args:
+            user_id (int): Owner of the conversation.
+            user_text (str): The user's message.
+            bot_text (str): The assistant's reply.
+        """
+        db.session.add(ChatTurn(user_id=user_id, user_text=user_text, bot_text=bot_text))
+        db.session.commit()
+
+    def _get_index(self, user_id: int) -> _UserIndex:
+        # Caller must hold self._lock
+        user_index = self._indexes.get(user_id)
+        if user_index is None:
+            user_index = _UserIndex()
+            self._indexes[user_id] = user_index
+            while len(self._indexes) > self.max_cached_users:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(user_id)
+
+        # Pull only turns written since the last sync (possibly by another worker)
+        new_turns = (
+            ChatTurn.query
+            .filter(ChatTurn.user_id == user_id, ChatTurn.id > user_index.last_turn_id)
+            .order_by(ChatTurn.id)
+            .all()
+        )
+        for turn in new_turns:
+            user_text = turn.user_text or ""
+            bot_text = turn.bot_text or ""
+            user_index.index.add(f"{user_text}\n{bot_text}")
+            user_index.turns.append((user_text, bot_text))
+            user_index.last_turn_id = turn.id
+
+        return user_index
+
+    def _format_turn(self, user_text: str, bot_text: str, max_tokens: int) -> List[str]:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(bot_text) > max_chars:
+            bot_text = bot_text[:max_chars].rstrip() + " …"
+        return [f"user : {user_text}", f"bot : {bot_text}"]
+
+    def retrieve(self, user_id: int, query: str) -> List[str]:
+        """
+        Select the past turns worth sending along with the current message.
+
+        Always keeps the most recent turn(s) for follow-up questions, then adds
+        older turns in BM25 relevance order until `max_turns` or the token budget
+        is reached. Returned lines are in chronological order and use the same
+        "sender : text" format as the session chat history.
+
+        Args:
+            user_id (int): Owner of the conversation.
+            query (str): The user's current message.
+
+        Returns:
+            List[str]: Memory lines to pass to `manager()`.
+        """
+        with self._lock:
+            user_index = self._get_index(user_id)
+            n_turns = len(user_index.turns)
+            if n_turns == 0:
+                return []
+
+            recent = list(range(max(0, n_turns - self.recent_turns), n_turns))
+            relevant = [i for i, _ in user_index.index.search(query, top_k=self.max_turns + len(recent))]
+            turns = list(user_index.turns)
+
+        # A single turn may use at most half the budget so one long reply can't crowd out the rest
+        per_turn_tokens = max(self.token_budget // 2, 1)
+        selected: Dict[int, List[str]] = {}
+        used = 0
+        for i in recent + relevant:
+            if i in selected or len(selected) >= self.max_turns:
+                continue
+            lines = self._format_turn(*turns[i], max_tokens=per_turn_tokens)
+            cost = estimate_tokens("\n".join(lines))
+            if used + cost > self.token_budget:
+                continue
+            selected[i] = lines
+            used += cost
+
+        return [line for i in sorted(selected) for line in selected[i]]
+
+
+# Shared instance used by the Flask app
+conversation_memory = ConversationMemory()
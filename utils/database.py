@@ -0,0 +1,65 @@
+from sqlalchemy import event, inspect
+
+from config import SQLITE_BUSY_TIMEOUT_MS, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS
+from models import db
+from utils.metrics import metrics
+
+
+def configure_sqlite(engine) -> None:
+    """
+    Apply the SQLite concurrency settings (journal mode, busy timeout,
+    synchronous level) to every new connection of `engine`. No-op for other
+    backends.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        finally:
+            cursor.close()
+
+
+def ensure_indexes(engine) -> int:
+    """
+    Create indexes declared in `models.py` that an existing database lacks
+    (`create_all` only creates missing tables, not indexes on existing ones).
+
+    Returns:
+        int: Number of indexes created.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = 0
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine, checkfirst=True)
+                created += 1
+    if created:
+        metrics.incr("db.indexes_created", created)
+    return created
+
+
+def init_database(app) -> None:
+    """
+    Bind the models to the Flask app (SQLALCHEMY_DATABASE_URI / DATABASE_URL and
+    SQLALCHEMY_ENGINE_OPTIONS from config.py), tune SQLite connections, and
+    create missing tables and indexes.
+
+    Args:
+        app (Flask): Application whose config holds the database settings.
+    """
+    db.init_app(app)
+    with app.app_context():
+        configure_sqlite(db.engine)
+        db.create_all()
+        ensure_indexes(db.engine)
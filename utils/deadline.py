@@ -0,0 +1,47 @@
+import time
+from typing import Optional
+
+from config import CHAT_DEADLINE_SECONDS, DEADLINE_STAGE_RESERVE_SECONDS
+from utils.llm_governor import current_llm_context
+from utils.metrics import metrics
+
+# Reply when a turn runs out of time before an answer was produced
+DEADLINE_FALLBACK_RESPONSE = (
+    "Sorry, this is taking longer than expected ⏳. Please try again in a moment "
+    "or ask a shorter question."
+)
+
+
+def new_deadline(seconds: float = CHAT_DEADLINE_SECONDS) -> float:
+    """Deadline (wall-clock epoch seconds) of a turn starting now."""
+    return time.time() + seconds
+
+
+def remaining(state: dict = None) -> Optional[float]:
+    """
+    Seconds left before the turn's deadline (may be negative); None without a deadline.
+
+    The deadline is read from `state["deadline"]`, else from the active
+    `llm_context(deadline=...)`.
+    """
+    deadline = (state or {}).get("deadline") or current_llm_context().get("deadline")
+    return None if deadline is None else deadline - time.time()
+
+
+def has_time_for(stage: str, state: dict = None) -> bool:
+    """
+    Return True if the optional `stage` fits in the remaining budget
+    (DEADLINE_STAGE_RESERVE_SECONDS). A skipped stage is counted in
+    `deadline.degraded{stage=...}`.
+
+    Turns in economy mode (`llm_context(economy=True)`, user near the token
+    quota; see utils/usage.py) skip every optional stage (`quota.degraded`).
+    """
+    if current_llm_context().get("economy"):
+        metrics.incr("quota.degraded", stage=stage)
+        return False
+    left = remaining(state)
+    if left is None or left >= DEADLINE_STAGE_RESERVE_SECONDS.get(stage, 0):
+        return True
+    metrics.incr("deadline.degraded", stage=stage)
+    return False
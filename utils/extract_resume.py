@@ -1,33 +1,72 @@
+import io
+from typing import Union
+
 import fitz  # PyMuPDF — for reading PDF files
 from docx import Document  # for reading .docx files
+from utils.tracing import tracer
 
-def extract_resume_text(file_path: str) -> str:
-    """
-    Extract clean text from resume files (.pdf or .docx).
 
-    Automatically detects the file type and extracts textual content accordingly.
+def _extract_text(source: Union[str, bytes], filename: str) -> str:
+    """
+    Extract text from a resume given as a file path or as raw bytes.
 
     Args:
-        file_path (str): Path to the resume file.
+        source (str | bytes): Path to the file, or its content.
+        filename (str): File name, used to detect the file type.
 
     Returns:
         str: Extracted plain text content.
     """
+    name = filename.lower()
+    in_memory = isinstance(source, bytes)
 
     # Handle PDF resume extraction
-    if file_path.endswith(".pdf"):
+    if name.endswith(".pdf"):
         text = ""
-        with fitz.open(file_path) as pdf:
+        with (fitz.open(stream=source, filetype="pdf") if in_memory else fitz.open(source)) as pdf:
             for page in pdf:
                 text += page.get_text("text") + "\n"
         return text.strip()
 
     # Handle DOCX resume extraction
-    elif file_path.endswith(".docx"):
-        doc = Document(file_path)
+    elif name.endswith(".docx"):
+        doc = Document(io.BytesIO(source) if in_memory else source)
         text = "\n".join([p.text for p in doc.paragraphs])
         return text.strip()
 
     # Unsupported file format
     else:
         raise ValueError("Unsupported file type. Please upload a PDF or DOCX resume.")
+
+
+@tracer.traced("extract_resume")
+def extract_resume_text(file_path: str) -> str:
+    """
+    Extract clean text from resume files (.pdf or .docx).
+
+    Automatically detects the file type and extracts textual content accordingly.
+
+    Args:
+        file_path (str): Path to the resume file.
+
+    Returns:
+        str: Extracted plain text content.
+    """
+    return _extract_text(file_path, file_path)
+
+
+@tracer.traced("extract_resume")
+def extract_resume_bytes(data: bytes, filename: str) -> str:
+    """
+    Extract clean text from the raw bytes of a resume file (.pdf or .docx).
+
+    Used when the file is not on disk as-is (e.g. a member of a zip archive).
+
+    Args:
+        data (bytes): File content.
+        filename (str): Original file name, used to detect the file type.
+
+    Returns:
+        str: Extracted plain text content.
+    """
+    return _extract_text(data, filename)
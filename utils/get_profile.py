@@ -1,7 +1,17 @@
 from models import db, User, Education, Certification, Project, Skill, Experience
+from utils.tracing import tracer
+
+
+def _query_all(model, user_id: int) -> list:
+    # One traced `db` span per profile table
+    with tracer.span("db", table=model.__tablename__) as span:
+        rows = model.query.filter_by(user_id=user_id).all()
+        span.set(rows=len(rows))
+        return rows
 
 def get_user_profile_from_db(user_id: int) -> dict:
-    user = User.query.get(user_id)
+    with tracer.span("db", table="user"):
+        user = User.query.get(user_id)
     if not user:
         return {"error": "User not found"}
 
@@ -10,20 +20,66 @@ def get_user_profile_from_db(user_id: int) -> dict:
         "education": [
             {"degree": e.degree, "university": e.university,
              "start_date": e.start_date, "end_date": e.end_date, "cgpa": e.cgpa}
-            for e in Education.query.filter_by(user_id=user_id).all()
+            for e in _query_all(Education, user_id)
         ],
         "certifications": [
             {"name": c.name, "organization": c.organization}
-            for c in Certification.query.filter_by(user_id=user_id).all()
+            for c in _query_all(Certification, user_id)
         ],
         "projects": [
             {"name": p.name, "start_date": p.start_date, "end_date": p.end_date, "description": p.description}
-            for p in Project.query.filter_by(user_id=user_id).all()
+            for p in _query_all(Project, user_id)
         ],
         "experience": [
             {"title": e.title, "company": e.company, "start_date": e.start_date,
              "end_date": e.end_date, "location": e.location, "description": e.description}
-            for e in Experience.query.filter_by(user_id=user_id).all()
+            for e in _query_all(Experience, user_id)
         ],
-        "skills": [s.name for s in Skill.query.filter_by(user_id=user_id).all()]
+        "skills": [s.name for s in _query_all(Skill, user_id)]
+    }
+
+def get_user_profiles_from_db(user_ids: list) -> dict:
+    """
+    Load the profiles of many users at once.
+
+    Issues one query per profile table for the whole batch instead of one per
+    user, which keeps offline jobs from hammering the database.
+
+    Args:
+        user_ids (list): IDs of the users to load.
+
+    Returns:
+        dict: Mapping of user_id → profile dict (same shape as `get_user_profile_from_db`).
+              Unknown IDs are omitted.
+    """
+    if not user_ids:
+        return {}
+
+    profiles = {
+        u.id: {
+            "user": {"id": u.id, "name": u.name, "email": u.email},
+            "education": [], "certifications": [], "projects": [], "experience": [], "skills": [],
+        }
+        for u in User.query.filter(User.id.in_(user_ids)).all()
     }
+
+    for e in Education.query.filter(Education.user_id.in_(list(profiles))).order_by(Education.id).all():
+        profiles[e.user_id]["education"].append(
+            {"degree": e.degree, "university": e.university,
+             "start_date": e.start_date, "end_date": e.end_date, "cgpa": e.cgpa}
+        )
+    for c in Certification.query.filter(Certification.user_id.in_(list(profiles))).order_by(Certification.id).all():
+        profiles[c.user_id]["certifications"].append({"name": c.name, "organization": c.organization})
+    for p in Project.query.filter(Project.user_id.in_(list(profiles))).order_by(Project.id).all():
+        profiles[p.user_id]["projects"].append(
+            {"name": p.name, "start_date": p.start_date, "end_date": p.end_date, "description": p.description}
+        )
+    for e in Experience.query.filter(Experience.user_id.in_(list(profiles))).order_by(Experience.id).all():
+        profiles[e.user_id]["experience"].append(
+            {"title": e.title, "company": e.company, "start_date": e.start_date,
+             "end_date": e.end_date, "location": e.location, "description": e.description}
+        )
+    for s in Skill.query.filter(Skill.user_id.in_(list(profiles))).order_by(Skill.id).all():
+        profiles[s.user_id]["skills"].append(s.name)
+
+    return profiles
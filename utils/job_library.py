@@ -0,0 +1,288 @@
+import hashlib
+import json
+import math
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+
+from config import JD_DUPLICATE_THRESHOLD, JOB_MATCH_WEIGHTS
+from models import db, JobPosting, JobPostingBand, JobPostingUser
+from utils.candidate_ranker import experience_range
+from utils.minhash import (
+    band_keys,
+    minhash_signature,
+    signature_from_bytes,
+    signature_similarity,
+    signature_to_bytes,
+)
+from utils.question_bank import normalize_skill_key
+from utils.resume_preparser import experience_years
+from utils.skill_graph import get_skill_graph
+from utils.text_index import tokenize
+
+
+def job_source_hash(text: str) -> str:
+    """Key of a pasted JD: whitespace/case-insensitive sha256 of its text."""
+    return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def posting_to_jd(posting: JobPosting) -> dict:
+    """Rebuild `JobDescriptionModel` fields from a stored posting."""
+    return {
+        "is_job_description": True,
+        "job_title": posting.job_title or "",
+        "company": posting.company or "",
+        "required_skills": json.loads(posting.required_skills or "[]"),
+        "responsibilities": json.loads(posting.responsibilities or "[]"),
+        "experience_level": posting.experience_level or "",
+        "summary": posting.summary or "",
+    }
+
+
+def find_near_duplicate(text: str, threshold: float = JD_DUPLICATE_THRESHOLD) -> Optional[tuple]:
+    """
+    Find a stored JD whose text is (nearly) the same as `text`.
+
+    Exact matches are found by text hash; otherwise LSH band keys of the MinHash
+    signature select candidate postings, and the best one is accepted if its
+    estimated Jaccard similarity reaches `threshold`.
+
+    Returns:
+        tuple | None: (JobPosting, similarity), or None if nothing is close enough.
+    """
+    exact = JobPosting.query.filter_by(source_hash=job_source_hash(text)).first()
+    if exact is not None:
+        return exact, 1.0
+
+    signature = minhash_signature(text)
+    candidate_ids = {
+        posting_id for (posting_id,) in
+        db.session.query(JobPostingBand.posting_id).filter(JobPostingBand.band_key.in_(band_keys(signature))).distinct()
+    }
+    if not candidate_ids:
+        return None
+
+    best, best_similarity = None, 0.0
+    for posting in JobPosting.query.filter(JobPosting.id.in_(candidate_ids), JobPosting.minhash.isnot(None)):
+        similarity = signature_similarity(signature, signature_from_bytes(posting.minhash))
+        if similarity > best_similarity:
+            best, best_similarity = posting, similarity
+    if best is None or best_similarity < threshold:
+        return None
+    return best, best_similarity
+
+
+def link_job_posting(posting: JobPosting, user_id: Optional[int]) -> None:
+    """Record that `user_id` shared `posting` (no-op if already linked or no user)."""
+    if posting is None or user_id is None:
+        return
+    if JobPostingUser.query.filter_by(posting_id=posting.id, user_id=user_id).first():
+        return
+    db.session.add(JobPostingUser(posting_id=posting.id, user_id=user_id))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Linked concurrently by another request of the same user
+        db.session.rollback()
+
+
+def user_posting_ids(user_id: int) -> set:
+    """Ids of the postings `user_id` shared (including ones first added by another user)."""
+    linked = db.session.query(JobPostingUser.posting_id).filter(JobPostingUser.user_id == user_id)
+    added = db.session.query(JobPosting.id).filter(JobPosting.user_id == user_id)
+    return {posting_id for (posting_id,) in linked.union(added)}
+
+
+def save_job_posting(parsed: dict, text: str, user_id: int = None) -> Optional[JobPosting]:
+    """
+    Add a parsed JD to the library with its MinHash signature and LSH bands
+    (no-op if the same text is already stored) and link it to the user.
+
+    Args:
+        parsed (dict): `JobDescriptionModel` fields.
+        text (str): Original JD text.
+        user_id (int, optional): User who pasted it.
+
+    Returns:
+        JobPosting | None: The stored (or existing) posting; None for non-JD input.
+    """
+    if not parsed.get("is_job_description"):
+        return None
+    source_hash = job_source_hash(text)
+    existing = JobPosting.query.filter_by(source_hash=source_hash).first()
+    if existing:
+        link_job_posting(existing, user_id)
+        return existing
+
+    posting = JobPosting(
+        user_id=user_id,
+        source_hash=source_hash,
+        job_title=parsed.get("job_title", ""),
+        company=parsed.get("company", ""),
+        required_skills=json.dumps(parsed.get("required_skills", [])),
+        responsibilities=json.dumps(parsed.get("responsibilities", [])),
+        experience_level=parsed.get("experience_level", ""),
+        summary=parsed.get("summary", ""),
+    )
+    signature = minhash_signature(text)
+    posting.minhash = signature_to_bytes(signature)
+    posting.bands = [JobPostingBand(band_key=key) for key in band_keys(signature)]
+    db.session.add(posting)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Stored concurrently by another request
+        db.session.rollback()
+        posting = JobPosting.query.filter_by(source_hash=source_hash).first()
+    link_job_posting(posting, user_id)
+    return posting
+
+
+def profile_experience_years(experience: List[dict]) -> float:
+    """Total years across profile experience entries ('March 2021' style dates; empty end = present)."""
+    spans = "\n".join(
+        f"{e.get('start_date')} - {e.get('end_date') or 'Present'}"
+        for e in experience or [] if e.get("start_date")
+    )
+    return experience_years(spans) or 0.0
+
+
+def profile_skill_keys(skills: List[str], certifications: List[dict]) -> set:
+    """
+    Normalized skills a profile covers: listed skills, certification names that
+    map onto known skills, and (through the skill graph) their prerequisites.
+    """
+    names = list(skills or []) + [c.get("name", "") for c in certifications or []]
+    keys = {normalize_skill_key(name) for name in names if name}
+    return (keys | get_skill_graph().satisfied(names)) - {""}
+
+
+class JobIndex:
+    """
+    In-memory inverted index over the JD library.
+
+    Postings map each normalized required skill and each title term to the
+    positions of the JDs that contain it, so a query only touches postings of
+    the user's own skills and titles. Per-JD arrays (skill count, experience
+    range) are kept alongside for vectorized scoring. New postings are pulled
+    from the database incrementally by id.
+    """
+
+    def __init__(self):
+        self.posting_ids: List[int] = []
+        self._skill_postings: Dict[str, List[int]] = {}
+        self._title_postings: Dict[str, List[int]] = {}
+        self._n_skills: List[int] = []
+        self._min_years: List[float] = []
+        self._max_years: List[float] = []
+        self._arrays: Dict[tuple, np.ndarray] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.posting_ids)
+
+    def _add(self, posting: JobPosting) -> None:
+        position = len(self.posting_ids)
+        self.posting_ids.append(posting.id)
+
+        skill_keys = {normalize_skill_key(s) for s in json.loads(posting.required_skills or "[]") if s} - {""}
+        for key in skill_keys:
+            self._skill_postings.setdefault(key, []).append(position)
+            self._arrays.pop(("skill", key), None)
+        for term in set(tokenize(posting.job_title or "")):
+            self._title_postings.setdefault(term, []).append(position)
+            self._arrays.pop(("title", term), None)
+
+        low, high = experience_range(posting.experience_level or "") or (0.0, math.inf)
+        self._n_skills.append(len(skill_keys))
+        self._min_years.append(low)
+        self._max_years.append(high)
+        self._arrays.pop(("meta",), None)
+
+    def refresh(self) -> None:
+        """Index postings added to the database since the last refresh."""
+        with self._lock:
+            for posting in (
+                JobPosting.query.filter(JobPosting.id > self._last_id).order_by(JobPosting.id).yield_per(1000)
+            ):
+                self._add(posting)
+                self._last_id = posting.id
+
+    def _postings(self, kind: str, key: str) -> np.ndarray:
+        arrays = self._arrays.get((kind, key))
+        if arrays is None:
+            source = self._skill_postings if kind == "skill" else self._title_postings
+            arrays = np.asarray(source.get(key, []), dtype=np.int64)
+            self._arrays[(kind, key)] = arrays
+        return arrays
+
+    def _meta(self) -> tuple:
+        meta = self._arrays.get(("meta",))
+        if meta is None:
+            meta = (
+                np.asarray(self._n_skills, dtype=np.float32),
+                np.asarray(self._min_years, dtype=np.float32),
+                np.asarray(self._max_years, dtype=np.float32),
+                np.asarray(self.posting_ids, dtype=np.int64),
+            )
+            self._arrays[("meta",)] = meta
+        return meta
+
+    def search(self, skill_keys: set, title_terms: set, years: float, top_k: int = 5,
+               allowed_ids: set = None) -> List[tuple]:
+        """
+        Rank stored JDs for a profile.
+
+        Args:
+            skill_keys (set): Output of `profile_skill_keys`.
+            title_terms (set): Tokens of the user's job titles / target roles.
+            years (float): User's total years of experience.
+            top_k (int): Number of results.
+            allowed_ids (set, optional): Restrict results to these posting ids.
+
+        Returns:
+            List[tuple]: (posting id, score, coverage, title match, experience fit), best first.
+        """
+        with self._lock:
+            n = len(self.posting_ids)
+            if not n or top_k <= 0:
+                return []
+            n_skills, min_years, max_years, ids = self._meta()
+
+            matched = np.zeros(n, dtype=np.float32)
+            for key in skill_keys:
+                matched[self._postings("skill", key)] += 1
+            title_hits = np.zeros(n, dtype=np.float32)
+            for term in title_terms:
+                title_hits[self._postings("title", term)] += 1
+
+        candidates = np.flatnonzero((matched > 0) | (title_hits > 0))
+        if allowed_ids is not None:
+            candidates = candidates[np.isin(ids[candidates], list(allowed_ids))]
+        if not len(candidates):
+            return []
+
+        coverage = matched[candidates] / np.maximum(n_skills[candidates], 1)
+        title = np.minimum(title_hits[candidates] / 2.0, 1.0)
+        gap = np.maximum(min_years[candidates] - years, 0) + np.maximum(years - max_years[candidates], 0) * 0.5
+        experience = np.exp(-gap / 2.0)
+        total = (
+            JOB_MATCH_WEIGHTS["coverage"] * coverage
+            + JOB_MATCH_WEIGHTS["title"] * title
+            + JOB_MATCH_WEIGHTS["experience"] * experience
+        )
+
+        top_k = min(top_k, len(candidates))
+        best = np.argpartition(-total, top_k - 1)[:top_k]
+        best = best[np.argsort(-total[best], kind="stable")]
+        return [
+            (int(ids[candidates[i]]), float(total[i]), float(coverage[i]), float(title[i]), float(experience[i]))
+            for i in best
+        ]
+
+
+# Process-wide JD index (refreshed incrementally before each query)
+job_index = JobIndex()
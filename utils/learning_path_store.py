@@ -0,0 +1,122 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from models import db, LearningPathRecord, LearningPathStep
+
+
+def normalize_skill(name: str) -> str:
+    """Case/whitespace-insensitive key for comparing skill names."""
+    return " ".join((name or "").lower().split())
+
+
+def profile_snapshot(state: dict) -> Dict[str, List[str]]:
+    """
+    Capture the parts of the profile a learning path depends on.
+
+    Args:
+        state (dict): Graph state after `get_user_profile`.
+
+    Returns:
+        dict: Sorted, normalized skill and certification names.
+    """
+    return {
+        "skills": sorted({normalize_skill(s) for s in state.get("skills") or [] if s}),
+        "certifications": sorted({
+            normalize_skill(c.get("name", "")) for c in state.get("certifications") or [] if c.get("name")
+        }),
+    }
+
+
+def diff_profiles(old: dict, new: dict) -> Dict[str, List[str]]:
+    """
+    Compare two profile snapshots.
+
+    Returns:
+        dict: `added_skills`, `removed_skills` and `added_certifications` (normalized names).
+    """
+    old_skills, new_skills = set(old.get("skills", [])), set(new.get("skills", []))
+    return {
+        "added_skills": sorted(new_skills - old_skills),
+        "removed_skills": sorted(old_skills - new_skills),
+        "added_certifications": sorted(set(new.get("certifications", [])) - set(old.get("certifications", []))),
+    }
+
+
+def get_latest_path(user_id: int) -> Optional[LearningPathRecord]:
+    """Return the user's most recently created learning path, if any."""
+    return (
+        LearningPathRecord.query
+        .filter_by(user_id=user_id)
+        .order_by(LearningPathRecord.id.desc())
+        .first()
+    )
+
+
+def save_new_path(user_id: int, target_role: str, required_skills: List[str], steps: Iterable[tuple],
+                  recommended_resources: List[str], summary: str, snapshot: dict) -> LearningPathRecord:
+    """
+    Persist a freshly generated learning path.
+
+    Args:
+        steps: (skill, description) pairs in roadmap order.
+
+    Returns:
+        LearningPathRecord: The stored path with its steps.
+    """
+    record = LearningPathRecord(
+        user_id=user_id,
+        target_role=target_role,
+        required_skills=json.dumps(required_skills),
+        recommended_resources=json.dumps(recommended_resources),
+        summary=summary,
+        profile_snapshot=json.dumps(snapshot),
+        version=1,
+    )
+    for position, (skill, description) in enumerate(steps, start=1):
+        record.steps.append(LearningPathStep(position=position, skill=skill, description=description))
+
+    db.session.add(record)
+    db.session.commit()
+    return record
+
+
+def mark_completed(record: LearningPathRecord, steps: Iterable[LearningPathStep]) -> List[LearningPathStep]:
+    """Mark pending steps as completed (not committed). Returns the steps that changed."""
+    changed = []
+    for step in steps:
+        if not step.completed:
+            step.completed = True
+            step.completed_at = datetime.utcnow()
+            changed.append(step)
+    return changed
+
+
+def commit_update(record: LearningPathRecord, snapshot: dict, changed: bool) -> None:
+    """Store the new profile snapshot and bump the version if any step changed."""
+    record.profile_snapshot = json.dumps(snapshot)
+    if changed:
+        record.version = (record.version or 1) + 1
+    db.session.commit()
+
+
+def format_learning_path(record: LearningPathRecord, updates: List[str] = None) -> str:
+    """Render a stored learning path as the chat reply text."""
+    required_skills = json.loads(record.required_skills or "[]")
+    resources = json.loads(record.recommended_resources or "[]")
+    steps = "\n".join(
+        f"{step.position}. {'✅' if step.completed else '⬜'} {step.skill} — {step.description}"
+        for step in record.steps
+    )
+    done = sum(1 for step in record.steps if step.completed)
+
+    output = (
+        f"🎯 Target Role: {record.target_role}\n\n"
+        f"🧩 Required Skills: {', '.join(required_skills)}\n\n"
+        f"🪜 Learning Roadmap ({done}/{len(record.steps)} completed):\n" + steps + "\n\n"
+        f"📘 Recommended Resources:\n" + "\n".join([f"- {r}" for r in resources]) + "\n\n"
+        f"📝 Summary: {record.summary}"
+    )
+    if updates:
+        output = "🔄 Updates: " + "; ".join(updates) + "\n\n" + output
+    return output
@@ -1,12 +1,106 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
+from langchain_core.runnables import RunnableLambda
 from langchain_google_genai import ChatGoogleGenerativeAI
+from config import LLM_MODEL_TIERS, NODE_MODEL_CONFIG, NODE_MODEL_CONFIG_PATH
+from utils.llm_governor import current_llm_context, llm_context, llm_governor
+from utils.metrics import metrics
+from utils.tokens import estimate_tokens
+from utils.tracing import tracer
+from utils.usage import usage_ledger
 
-def get_llm(model_name: str = "gemini-2.5-flash"):
+logger = logging.getLogger(__name__)
+
+# Output tokens charged up front when a model has no max_output_tokens set
+DEFAULT_OUTPUT_TOKEN_ESTIMATE = 1024
+
+
+def _finish_reason(generation) -> Optional[str]:
+    """Provider finish reason of a generation ("STOP", "MAX_TOKENS", ...), if reported."""
+    reason = (generation.generation_info or {}).get("finish_reason")
+    return reason or getattr(generation.message, "response_metadata", {}).get("finish_reason")
+
+
+def _usage_tokens(result) -> Optional[int]:
+    """Return input + output tokens reported by the provider for a ChatResult (None if absent)."""
+    total = 0
+    for generation in result.generations:
+        usage = getattr(generation.message, "usage_metadata", None)
+        if not usage:
+            return None
+        total += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+    return total
+
+
+class GovernedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """
+    Gemini chat model whose requests go through the shared `llm_governor`
+    (concurrency cap, rate limits, priorities and retry with backoff).
+
+    Governing `_generate` covers every way agents use the model: plain chains,
+    `with_structured_output`, and tool binding. Under a turn deadline
+    (`llm_context(deadline=...)`) the request timeout is the time left.
+    Token usage is recorded for the `llm_context` user and node (`usage_ledger`).
+    Replies cut off at `max_output_tokens` (which includes thinking tokens on
+    Gemini 2.5) are logged and counted in `llm.truncated`.
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        parent_generate = super()._generate
+        estimated_tokens = (
+            sum(estimate_tokens(str(m.content)) for m in messages)
+            + (self.max_output_tokens or DEFAULT_OUTPUT_TOKEN_ESTIMATE)
+        )
+
+        def send():
+            # Request timeout = time left before the turn's deadline (if any)
+            deadline = current_llm_context().get("deadline")
+            if deadline is not None and "timeout" not in kwargs:
+                return parent_generate(messages, stop=stop, run_manager=run_manager,
+                                       timeout=max(deadline - time.time(), 0.1), **kwargs)
+            return parent_generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        result = llm_governor.call(send, estimated_tokens=estimated_tokens, count_tokens=_usage_tokens)
+
+        # Token counts on the enclosing `llm` span (see NodeLLM)
+        usage = [getattr(g.message, "usage_metadata", None) or {} for g in result.generations]
+        input_tokens = sum(u.get("input_tokens", 0) for u in usage)
+        output_tokens = sum(u.get("output_tokens", 0) for u in usage)
+        tracer.current_span().set(
+            estimated_tokens=estimated_tokens, input_tokens=input_tokens, output_tokens=output_tokens,
+        )
+
+        # Per-user accounting (estimated when the provider reports no usage)
+        if not any(usage):
+            input_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+            output_tokens = sum(estimate_tokens(str(g.message.content)) for g in result.generations)
+        context = current_llm_context()
+        if any(_finish_reason(g) == "MAX_TOKENS" for g in result.generations):
+            metrics.incr("llm.truncated", node=context.get("node") or "-")
+            tracer.current_span().set(truncated=True)
+            logger.warning("LLM reply truncated at max_output_tokens=%s (node=%s, model=%s, output_tokens=%s)",
+                           self.max_output_tokens, context.get("node"), self.model, output_tokens)
+        usage_ledger.record(context.get("user_id"), context.get("node"), self.model.split("/")[-1],
+                            input_tokens, output_tokens)
+        return result
+
+
+def get_llm(model_name: str = "gemini-2.5-flash", **settings):
     """
     Initialize and return a Google Generative AI (Gemini) model instance.
 
+    Calls made through the returned model are admitted, prioritized and retried
+    by the process-wide LLM governor, so the client's own retries are disabled.
+
     Args:
         model_name (str, optional): Model name to use. Defaults to "gemini-2.5-flash".
+        **settings: Extra model parameters (temperature, max_output_tokens, thinking_budget).
 
     Returns:
         ChatGoogleGenerativeAI: Initialized LLM instance for use across the project.
@@ -15,6 +109,161 @@ def get_llm(model_name: str = "gemini-2.5-flash"):
     load_dotenv()
 
     # Initialize the LLM with the specified model name
-    llm = ChatGoogleGenerativeAI(model=model_name)
+    llm = GovernedChatGoogleGenerativeAI(model=model_name, max_retries=1, **settings)
 
     return llm
+
+
+# Keys of a node's settings passed to the model (besides the tier / model name)
+MODEL_SETTING_KEYS = ("temperature", "max_output_tokens", "thinking_budget")
+
+# Accepted per-request override values: key → (type(s), lower bound, upper bound)
+OVERRIDE_LIMITS = {
+    "temperature": ((int, float), 0.0, 2.0),
+    "max_output_tokens": (int, 1, 65536),
+    "thinking_budget": (int, -1, 32768),
+}
+
+
+def validate_model_overrides(overrides) -> Optional[str]:
+    """
+    Check per-request model overrides ({node or "*": {setting: value}}) before use.
+
+    Returns:
+        str | None: What is wrong with `overrides`, or None if they are valid.
+    """
+    if not isinstance(overrides, dict):
+        return "model overrides must be a JSON object"
+    for node, settings in overrides.items():
+        if node != "*" and (node == "default" or node not in NODE_MODEL_CONFIG):
+            return f"unknown node '{node}'"
+        if not isinstance(settings, dict):
+            return f"settings of '{node}' must be an object"
+        for key, value in settings.items():
+            if key == "tier":
+                if value not in LLM_MODEL_TIERS:
+                    return f"{node}.tier must be one of {sorted(LLM_MODEL_TIERS)}"
+            elif key == "model":
+                if not isinstance(value, str) or not value:
+                    return f"{node}.model must be a model name"
+            elif key in OVERRIDE_LIMITS:
+                types, low, high = OVERRIDE_LIMITS[key]
+                if value is None and key == "thinking_budget":
+                    continue
+                if isinstance(value, bool) or not isinstance(value, types) or not low <= value <= high:
+                    return f"{node}.{key} must be a number between {low} and {high}"
+            else:
+                return f"unknown setting '{node}.{key}'"
+    return None
+
+
+_file_config = {"mtime": None, "data": {}}
+_file_config_lock = threading.Lock()
+
+
+def _load_file_config() -> dict:
+    """NODE_MODEL_CONFIG_PATH contents ({} if absent), re-read when the file changes."""
+    try:
+        mtime = os.path.getmtime(NODE_MODEL_CONFIG_PATH)
+    except OSError:
+        return {}
+    with _file_config_lock:
+        if _file_config["mtime"] != mtime:
+            with open(NODE_MODEL_CONFIG_PATH, encoding="utf-8") as f:
+                _file_config["data"] = json.load(f)
+            _file_config["mtime"] = mtime
+        return _file_config["data"]
+
+
+def node_model_settings(node: str) -> dict:
+    """
+    Resolve the model settings of a graph node.
+
+    Later sources override earlier ones, key by key:
+    1. NODE_MODEL_CONFIG["default"], then NODE_MODEL_CONFIG[node] (config.py);
+    2. the same entries of the JSON file at NODE_MODEL_CONFIG_PATH;
+    3. per-request overrides: `llm_context(model_overrides={"*": {...}, node: {...}})`.
+
+    A setting may name a `tier` (see LLM_MODEL_TIERS) or a `model` directly;
+    setting a key to None drops it (e.g. `thinking_budget` for a model that
+    always thinks).
+
+    Returns:
+        dict: {"model": ..., plus any of MODEL_SETTING_KEYS}.
+    """
+    file_config = _load_file_config()
+    file_nodes = file_config.get("nodes", {})
+    overrides = current_llm_context().get("model_overrides") or {}
+
+    settings = {}
+    for layer in (
+        NODE_MODEL_CONFIG.get("default"), NODE_MODEL_CONFIG.get(node),
+        file_nodes.get("default"), file_nodes.get(node),
+        overrides.get("*"), overrides.get(node),
+    ):
+        for key, value in (layer or {}).items():
+            # A tier set by a later layer replaces an explicit model from an earlier one
+            if key == "tier":
+                settings.pop("model", None)
+            settings[key] = value
+
+    tiers = {**LLM_MODEL_TIERS, **file_config.get("tiers", {})}
+    model = settings.get("model") or tiers[settings.get("tier", "standard")]
+    return {"model": model, **{k: settings[k] for k in MODEL_SETTING_KEYS if settings.get(k) is not None}}
+
+
+@lru_cache(maxsize=64)
+def _model_for(model: str, settings: tuple):
+    return get_llm(model, **dict(settings))
+
+
+class NodeLLM(RunnableLambda):
+    """
+    The LLM of one graph node, configured per call by `node_model_settings`.
+
+    Used like a chat model (`prompt | llm`, `llm.with_structured_output(...)`);
+    each invocation picks the node's current model, so config-file changes and
+    per-request overrides apply without re-importing the agents. Model clients
+    are shared between nodes with identical settings.
+    """
+
+    def __init__(self, node: str):
+        self.node = node
+        super().__init__(self._invoke, name=f"llm:{node}")
+
+    def model(self):
+        settings = node_model_settings(self.node)
+        model = settings.pop("model")
+        return _model_for(model, tuple(sorted(settings.items())))
+
+    def _invoke(self, value, config):
+        model = self.model()
+        model_name = model.model.split("/")[-1]
+        metrics.incr("llm.node_calls", node=self.node, model=model_name)
+        with tracer.span("llm", node=self.node, model=model_name), llm_context(node=self.node):
+            return model.invoke(value, config)
+
+    def with_structured_output(self, schema, **kwargs):
+        def invoke(value, config):
+            model = self.model()
+            model_name = model.model.split("/")[-1]
+            metrics.incr("llm.node_calls", node=self.node, model=model_name)
+            with tracer.span("llm", node=self.node, model=model_name, schema=getattr(schema, "__name__", None)), \
+                    llm_context(node=self.node):
+                return model.with_structured_output(schema, **kwargs).invoke(value, config)
+
+        return RunnableLambda(invoke, name=f"llm:{self.node}:{getattr(schema, '__name__', 'schema')}")
+
+
+def get_node_llm(node: str) -> NodeLLM:
+    """
+    Return the LLM for a graph node (model tier, temperature and output budget
+    from NODE_MODEL_CONFIG; see `node_model_settings`).
+
+    Args:
+        node (str): Node name, e.g. "router" or "resume_builder".
+
+    Returns:
+        NodeLLM: Chat-model-like runnable resolving its settings on each call.
+    """
+    return NodeLLM(node)
@@ -0,0 +1,374 @@
+import contextvars
+import itertools
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from config import (
+    LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_USER_REQUESTS_PER_MINUTE,
+    LLM_USER_TOKENS_PER_MINUTE,
+)
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "batch": 1, "background": 2}
+
+# Priority class and user attribution for LLM calls made in the current context.
+# LangGraph runs nodes with a copy of the caller's context, so setting it once
+# around `app.invoke()` covers every node.
+_llm_context: contextvars.ContextVar = contextvars.ContextVar("llm_context", default={})
+
+
+@contextmanager
+def llm_context(**values):
+    """
+    Attach call attributes (e.g. `priority="batch"`, `user_id=42`) to all LLM
+    calls made inside the block. Nested blocks override only the keys they set.
+    """
+    token = _llm_context.set({**_llm_context.get(), **values})
+    try:
+        yield
+    finally:
+        _llm_context.reset(token)
+
+
+def current_llm_context() -> dict:
+    """Return the call attributes active in the current context."""
+    return _llm_context.get()
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Return True for rate-limit, overload and timeout errors worth retrying."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if code in (429, 500, 502, 503, 504):
+        return True
+    text = f"{type(exc).__name__} {exc}"
+    return any(marker in text for marker in (
+        "429", "RESOURCE_EXHAUSTED", "ResourceExhausted", "503", "UNAVAILABLE",
+        "ServiceUnavailable", "DEADLINE_EXCEEDED", "Timeout", "timed out",
+    ))
+
+
+def _is_rate_limit(exc: Exception) -> bool:
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    text = f"{type(exc).__name__} {exc}"
+    return code == 429 or "429" in text or "RESOURCE_EXHAUSTED" in text or "ResourceExhausted" in text
+
+
+class GovernorTimeout(Exception):
+    """Raised when an LLM call could not be admitted within the caller's time limit."""
+
+
+class DeadlineExceeded(GovernorTimeout):
+    """Raised when the turn's deadline (see `llm_context(deadline=...)`) passes before an LLM call completes."""
+
+
+class CallCancelled(Exception):
+    """Raised instead of sending a request whose `cancel_event` (see `llm_context`) is set."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket. `rate` is units refilled per second, `capacity` the burst size.
+    The level may go negative when actual usage exceeds the estimate (debt is repaid by refill).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        if self.rate <= 0:
+            return
+        self._refill(now)
+        self.level -= amount
+
+    def is_full(self, now: float) -> bool:
+        """True if the bucket has refilled to capacity (indistinguishable from a new one)."""
+        return self.rate <= 0 or self.level + (now - self.updated) * self.rate >= self.capacity
+
+
+def _per_minute_bucket(per_minute: float) -> TokenBucket:
+    # Allow bursts of up to ~10 seconds' worth of budget
+    rate = per_minute / 60.0
+    return TokenBucket(rate=rate, capacity=max(rate * 10, 1.0))
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "user_id", "tokens", "granted", "enqueued")
+
+    def __init__(self, priority: int, seq: int, user_id, tokens: float):
+        self.priority = priority
+        self.seq = seq
+        self.user_id = user_id
+        self.tokens = tokens
+        self.granted = False
+        self.enqueued = time.monotonic()
+
+    def sort_key(self) -> tuple:
+        return self.priority, self.seq
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control for LLM calls.
+
+    - Caps concurrent in-flight calls.
+    - Enforces per-process and per-user token buckets on requests/minute and
+      estimated tokens/minute.
+    - Serves waiting calls in priority order (interactive → batch → background);
+      a waiter blocked only by its own user's bucket doesn't hold up others.
+    - Retries rate-limit/overload errors with full-jitter exponential backoff,
+      and pauses admissions for everyone after a provider 429.
+    - Publishes queue depth, in-flight count, wait times and retry counters
+      to the shared metrics registry.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        user_requests_per_minute: float = LLM_USER_REQUESTS_PER_MINUTE,
+        user_tokens_per_minute: float = LLM_USER_TOKENS_PER_MINUTE,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE_SECONDS,
+        backoff_max: float = LLM_BACKOFF_MAX_SECONDS,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._user_rpm = user_requests_per_minute
+        self._user_tpm = user_tokens_per_minute
+
+        self._requests = _per_minute_bucket(requests_per_minute)
+        self._tokens = _per_minute_bucket(tokens_per_minute)
+        # Least recently used first; idle users' buckets are evicted (see _user_bucket_pair)
+        self._user_buckets: "OrderedDict[object, tuple]" = OrderedDict()
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._cooldown_until = 0.0
+
+        metrics.register_gauge("llm.queue_depth", self.queue_depth)
+        metrics.register_gauge("llm.in_flight", lambda: self._in_flight)
+
+    def queue_depth(self) -> dict:
+        """Number of waiting calls per priority class."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITIES}
+            names = {v: k for k, v in PRIORITIES.items()}
+            for waiter in self._waiters:
+                depth[names[waiter.priority]] += 1
+            return depth
+
+    def _user_bucket_pair(self, user_id):
+        # Must be called with the lock held
+        pair = self._user_buckets.get(user_id)
+        if pair is None:
+            pair = (_per_minute_bucket(self._user_rpm), _per_minute_bucket(self._user_tpm))
+            self._user_buckets[user_id] = pair
+            # Drop least recently used buckets that have refilled: recreating them later is equivalent
+            now = time.monotonic()
+            while len(self._user_buckets) > 1:
+                oldest_id, oldest = next(iter(self._user_buckets.items()))
+                if not all(bucket.is_full(now) for bucket in oldest):
+                    break
+                del self._user_buckets[oldest_id]
+                metrics.incr("llm.user_buckets_evicted")
+        else:
+            self._user_buckets.move_to_end(user_id)
+        return pair
+
+    def _dispatch(self, now: float) -> float:
+        """
+        Grant as many waiters as limits allow, in priority order.
+        Must be called with the lock held. Returns seconds until the next grant
+        could become possible (None if only a release can unblock the queue).
+        """
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+
+        next_wake = None
+        for waiter in sorted(self._waiters, key=_Waiter.sort_key):
+            if self._in_flight >= self.max_concurrency:
+                return next_wake
+
+            global_wait = max(self._requests.time_until(1, now), self._tokens.time_until(waiter.tokens, now))
+            if global_wait > 0:
+                # Shared limits are exhausted for everyone; lower priorities must not jump ahead
+                return global_wait if next_wake is None else min(next_wake, global_wait)
+
+            if waiter.user_id is not None:
+                user_requests, user_tokens = self._user_bucket_pair(waiter.user_id)
+                user_wait = max(user_requests.time_until(1, now), user_tokens.time_until(waiter.tokens, now))
+                if user_wait > 0:
+                    next_wake = user_wait if next_wake is None else min(next_wake, user_wait)
+                    continue
+                user_requests.take(1, now)
+                user_tokens.take(waiter.tokens, now)
+
+            self._requests.take(1, now)
+            self._tokens.take(waiter.tokens, now)
+            self._in_flight += 1
+            waiter.granted = True
+            self._waiters.remove(waiter)
+            self._cond.notify_all()
+
+        return next_wake
+
+    def _acquire(self, tokens: float, priority: int, user_id, timeout: Optional[float]) -> float:
+        waiter = _Waiter(priority, next(self._seq), user_id, tokens)
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiters.append(waiter)
+            while True:
+                now = time.monotonic()
+                wake_in = self._dispatch(now)
+                if waiter.granted:
+                    return now - waiter.enqueued
+                if give_up_at is not None:
+                    if now >= give_up_at:
+                        self._waiters.remove(waiter)
+                        raise GovernorTimeout("LLM call was not admitted before its deadline.")
+                    wake_in = give_up_at - now if wake_in is None else min(wake_in, give_up_at - now)
+                self._cond.wait(timeout=wake_in)
+
+    def _release(self, user_id, estimated_tokens: float, actual_tokens: Optional[float]) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if actual_tokens is not None and actual_tokens != estimated_tokens:
+                # Settle the difference between the estimate and the real usage
+                now = time.monotonic()
+                self._tokens.take(actual_tokens - estimated_tokens, now)
+                if user_id is not None:
+                    self._user_bucket_pair(user_id)[1].take(actual_tokens - estimated_tokens, now)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int, rate_limited: bool) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if rate_limited:
+            with self._cond:
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        return delay
+
+    def call(
+        self,
+        fn: Callable[[], object],
+        estimated_tokens: float = 0,
+        count_tokens: Callable[[object], Optional[float]] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Run `fn` (one LLM request) under the governor.
+
+        Priority and user come from the active `llm_context` (default: interactive,
+        no per-user limit). If the context carries a `cancel_event` (a
+        threading.Event) that gets set, the request is not sent (`CallCancelled`).
+        If it carries a `deadline` (epoch seconds), admission waits and retries
+        stop at the deadline and `DeadlineExceeded` is raised instead.
+
+        Args:
+            fn: Zero-argument callable performing the request.
+            estimated_tokens: Expected input + output tokens, charged up front.
+            count_tokens: Optional callable returning the real token usage of a result,
+                used to correct the token buckets after the call.
+            timeout: Max seconds to wait for admission (None = wait indefinitely,
+                or until the context's deadline).
+
+        Returns:
+            Whatever `fn` returns.
+        """
+        context = current_llm_context()
+        priority_name = context.get("priority", "interactive")
+        priority = PRIORITIES.get(priority_name, PRIORITIES["interactive"])
+        user_id = context.get("user_id")
+        cancel_event = context.get("cancel_event")
+        deadline = context.get("deadline")
+        span = tracer.current_span()   # the caller's `llm` span, if traced
+
+        attempt = 0
+        total_wait = 0.0
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise CallCancelled("LLM call cancelled before it was sent.")
+            admit_timeout = timeout
+            if deadline is not None:
+                left = deadline - time.time()
+                if left <= 0:
+                    metrics.incr("llm.deadline_exceeded", priority=priority_name, stage="admission")
+                    raise DeadlineExceeded("Turn deadline passed before the LLM call was sent.")
+                admit_timeout = left if timeout is None else min(timeout, left)
+            try:
+                wait = self._acquire(estimated_tokens, priority, user_id, admit_timeout)
+            except GovernorTimeout:
+                if deadline is not None and deadline - time.time() <= 0:
+                    metrics.incr("llm.deadline_exceeded", priority=priority_name, stage="admission")
+                    raise DeadlineExceeded("Turn deadline passed while the LLM call was queued.")
+                raise
+            metrics.observe("llm.queue_wait_seconds", wait, priority=priority_name)
+            total_wait += wait
+            span.set(priority=priority_name, queue_wait=round(total_wait, 4), retries=attempt)
+
+            if cancel_event is not None and cancel_event.is_set():
+                # Cancelled while queued: give back the slot and the charged tokens
+                self._release(user_id, estimated_tokens, 0)
+                metrics.incr("llm.cancelled", priority=priority_name)
+                raise CallCancelled("LLM call cancelled before it was sent.")
+
+            actual_tokens = None
+            try:
+                result = fn()
+                if count_tokens is not None:
+                    actual_tokens = count_tokens(result)
+                metrics.incr("llm.calls", priority=priority_name)
+                return result
+            except Exception as e:
+                if deadline is not None and deadline - time.time() <= 0:
+                    # Request timed out at (or failed after) the deadline: no time for a retry
+                    metrics.incr("llm.deadline_exceeded", priority=priority_name, stage="request")
+                    raise DeadlineExceeded("Turn deadline passed during the LLM call.") from e
+                if attempt >= self.max_retries or not is_retryable(e):
+                    metrics.incr("llm.failures", priority=priority_name)
+                    raise
+                rate_limited = _is_rate_limit(e)
+                metrics.incr("llm.retries", reason="rate_limit" if rate_limited else "transient")
+                delay = self._backoff(attempt, rate_limited)
+                if deadline is not None:
+                    delay = min(delay, max(deadline - time.time(), 0))
+            finally:
+                self._release(user_id, estimated_tokens, actual_tokens)
+
+            attempt += 1
+            time.sleep(delay)
+
+
+# Shared governor for every LLM client in this process
+llm_governor = LLMGovernor()
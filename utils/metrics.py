@@ -0,0 +1,90 @@
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Dict
+
+import numpy as np
+
+
+def _key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={labels[k]}" for k in sorted(labels)) + "}"
+
+
+class Histogram:
+    """Keeps count/sum/max over all observations and percentiles over the most recent ones."""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(np.fromiter(self._recent, dtype=float), [50, 95, 99])
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4),
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "max": round(self.max, 4),
+        }
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry (counters, histograms and live gauges).
+
+    Metrics are per worker process; `snapshot()` is served as JSON by the
+    `/metrics` route.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Callable[[], object]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        """Add `value` to a counter."""
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation (e.g. a latency in seconds) in a histogram."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def register_gauge(self, name: str, fn: Callable[[], object]) -> None:
+        """Register a callable evaluated on every snapshot (e.g. current queue depth)."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        """Return all metrics as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: h.summary() for k, h in self._histograms.items()}
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+        }
+
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
@@ -0,0 +1,76 @@
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+from config import MINHASH_BANDS, MINHASH_PERMUTATIONS
+
+# Universal hashing h(x) = (a·x + b) mod p over 32-bit shingle hashes; a·x + b stays below 2^64
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1234)  # fixed seed: signatures must be stable across processes
+_A = _rng.randint(1, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """
+    Word n-grams of normalized text (lowercase, URLs and punctuation removed).
+
+    Links (which carry tracking parameters) and formatting differences therefore
+    don't change the shingle set; reordered paragraphs only change the few
+    shingles at paragraph boundaries.
+    """
+    words = WORD_PATTERN.findall(URL_PATTERN.sub(" ", (text or "").lower()))
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature of `text` (MINHASH_PERMUTATIONS uint32 values).
+
+    The share of equal positions between two signatures estimates the Jaccard
+    similarity of the texts' shingle sets.
+    """
+    grams = shingles(text)
+    if not grams:
+        return np.full(MINHASH_PERMUTATIONS, 0xFFFFFFFF, dtype=np.uint32)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+        dtype=np.uint64, count=len(grams),
+    )
+    permuted = (hashes[:, None] * _A[None, :] + _B[None, :]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def band_keys(signature: np.ndarray, bands: int = MINHASH_BANDS) -> List[str]:
+    """
+    LSH band keys of a signature: "<band>:<hash of the band's rows>".
+
+    Two texts share at least one key with high probability when their similarity
+    is above roughly (1 / bands) ** (1 / rows_per_band).
+    """
+    rows = len(signature) // bands
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(bands)
+    ]
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
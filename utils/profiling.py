@@ -0,0 +1,275 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+from config import (
+    ADMIN_EMAILS,
+    PROFILE_DIR,
+    PROFILE_MAX_DUMPS,
+    PROFILE_MODE,
+    PROFILE_SAMPLE_INTERVAL_SECONDS,
+    PROFILE_SAMPLE_RATE,
+)
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# Rows kept in the JSON summary of a dump
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+
+def is_admin(user_id: int) -> bool:
+    """True if the user's email is in ADMIN_EMAILS."""
+    if user_id is None or not ADMIN_EMAILS:
+        return False
+    from models import db, User
+    user = db.session.get(User, user_id)
+    return bool(user and user.email and user.email.lower() in ADMIN_EMAILS)
+
+
+class StackSampler:
+    """
+    Statistical profiler: a background thread records the stacks of all other
+    threads every `interval` seconds. Unlike cProfile it sees worker threads
+    (e.g. parallel graph nodes) and adds almost no overhead, but in a busy
+    process it also samples concurrent requests.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                # Idle threads (waiting in the stdlib) only add noise
+                if stack and not stack[0].startswith(("wait ", "_wait_for_tstate_lock", "select ", "accept ")):
+                    self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def top_functions(self, limit: int) -> List[dict]:
+        """Functions by self samples (leaf frames)."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [{"function": name, "samples": count} for name, count in leaves.most_common(limit)]
+
+
+class RequestProfiler:
+    """
+    Profiles individual web requests: CPU (cProfile or a stack sampler) plus
+    tracemalloc allocation deltas, saved under PROFILE_DIR by request id.
+
+    A request is profiled when an admin asks for it (`?profile=1` /
+    `?profile=sample`, or an `X-Profile` header) or, for everyone, at
+    `sample_rate` — which admins can change at runtime on /admin/profiles.
+    Each dump is a `.json` summary (timings, top functions, top allocations)
+    plus the raw `.prof` (pstats) or `.folded` (stack samples) file.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 mode: str = PROFILE_MODE, max_dumps: int = PROFILE_MAX_DUMPS):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.mode = mode if mode in PROFILE_MODES else "cprofile"
+        self.max_dumps = max_dumps
+        # cProfile and tracemalloc are process-wide: one profiled request at a time
+        self._lock = threading.Lock()
+
+    def requested_mode(self, flag: Optional[str], user_id: int) -> Optional[str]:
+        """Profiling mode for a request (None = don't profile)."""
+        if flag and flag != "0" and is_admin(user_id):
+            return flag if flag in PROFILE_MODES else self.mode
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    @contextmanager
+    def profile(self, endpoint: str, mode: str, user_id: int = None, request_id: str = None):
+        """
+        Profile the block; yields the request id of the dump. Skipped (yields
+        None) if another request is already being profiled.
+        """
+        if not self._lock.acquire(blocking=False):
+            metrics.incr("profiling.skipped", reason="busy")
+            yield None
+            return
+
+        request_id = request_id or uuid.uuid4().hex
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(10)
+        before = tracemalloc.take_snapshot()
+        profiler = cProfile.Profile() if mode == "cprofile" else StackSampler()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if mode == "cprofile":
+            profiler.enable()
+        else:
+            profiler.start()
+        error = None
+        try:
+            yield request_id
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if mode == "cprofile":
+                profiler.disable()
+            else:
+                profiler.stop()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            try:
+                self._save(request_id, endpoint, mode, user_id, wall, cpu, profiler, before, after, peak, error)
+                metrics.incr("profiling.dumps", endpoint=endpoint, mode=mode)
+            finally:
+                self._lock.release()
+
+    def _save(self, request_id, endpoint, mode, user_id, wall, cpu, profiler, before, after, peak, error) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, request_id)
+
+        if mode == "cprofile":
+            profiler.dump_stats(base + ".prof")
+            out = io.StringIO()
+            stats = pstats.Stats(profiler, stream=out).sort_stats("cumulative")
+            top = [
+                {"function": f"{func[2]} ({os.path.basename(func[0])}:{func[1]})", "calls": nc,
+                 "self_seconds": round(tt, 6), "cumulative_seconds": round(ct, 6)}
+                for func, (cc, nc, tt, ct, _) in sorted(stats.stats.items(), key=lambda item: -item[1][3])[:TOP_FUNCTIONS]
+            ]
+        else:
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in profiler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            top = profiler.top_functions(TOP_FUNCTIONS)
+
+        allocations = [
+            {"location": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+            for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+        ]
+        summary = {
+            "request_id": request_id,
+            "endpoint": endpoint,
+            "mode": mode,
+            "user_id": user_id,
+            "started": time.time() - wall,
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "peak_traced_mb": round(peak / 1024 / 1024, 2),
+            "error": error,
+            "top_functions": top,
+            "top_allocations": allocations,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        self._prune()
+
+    def _prune(self) -> None:
+        summaries = sorted(
+            (os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")),
+            key=os.path.getmtime,
+        )
+        for path in summaries[:max(len(summaries) - self.max_dumps, 0)]:
+            for ext in (".json", ".prof", ".folded"):
+                try:
+                    os.remove(path[:-5] + ext)
+                except OSError:
+                    pass
+
+    def list_dumps(self) -> List[dict]:
+        """Summaries of stored dumps, newest first (without the per-function rows)."""
+        if not os.path.isdir(self.directory):
+            return []
+        dumps = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                summary = self.load(name[:-5])
+                if summary:
+                    summary.pop("top_functions", None)
+                    summary.pop("top_allocations", None)
+                    dumps.append(summary)
+        return sorted(dumps, key=lambda d: d["started"], reverse=True)
+
+    def load(self, request_id: str) -> Optional[dict]:
+        """Full summary of one dump (None if unknown)."""
+        if not request_id.isalnum():
+            return None
+        try:
+            with open(os.path.join(self.directory, request_id + ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def raw_path(self, request_id: str) -> Optional[str]:
+        """Path of the raw `.prof` / `.folded` file of a dump."""
+        if not request_id.isalnum():
+            return None
+        for ext in (".prof", ".folded"):
+            path = os.path.join(self.directory, request_id + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+
+def profiled_request(endpoint: str):
+    """
+    Flask view decorator: profile POSTs to the view when requested by an admin
+    or sampled (see `RequestProfiler`). The dump id is the request's trace id
+    when the request is traced, so dumps and traces can be matched.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request, session
+            if request.method != "POST":
+                return view(*args, **kwargs)
+            user_id = session.get("user_id")
+            flag = request.args.get("profile") or request.headers.get("X-Profile")
+            mode = request_profiler.requested_mode(flag, user_id)
+            if mode is None:
+                return view(*args, **kwargs)
+            trace = getattr(tracer.current_span(), "trace", None)
+            with request_profiler.profile(endpoint, mode, user_id, trace.trace_id if trace else None):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Process-wide profiler (the sample rate set on the admin page applies to this worker)
+request_profiler = RequestProfiler()
@@ -0,0 +1,176 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from config import INTERVIEW_BEHAVIORAL_QUESTIONS, INTERVIEW_QUESTIONS_PER_SKILL
+from models import db, InterviewQuestion
+from utils.metrics import metrics
+from utils.skill_graph import get_skill_graph
+
+# Seniority words stripped from titles before they are used as bank keys
+SENIORITY_PATTERN = re.compile(
+    r"\b(senior|sr|junior|jr|lead|principal|staff|head|chief|associate|intern|trainee|"
+    r"entry[- ]level|mid[- ]level|graduate|fresher|i{1,3}|iv)\b\.?", re.I
+)
+ENTRY_PATTERN = re.compile(r"\b(intern|internship|trainee|entry|junior|jr|graduate|fresher|0-2)\b", re.I)
+SENIOR_PATTERN = re.compile(r"\b(senior|sr|lead|principal|staff|head|architect|manager)\b", re.I)
+MID_PATTERN = re.compile(r"\b(mid|intermediate)\b", re.I)
+YEARS_PATTERN = re.compile(r"(\d+)\s*\+?\s*(?:-\s*\d+\s*)?(?:years|yrs)", re.I)
+
+
+def _clean(text: str) -> str:
+    return " ".join(re.sub(r"[^\w+#./ -]", " ", (text or "").lower()).split())
+
+
+def normalize_role(title: str) -> str:
+    """
+    Bank key of a job title: the skill-graph role when one matches
+    ("Sr. Backend Developer" → "backend engineer"), otherwise the cleaned title
+    without seniority words.
+    """
+    role = get_skill_graph().find_role(title or "")
+    if role:
+        return role
+    return _clean(SENIORITY_PATTERN.sub(" ", title or ""))
+
+
+def normalize_level(*texts: str) -> str:
+    """Map an experience-level string and/or job title to entry / mid / senior (any if unknown)."""
+    text = " ".join(t for t in texts if t)
+    if ENTRY_PATTERN.search(text):
+        return "entry"
+    if SENIOR_PATTERN.search(text):
+        return "senior"
+    if MID_PATTERN.search(text):
+        return "mid"
+    years = YEARS_PATTERN.search(text)
+    if years:
+        years = int(years.group(1))
+        return "entry" if years < 2 else "mid" if years < 5 else "senior"
+    return "any"
+
+
+def normalize_skill_key(name: str) -> str:
+    """Bank key of a skill: the skill-graph key when known ("JS" → "javascript"), else the cleaned name."""
+    return get_skill_graph().skill_key(name or "") or _clean(name)
+
+
+def _question_hash(role_key: str, level_key: str, skill_key: str, question: str) -> str:
+    payload = "|".join([role_key, level_key, skill_key, _clean(question)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _rotate(rows: List[InterviewQuestion], count: int, offset: int) -> List[str]:
+    # Different users see different slices once a key holds more than `count` questions
+    if len(rows) <= count:
+        return [r.question for r in rows]
+    start = offset % len(rows)
+    return [rows[(start + i) % len(rows)].question for i in range(count)]
+
+
+def lookup_questions(role_key: str, level_key: str, skills: Iterable[str], user_id: int = 0) -> dict:
+    """
+    Fetch stored questions for a role, level and skill set.
+
+    Args:
+        role_key (str): Output of `normalize_role`.
+        level_key (str): Output of `normalize_level`.
+        skills (Iterable[str]): Free-text skill names (display names are kept in the result).
+        user_id (int): Used to rotate through large question pools.
+
+    Returns:
+        dict: `technical` ({skill: [questions]} for covered skills), `behavioral`
+        (list, empty if not enough are stored) and `missing_skills` (skills with
+        fewer than INTERVIEW_QUESTIONS_PER_SKILL stored questions).
+    """
+    skill_keys = {}
+    for skill in skills:
+        skill_keys.setdefault(normalize_skill_key(skill), skill)
+
+    rows = (
+        InterviewQuestion.query
+        .filter(
+            InterviewQuestion.role_key == role_key,
+            InterviewQuestion.level_key == level_key,
+            InterviewQuestion.skill_key.in_(list(skill_keys) + [""]),
+        )
+        .order_by(InterviewQuestion.id)
+        .all()
+    )
+    by_skill: Dict[str, List[InterviewQuestion]] = {}
+    for row in rows:
+        by_skill.setdefault(row.skill_key, []).append(row)
+
+    technical, missing = {}, []
+    for key, display in skill_keys.items():
+        pool = by_skill.get(key, [])
+        if len(pool) >= INTERVIEW_QUESTIONS_PER_SKILL:
+            technical[display] = _rotate(pool, INTERVIEW_QUESTIONS_PER_SKILL, user_id or 0)
+        else:
+            missing.append(display)
+
+    behavioral_pool = by_skill.get("", [])
+    behavioral = (
+        _rotate(behavioral_pool, INTERVIEW_BEHAVIORAL_QUESTIONS, user_id or 0)
+        if len(behavioral_pool) >= INTERVIEW_BEHAVIORAL_QUESTIONS else []
+    )
+
+    metrics.incr("question_bank.skills", len(technical), result="hit")
+    metrics.incr("question_bank.skills", len(missing), result="miss")
+    return {"technical": technical, "behavioral": behavioral, "missing_skills": missing}
+
+
+def store_questions(role_key: str, level_key: str, technical: Dict[str, List[str]],
+                    behavioral: List[str] = ()) -> int:
+    """
+    Add newly generated questions to the bank (duplicates are skipped).
+
+    Args:
+        technical (dict): {skill name: [questions]}.
+        behavioral (list): Behavioral questions for the role/level.
+
+    Returns:
+        int: Number of questions stored.
+    """
+    candidates = {}
+    for skill, questions in technical.items():
+        skill_key = normalize_skill_key(skill)
+        for question in questions:
+            candidates[_question_hash(role_key, level_key, skill_key, question)] = (skill_key, "technical", question)
+    for question in behavioral:
+        candidates[_question_hash(role_key, level_key, "", question)] = ("", "behavioral", question)
+    if not candidates:
+        return 0
+
+    existing = {
+        row.question_hash for row in
+        db.session.query(InterviewQuestion.question_hash)
+        .filter(InterviewQuestion.question_hash.in_(list(candidates)))
+    }
+    new = [
+        InterviewQuestion(role_key=role_key, level_key=level_key, skill_key=skill_key,
+                          kind=kind, question=question.strip(), question_hash=digest)
+        for digest, (skill_key, kind, question) in candidates.items()
+        if digest not in existing and question.strip()
+    ]
+    db.session.add_all(new)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request stored some of the same questions concurrently; keep theirs
+        db.session.rollback()
+        return 0
+    return len(new)
+
+
+def resolve_role_title(job_title: Optional[str], input_text: str, experience: List[dict]) -> Optional[str]:
+    """Pick the job title to prepare for: the JD title, a role named in the query, or the latest job title."""
+    if job_title:
+        return job_title
+    role = get_skill_graph().find_role(input_text or "")
+    if role:
+        return get_skill_graph().role_name(role)
+    titles = [e.get("title") for e in experience or [] if e.get("title")]
+    return titles[-1] if titles else None
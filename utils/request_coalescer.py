@@ -0,0 +1,208 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from config import CHAT_DEDUP_WINDOW_SECONDS, CHAT_IDEMPOTENCY_TTL_SECONDS, CHAT_PENDING_TIMEOUT_SECONDS
+from models import db, ChatRequest
+from utils.deadline import DEADLINE_FALLBACK_RESPONSE
+from utils.metrics import metrics
+
+
+def chat_request_key(user_id: int, conversation_id: str, message: str, upload_hash: Optional[str],
+                     history_position: int) -> str:
+    """
+    Build the deduplication key of a chat turn.
+
+    Two POSTs with the same user, conversation (a new one starts at each login),
+    message, uploaded file content and position in the chat history are the same
+    request (double-click, refresh resubmit, retry).
+    """
+    payload = json.dumps([user_id, conversation_id, message, upload_hash, history_position])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RequestCoalescer:
+    """
+    Runs each distinct chat request once and shares its result with duplicates.
+
+    - Duplicates arriving while the request runs in this process attach to the
+      running computation through a Future.
+    - Duplicates handled by another worker process see the `pending` row in the
+      `ChatRequest` table and poll it until the leader stores the response.
+    - Duplicates wait at most until their own turn deadline and then get the
+      deadline fallback reply; a claim older than CHAT_PENDING_TIMEOUT_SECONDS
+      (deadline plus a margin) belongs to a crashed worker and is taken over.
+    - Completed responses are kept so a retry carrying the same idempotency key
+      (or the same request key within the dedup window) gets the stored answer.
+    """
+
+    def __init__(
+        self,
+        dedup_window: int = CHAT_DEDUP_WINDOW_SECONDS,
+        idempotency_ttl: int = CHAT_IDEMPOTENCY_TTL_SECONDS,
+        pending_timeout: int = CHAT_PENDING_TIMEOUT_SECONDS,
+        poll_interval: float = 0.25,
+    ):
+        self.dedup_window = timedelta(seconds=dedup_window)
+        self.idempotency_ttl = timedelta(seconds=idempotency_ttl)
+        self.pending_timeout = timedelta(seconds=pending_timeout)
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._claims = 0
+
+    def run(self, request_key: str, user_id: int, compute: Callable[[], str],
+            idempotency_key: str = None, deadline: float = None) -> Tuple[str, bool]:
+        """
+        Return the response for a chat request, computing it at most once.
+
+        Args:
+            request_key (str): Key from `chat_request_key`.
+            user_id (int): Requesting user (stored responses are only returned to their owner).
+            compute (Callable[[], str]): Runs the full chat pipeline and returns the reply.
+            idempotency_key (str, optional): Client-supplied key of this form submission.
+            deadline (float, optional): Turn deadline (epoch seconds, see
+                utils/deadline.py); bounds the wait for a duplicate's leader.
+
+        Returns:
+            Tuple[str, bool]: The response, and whether it was shared with another
+            submission of the same request (in flight or stored) rather than
+            computed for this one.
+        """
+        stored = self._stored_response(request_key, user_id, idempotency_key)
+        if stored is not None:
+            metrics.incr("chat.coalesced", source="stored")
+            return stored, True
+
+        with self._lock:
+            future = self._in_flight.get(request_key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[request_key] = Future()
+
+        if not is_leader:
+            metrics.incr("chat.coalesced", source="in_flight")
+            try:
+                return future.result(timeout=self._time_left(deadline))[0], True
+            except FutureTimeout:
+                metrics.incr("chat.coalesced_timeout")
+                return DEADLINE_FALLBACK_RESPONSE, True
+
+        try:
+            response, coalesced = self._run_leader(request_key, user_id, compute, idempotency_key, deadline)
+            future.set_result((response, coalesced))
+            return response, coalesced
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(request_key, None)
+
+    def _stored_response(self, request_key: str, user_id: int, idempotency_key: str) -> Optional[str]:
+        now = datetime.utcnow()
+        if idempotency_key:
+            row = ChatRequest.query.filter_by(idempotency_key=idempotency_key, user_id=user_id, status="done").first()
+            if row and now - row.completed_at < self.idempotency_ttl:
+                return row.response
+
+        row = ChatRequest.query.filter_by(request_key=request_key, status="done").first()
+        if row and row.user_id == user_id and now - row.completed_at < self.dedup_window:
+            return row.response
+        return None
+
+    def _claim(self, request_key: str, user_id: int, idempotency_key: str) -> bool:
+        """Insert the `pending` marker for this request. False if another worker holds it."""
+        now = datetime.utcnow()
+        self._claims += 1
+        if self._claims % 100 == 0:
+            ChatRequest.query.filter(ChatRequest.created_at < now - self.idempotency_ttl).delete()
+            db.session.commit()
+
+        row = ChatRequest.query.filter_by(request_key=request_key).first()
+        if row is not None:
+            if row.status == "pending" and now - row.created_at < self.pending_timeout:
+                return False
+            # Expired response or abandoned claim: take the key over
+            db.session.delete(row)
+            db.session.commit()
+
+        try:
+            db.session.add(ChatRequest(
+                request_key=request_key, idempotency_key=idempotency_key,
+                user_id=user_id, status="pending",
+            ))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    @staticmethod
+    def _time_left(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(deadline - time.time(), 0.0)
+
+    def _wait_for(self, request_key: str, deadline: float = None) -> Optional[str]:
+        """
+        Poll a request claimed by another worker until it is done, the claim
+        expires or `deadline` passes; None if no response was stored.
+        """
+        wait = self.pending_timeout.total_seconds()
+        if deadline is not None:
+            wait = min(wait, self._time_left(deadline))
+        give_up_at = time.monotonic() + wait
+        while time.monotonic() < give_up_at:
+            time.sleep(self.poll_interval)
+            db.session.expire_all()
+            row = ChatRequest.query.filter_by(request_key=request_key).first()
+            if row is None:
+                return None
+            if row.status == "done":
+                return row.response
+        return None
+
+    def _run_leader(self, request_key: str, user_id: int, compute: Callable[[], str],
+                    idempotency_key: str, deadline: float = None) -> Tuple[str, bool]:
+        if not self._claim(request_key, user_id, idempotency_key):
+            response = self._wait_for(request_key, deadline)
+            if response is not None:
+                metrics.incr("chat.coalesced", source="other_worker")
+                return response, True
+            if deadline is not None and time.time() >= deadline:
+                # The other worker is still running the turn; a retry gets its stored answer
+                metrics.incr("chat.coalesced_timeout")
+                return DEADLINE_FALLBACK_RESPONSE, True
+
+        try:
+            response = compute()
+        except Exception:
+            # Drop the claim so a retry can run the request again
+            db.session.rollback()
+            ChatRequest.query.filter_by(request_key=request_key, status="pending").delete()
+            db.session.commit()
+            raise
+
+        row = ChatRequest.query.filter_by(request_key=request_key).first()
+        if row is None:
+            row = ChatRequest(request_key=request_key, user_id=user_id)
+            db.session.add(row)
+        row.idempotency_key = idempotency_key
+        row.status = "done"
+        row.response = response
+        row.completed_at = datetime.utcnow()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same request meanwhile; our response is just as valid
+            db.session.rollback()
+        return response, False
+
+
+# Shared coalescer for the /chat route
+chat_coalescer = RequestCoalescer()
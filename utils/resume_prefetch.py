@@ -0,0 +1,137 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+
+from config import RESUME_PREFETCH_TTL_SECONDS, RESUME_PREFETCH_WORKERS
+from utils.llm_governor import DeadlineExceeded, llm_context
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+
+class _Entry:
+    def __init__(self, future: Future, content_hash: Optional[str]):
+        self.future = future
+        self.content_hash = content_hash
+        self.created = time.monotonic()
+
+
+class ResumePrefetcher:
+    """
+    Extracts and parses uploaded resumes in the background, starting at upload.
+
+    `chat_page` submits the file as soon as it is saved, so text extraction and
+    the LLM parse overlap with the exit check, memory summary and routing.
+    `resume_parser` then takes the result (waiting for it if it is still
+    running) instead of parsing on the critical path.
+
+    - Uploads with the same content hash share one parse (resubmitted forms).
+    - Results are kept until taken or RESUME_PREFETCH_TTL_SECONDS old, since the
+      upload may only be needed on a later turn of the conversation.
+    - A failed parse is not cached; `resume_parser` falls back to parsing itself.
+    - The parse runs under the uploading turn's deadline, and `take` waits at
+      most until that deadline; a parse still running then stays cached for
+      the user's retry.
+    """
+
+    def __init__(self, max_workers: int = RESUME_PREFETCH_WORKERS, ttl: float = RESUME_PREFETCH_TTL_SECONDS):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-prefetch")
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        metrics.register_gauge("resume_prefetch.pending", lambda: sum(not e.future.done() for e in list(self._entries.values())))
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for path, entry in list(self._entries.items()):
+            if entry.created < cutoff and entry.future.done():
+                del self._entries[path]
+                metrics.incr("resume_prefetch.expired")
+
+    def submit(self, path: str, content_hash: str = None, user_id: int = None,
+               deadline: float = None, model_overrides: dict = None, economy: bool = False) -> Future:
+        """
+        Start extracting and parsing the resume at `path`.
+
+        Args:
+            path (str): Saved upload (PDF or DOCX).
+            content_hash (str, optional): Hash of the file content; an identical
+                upload already in the cache reuses its parse.
+            user_id (int, optional): Uploading user (LLM rate limits and accounting).
+            deadline (float, optional): Deadline of the uploading turn (epoch
+                seconds, see utils/deadline.py); bounds the parse's LLM calls.
+            model_overrides (dict, optional): Per-node model overrides of the turn
+                (including the economy overrides near the token quota).
+            economy (bool): The turn runs in economy mode (see utils/usage.py).
+
+        Returns:
+            Future: Resolves to the parsed `ResumeModel`.
+        """
+        with self._lock:
+            self._prune()
+            if content_hash:
+                for entry in self._entries.values():
+                    if entry.content_hash == content_hash and not (entry.future.done() and entry.future.exception()):
+                        self._entries[path] = _Entry(entry.future, content_hash)
+                        metrics.incr("resume_prefetch.shared")
+                        return entry.future
+
+            def run():
+                # Imported here: the parser agent imports this module
+                from agents.resume_parser_agent import parse_resume_text
+                from utils.extract_resume import extract_resume_text
+
+                with llm_context(priority="interactive", user_id=user_id, deadline=deadline,
+                                 model_overrides=model_overrides, economy=economy), \
+                        tracer.span("resume_prefetch", file=os.path.basename(path)):
+                    return parse_resume_text(extract_resume_text(path))
+
+            future = self._executor.submit(contextvars.copy_context().run, run)
+            self._entries[path] = _Entry(future, content_hash)
+        metrics.incr("resume_prefetch.started")
+        return future
+
+    def take(self, path: str, timeout: float = None):
+        """
+        Return the prefetched parse of `path`, waiting if it is still running.
+
+        Args:
+            path (str): Saved upload passed to `submit`.
+            timeout (float, optional): Seconds to wait at most (the turn's
+                `remaining()` time); None waits for the parse.
+
+        Returns:
+            ResumeModel | None: None if nothing was prefetched for `path` or the
+            background parse failed (the caller parses synchronously).
+
+        Raises:
+            DeadlineExceeded: The parse did not finish within `timeout`; it is
+                kept for the next turn.
+        """
+        with self._lock:
+            entry = self._entries.pop(path, None)
+        if entry is None:
+            return None
+
+        state = "ready" if entry.future.done() else "waited"
+        started = time.perf_counter()
+        try:
+            result = entry.future.result(timeout=None if timeout is None else max(timeout, 0))
+        except FutureTimeout:
+            with self._lock:
+                self._entries.setdefault(path, entry)
+            metrics.incr("resume_prefetch.timed_out")
+            raise DeadlineExceeded("Turn deadline passed while the resume was being parsed.")
+        except Exception:
+            metrics.incr("resume_prefetch.failed")
+            return None
+        metrics.incr("resume_prefetch.used", state=state)
+        tracer.current_span().set(prefetch=state)
+        metrics.observe("resume_prefetch.wait_seconds", time.perf_counter() - started)
+        return result
+
+
+# Process-wide prefetcher shared by the upload handler and the resume parser
+resume_prefetcher = ResumePrefetcher()
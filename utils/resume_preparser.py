@@ -0,0 +1,264 @@
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# Canonical section → headings that introduce it (compared lowercase, without trailing ':')
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about", "career summary"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies",
+               "skills & tools", "skills and tools", "technologies", "tech stack", "tools"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "employment", "internships", "internship", "experience & internships"],
+    "education": ["education", "academic background", "academics", "educational qualifications",
+                  "qualifications", "academic qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "certifications & achievements", "achievements",
+                       "awards", "licenses & certifications", "courses", "awards & achievements"],
+    "other": ["languages", "interests", "hobbies", "references", "publications", "volunteering",
+              "volunteer experience", "extracurricular activities", "declaration", "personal details"],
+}
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_PATTERN = re.compile(r"(?<!\w)\+?\(?\d[\d\s().-]{8,}\d(?!\w)")
+NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z.'-]*(?:\s+[A-Za-z][A-Za-z.'-]*){1,3}$")
+BULLET_PATTERN = re.compile(r"^[\s•·▪●◦*\-–>]+")
+# Words of title lines that look like names ("About The Role", "Job Description")
+NON_NAME_WORDS = {
+    "about", "role", "job", "position", "description", "overview", "company", "team", "opening",
+    "vacancy", "requirements", "responsibilities", "resume", "curriculum", "vitae", "cv", "cover",
+    "letter", "dear", "hiring", "manager", "apply", "application", "we", "our", "you", "your",
+}
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DATE = r"(?:(?P<{p}mon>jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-z]*\.?,?\s*|(?P<{p}num>\d{{1,2}})[/.-])?(?P<{p}year>(?:19|20)\d{{2}})"
+DATE_RANGE_PATTERN = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|till|until)\s*(?:(?P<present>present|current|now|today|till date|ongoing)|"
+    + _DATE.format(p="e") + ")",
+    re.I,
+)
+
+
+def _heading(line: str) -> Optional[str]:
+    """Canonical section name if `line` is a section heading, else None."""
+    text = BULLET_PATTERN.sub("", line).strip().rstrip(":").strip().lower()
+    text = re.sub(r"\s+", " ", text)
+    if not text or len(text) > 40:
+        return None
+    return _HEADING_LOOKUP.get(text)
+
+
+def split_sections(text: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Segment resume text by its section headings.
+
+    Returns:
+        tuple: (header text before the first heading, {section: text}). Repeated
+        sections (e.g. two "Projects" blocks) are concatenated.
+    """
+    header, sections, current = [], {}, None
+    for line in text.splitlines():
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        (sections[current] if current else header).append(line)
+    return "\n".join(header).strip(), {k: "\n".join(v).strip() for k, v in sections.items()}
+
+
+def extract_contact(text: str) -> Dict[str, str]:
+    """First email address and phone number found in `text` ('' if absent)."""
+    email = EMAIL_PATTERN.search(text)
+    phone = ""
+    for match in PHONE_PATTERN.finditer(text):
+        digits = re.sub(r"\D", "", match.group())
+        # Skip date ranges like "2019 - 2021 2022" and ids that are too short/long
+        if 10 <= len(digits) <= 15 and not DATE_RANGE_PATTERN.search(match.group()):
+            phone = match.group().strip()
+            break
+    return {"email": email.group() if email else "", "phone": phone}
+
+
+def guess_name(header: str) -> str:
+    """
+    The first header line that looks like a person's name (2–4 capitalized
+    words, letters only; title lines such as "About the role" are skipped).
+    """
+    for line in header.splitlines()[:5]:
+        line = line.strip()
+        if not line or not NAME_PATTERN.match(line) or _heading(line):
+            continue
+        words = line.split()
+        if not line.isupper() and not all(word[0].isupper() for word in words):
+            continue
+        if {word.lower().strip(".'-") for word in words} & NON_NAME_WORDS:
+            continue
+        return line.title() if line.isupper() else line
+    return ""
+
+
+def has_resume_evidence(fields: Dict[str, str], sections: Dict[str, str]) -> bool:
+    """
+    True if the text is clearly a resume: contact details plus an experience or
+    education section. Job descriptions and cover letters share the headings but
+    rarely both.
+    """
+    return bool(fields.get("email") or fields.get("phone")) and bool(
+        sections.get("experience") or sections.get("education")
+    )
+
+
+def _month_index(mon: Optional[str], num: Optional[str], year: str, end: bool) -> int:
+    month = _MONTHS.get(mon[:3].lower()) if mon else int(num) if num and 1 <= int(num) <= 12 else None
+    if month is None:
+        # Year only: a range "2019 - 2021" counts as two years
+        return int(year) * 12
+    return int(year) * 12 + (month if end else month - 1)
+
+
+def experience_years(text: str, today: date = None) -> Optional[float]:
+    """
+    Total years covered by the date ranges in an experience section.
+
+    Overlapping ranges (parallel jobs) are merged. Returns None if no range is found.
+    """
+    today = today or date.today()
+    spans = []
+    for m in DATE_RANGE_PATTERN.finditer(text):
+        start = _month_index(m.group("smon"), m.group("snum"), m.group("syear"), end=False)
+        if m.group("present"):
+            end = today.year * 12 + today.month
+        else:
+            end = _month_index(m.group("emon"), m.group("enum"), m.group("eyear"), end=True)
+        if end > start:
+            spans.append((start, end))
+    if not spans:
+        return None
+
+    months, current_start, current_end = 0, None, None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    months += current_end - current_start
+    return round(months / 12, 1)
+
+
+def split_list(text: str, max_item_words: int = 6) -> Optional[List[str]]:
+    """
+    Split a list-like section ("Python, SQL | Docker" or one item per bullet) into items.
+
+    Returns None when the section reads like prose (items too long), so the caller
+    can leave it to the LLM.
+    """
+    items = []
+    for line in text.splitlines():
+        line = BULLET_PATTERN.sub("", line).strip()
+        if not line:
+            continue
+        # "Languages: Python, Java" → "Python, Java"
+        if ":" in line and len(line.split(":", 1)[0].split()) <= 3:
+            line = line.split(":", 1)[1]
+        items.extend(p.strip(" .") for p in re.split(r"[,;|•·]", line) if p.strip(" ."))
+    if not items or any(len(item.split()) > max_item_words for item in items):
+        return None
+    return list(dict.fromkeys(items))
+
+
+def _entries(text: str, max_entry_words: int = 25) -> Optional[List[str]]:
+    """One entry per non-empty line for short bullet lists (e.g. certifications), else None."""
+    lines = [BULLET_PATTERN.sub("", line).strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    if not lines or any(len(line.split()) > max_entry_words for line in lines):
+        return None
+    return lines
+
+
+def preparse_resume(text: str) -> dict:
+    """
+    Deterministically extract what doesn't need an LLM from resume text.
+
+    Args:
+        text (str): Output of `extract_resume_text`.
+
+    Returns:
+        dict:
+            - `fields`: ResumeModel fields resolved locally (email, phone, and when
+              unambiguous name, summary, skills, certifications, total_experience_years).
+            - `pending`: ResumeModel fields still to be extracted by the LLM
+              (including `is_resume` without strong resume evidence, see
+              `has_resume_evidence`).
+            - `sections`: {section: text} needed for the pending fields.
+            - `structured`: False if no section headings were found (the caller
+              should parse the whole text instead).
+    """
+    header, sections = split_sections(text)
+    fields = extract_contact(text)
+    known_sections = [s for s in sections if s != "other"]
+    if not known_sections:
+        return {"fields": fields, "pending": [], "sections": {}, "structured": False}
+
+    pending, needed = [], {}
+    if has_resume_evidence(fields, sections):
+        fields["is_resume"] = True
+    else:
+        # Headings alone also match job descriptions and cover letters: let the LLM decide
+        pending.append("is_resume")
+        if header:
+            needed["header"] = header
+
+    name = guess_name(header)
+    if name:
+        fields["name"] = name
+    else:
+        pending.append("name")
+        if header:
+            needed["header"] = header
+
+    if sections.get("summary"):
+        fields["summary"] = " ".join(sections["summary"].split())
+    else:
+        pending.append("summary")
+
+    skills = split_list(sections.get("skills", "")) if sections.get("skills") else None
+    if skills is not None:
+        fields["skills"] = skills
+    else:
+        pending.append("skills")
+        if sections.get("skills"):
+            needed["skills"] = sections["skills"]
+
+    certifications = _entries(sections.get("certifications", "")) if sections.get("certifications") else []
+    if certifications is not None:
+        fields["certifications"] = certifications
+    else:
+        pending.append("certifications")
+        needed["certifications"] = sections["certifications"]
+
+    # Free-form entries are summarized by the LLM; absent sections are simply empty
+    for field in ("experience", "education", "projects"):
+        if sections.get(field):
+            pending.append(field)
+            needed[field] = sections[field]
+        else:
+            fields[field] = []
+
+    years = experience_years(sections.get("experience", ""))
+    if years is not None:
+        fields["total_experience_years"] = years
+    elif sections.get("experience"):
+        pending.append("total_experience_years")
+    else:
+        fields["total_experience_years"] = 0.0
+
+    # Summary and skills may need the whole picture when their own section is missing
+    if ("summary" in pending or "skills" in pending) and header and "header" not in needed:
+        needed["header"] = header
+
+    return {"fields": fields, "pending": pending, "sections": needed, "structured": True}
@@ -0,0 +1,182 @@
+import heapq
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+
+from config import SKILL_GRAPH_PATH
+
+
+def _normalize(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def _alias_pattern(aliases: Iterable[str]) -> re.Pattern:
+    # Longest aliases first so "machine learning engineer" wins over "machine learning"
+    alternatives = sorted({a for a in aliases if a}, key=len, reverse=True)
+    return re.compile(r"(?<![\w+#])(" + "|".join(re.escape(a) for a in alternatives) + r")(?![\w+#])")
+
+
+class SkillGraph:
+    """
+    Prerequisite graph of skills plus the skill sets required by target roles.
+
+    Data file format (see data/skill_graph.json):
+        {
+          "skills": {"<key>": {"name": str, "prerequisites": [<key>], "aliases": [str]}},
+          "roles":  {"<key>": {"name": str, "aliases": [str], "required_skills": [<key>]}}
+        }
+
+    Keys are lowercase; aliases map free-text skill names (profile rows, user
+    messages) onto keys. The prerequisite edges must form a DAG.
+    """
+
+    def __init__(self, data: dict):
+        self.skills: Dict[str, dict] = data.get("skills", {})
+        self.roles: Dict[str, dict] = data.get("roles", {})
+
+        self._skill_aliases: Dict[str, str] = {}
+        for key, skill in self.skills.items():
+            for alias in [key, skill.get("name", "")] + skill.get("aliases", []):
+                self._skill_aliases.setdefault(_normalize(alias), key)
+
+        self._role_aliases: Dict[str, str] = {}
+        for key, role in self.roles.items():
+            for alias in [key, role.get("name", "")] + role.get("aliases", []):
+                self._role_aliases.setdefault(_normalize(alias), key)
+        self._role_pattern = _alias_pattern(self._role_aliases)
+
+        # Depths are only known once the graph is validated as acyclic
+        self._depth: Dict[str, int] = {}
+        self._validate()
+        for key in self.skills:
+            self._compute_depth(key)
+
+    @classmethod
+    def load(cls, path: str = SKILL_GRAPH_PATH) -> "SkillGraph":
+        """Load a graph from a JSON data file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _validate(self) -> None:
+        """Reject unknown references and prerequisite cycles."""
+        for key, skill in self.skills.items():
+            for prereq in skill.get("prerequisites", []):
+                if prereq not in self.skills:
+                    raise ValueError(f"Skill '{key}' lists unknown prerequisite '{prereq}'.")
+        for key, role in self.roles.items():
+            for skill in role.get("required_skills", []):
+                if skill not in self.skills:
+                    raise ValueError(f"Role '{key}' requires unknown skill '{skill}'.")
+
+        if len(self.topological_order(self.skills)) != len(self.skills):
+            raise ValueError("Skill prerequisites contain a cycle.")
+
+    def _compute_depth(self, key: str) -> int:
+        """Length of the longest prerequisite chain below `key` (0 for foundational skills)."""
+        if key not in self._depth:
+            prereqs = self.skills[key].get("prerequisites", [])
+            self._depth[key] = 1 + max(map(self._compute_depth, prereqs)) if prereqs else 0
+        return self._depth[key]
+
+    def skill_key(self, name: str) -> Optional[str]:
+        """Map a free-text skill name onto a graph key (None if unknown)."""
+        return self._skill_aliases.get(_normalize(name))
+
+    def skill_name(self, key: str) -> str:
+        return self.skills[key].get("name", key)
+
+    def role_name(self, key: str) -> str:
+        return self.roles[key].get("name", key)
+
+    def find_role(self, text: str) -> Optional[str]:
+        """
+        Return the key of the first role mentioned in `text` (whole-word match on
+        names and aliases, longest alias wins), or None.
+        """
+        match = self._role_pattern.search(_normalize(text))
+        return self._role_aliases[match.group(1)] if match else None
+
+    def satisfied(self, known: Iterable[str]) -> Set[str]:
+        """
+        Graph keys covered by free-text `known` skill names, including everything
+        they transitively depend on (knowing Pandas implies knowing Python).
+        """
+        covered = set()
+        stack = [k for k in map(self.skill_key, known) if k]
+        while stack:
+            key = stack.pop()
+            if key not in covered:
+                covered.add(key)
+                stack.extend(self.skills[key].get("prerequisites", []))
+        return covered
+
+    def prerequisite_closure(self, targets: Iterable[str], satisfied: Set[str]) -> Set[str]:
+        """
+        Smallest set of skills to learn so every target is reachable: the missing
+        targets plus their transitive prerequisites, stopping at satisfied skills.
+        """
+        needed = set()
+        stack = [t for t in targets if t not in satisfied]
+        while stack:
+            key = stack.pop()
+            if key in needed or key in satisfied:
+                continue
+            needed.add(key)
+            stack.extend(self.skills[key].get("prerequisites", []))
+        return needed
+
+    def topological_order(self, keys: Iterable[str]) -> List[str]:
+        """
+        Order `keys` so every skill comes after its prerequisites (Kahn's algorithm).
+
+        Edges to skills outside `keys` are ignored. Ties are broken by prerequisite
+        depth, then key, so the order is deterministic.
+        """
+        keys = set(keys)
+        indegree = {k: 0 for k in keys}
+        dependents: Dict[str, List[str]] = {k: [] for k in keys}
+        for key in keys:
+            for prereq in self.skills[key].get("prerequisites", []):
+                if prereq in keys:
+                    indegree[key] += 1
+                    dependents[prereq].append(key)
+
+        ready = [(self._depth.get(k, 0), k) for k, d in indegree.items() if d == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, key = heapq.heappop(ready)
+            order.append(key)
+            for dependent in dependents[key]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(ready, (self._depth.get(dependent, 0), dependent))
+        return order
+
+    def plan_for_role(self, role: str, known: Iterable[str]) -> dict:
+        """
+        Build the ordered learning plan from a user's known skills to a role.
+
+        Args:
+            role (str): Role key (see `find_role`).
+            known (Iterable[str]): Free-text skill/certification names from the profile.
+
+        Returns:
+            dict: `target_role` (display name), `required_skills` (the role's skills
+            still missing) and `steps` (all skills to learn, prerequisites first).
+        """
+        required = self.roles[role].get("required_skills", [])
+        satisfied = self.satisfied(known)
+        steps = self.topological_order(self.prerequisite_closure(required, satisfied))
+        return {
+            "target_role": self.role_name(role),
+            "required_skills": [self.skill_name(k) for k in required if k not in satisfied],
+            "steps": [self.skill_name(k) for k in steps],
+        }
+
+
+@lru_cache(maxsize=1)
+def get_skill_graph() -> SkillGraph:
+    """Process-wide graph loaded from SKILL_GRAPH_PATH."""
+    return SkillGraph.load()
@@ -0,0 +1,171 @@
+import re
+from typing import Optional
+
+from flask import has_app_context
+
+# Whole-message small talk, by category. A message is small talk only if nothing
+# but these phrases (and FILLER_WORDS) is left — "hi, review my resume" is not.
+SMALL_TALK_PHRASES = {
+    "farewell": [
+        "bye", "bye bye", "goodbye", "good bye", "see you", "see ya", "see you later", "see you soon",
+        "cya", "later", "goodnight", "good night", "take care", "talk later", "talk to you later",
+        "exit", "quit", "i'm done", "im done", "i am done", "that's all", "thats all", "that is all",
+    ],
+    "thanks": [
+        "thanks", "thank you", "thank u", "thx", "ty", "tysm", "many thanks", "cheers",
+        "appreciate it", "much appreciated", "i appreciate it",
+    ],
+    "greeting": [
+        "hi", "hii", "hello", "hey", "heya", "hiya", "howdy", "yo", "greetings",
+        "good morning", "good afternoon", "good evening",
+        "how are you", "how are you doing", "how's it going", "hows it going", "what's up", "whats up", "sup",
+    ],
+    "acknowledgement": [
+        "ok", "okay", "k", "kk", "cool", "great", "nice", "awesome", "perfect", "alright", "all right",
+        "got it", "gotcha", "noted", "understood", "makes sense", "sounds good", "fair enough",
+    ],
+}
+
+# Words that may accompany small talk without making it a request
+FILLER_WORDS = {
+    "a", "again", "ai", "all", "and", "bot", "buddy", "careergraph", "dear", "everything", "for", "friend",
+    "help", "lot", "much", "now", "oh", "so", "that", "the", "then", "there", "this", "today", "very",
+    "well", "you", "your", "really", "guys",
+}
+
+# When a message mixes categories, the first one listed here wins ("ok thanks, bye" → farewell)
+CATEGORY_PRECEDENCE = ["farewell", "thanks", "greeting", "acknowledgement"]
+
+# Clearly non-career requests (answered with the general agent's refusal) ...
+OFF_TOPIC_PATTERN = re.compile(
+    r"\b(weather|forecast|rain(?:ing)?|horoscope|zodiac|recipes?|jokes?|riddles?|"
+    r"movies?|tv shows?|netflix|songs?|lyrics|poems?|football|soccer|cricket|nba|nfl|"
+    r"match scores?|who won|lottery|bitcoin price|stock price|what time is it|capital of|"
+    r"girlfriend|boyfriend|dating)\b",
+    re.I,
+)
+# ... unless the message also mentions something career-related (including
+# occupations in those fields: "how do I become a chef", "football coach salary")
+CAREER_PATTERN = re.compile(
+    r"\b(career|jobs?|resume|cv|interviews?|skills?|courses?|certifications?|learn(?:ing)?|projects?|"
+    r"roles?|salary|hiring|hire|internships?|portfolio|work(?:ing)?|company|companies|engineer\w*|"
+    r"develop\w*|analyst|scientist|roadmap|profile|linkedin|recruit\w*|"
+    r"becom(?:e|ing)|profession\w*|occupation|industry|employ\w*|freelanc\w*|apprentice\w*|"
+    r"degree|diploma|qualif\w*|train(?:ing|ee)?|stud(?:y|ying)|school|business|"
+    r"chefs?|cooks?|bakers?|coach\w*|players?|athletes?|referees?|trainers?|teachers?|actors?|"
+    r"directors?|producers?|writers?|journalists?|musicians?|singers?|composers?|designers?|"
+    r"artists?|photographers?|meteorologists?|traders?|broadcasters?|commentators?)\b",
+    re.I,
+)
+
+# A bot reply ending with a question or an offer expects an answer, so a bare
+# acknowledgement after it ("ok", "sounds good") is a reply for the agents
+OFFER_PATTERN = re.compile(
+    r"\?|\b(would you like|do you want|want me to|shall i|should i|let me know|if you'd like|"
+    r"if you want|i can also|i could also|happy to)\b",
+    re.I,
+)
+# Only the end of the reply is checked (where questions and offers are made)
+OFFER_TAIL_CHARS = 300
+
+# Longer messages are treated as real requests
+MAX_SMALL_TALK_WORDS = 8
+
+_PHRASE_PATTERNS = {
+    category: re.compile(
+        r"\b(" + "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)) + r")\b"
+    )
+    for category, phrases in SMALL_TALK_PHRASES.items()
+}
+
+RESPONSES = {
+    "greeting": (
+        "Hi{name}! 👋 I'm CareerGraph AI. I can analyze your skills, recommend courses and projects, "
+        "plan a learning path, build your resume, prepare you for interviews or match you with jobs. "
+        "What would you like to work on?"
+    ),
+    "farewell": "Goodbye 👋",
+    "thanks": "You're welcome{name}! 😊 Let me know if there's anything else I can help with in your career.",
+    "acknowledgement": "👍 Anything else you'd like to work on — skills, courses, projects, resume or interviews?",
+    "off_topic": (
+        "Sorry, I can only help with career-related topics. "
+        "Try asking about your skills, courses, projects, resume, interviews or job matches."
+    ),
+}
+
+# Our own canned replies end with a question but need no answer
+_CANNED_PATTERNS = [
+    re.compile(re.escape(reply).replace(re.escape("{name}"), r"(?: [^!]+)?"), re.S)
+    for reply in RESPONSES.values()
+]
+
+
+def _normalize(text: str) -> str:
+    text = (text or "").lower().replace("’", "'")
+    return " ".join(re.sub(r"[^a-z0-9' ]+", " ", text).split())
+
+
+def _is_canned(reply: str) -> bool:
+    return any(pattern.fullmatch(reply) for pattern in _CANNED_PATTERNS)
+
+
+def _expects_answer(previous_reply: Optional[str]) -> bool:
+    """True if the previous bot reply asked a question or made an offer."""
+    if not previous_reply:
+        return False
+    previous_reply = previous_reply.strip()
+    if _is_canned(previous_reply):
+        return False
+    # Memory truncates long replies (" …"); their end is unknown, so assume an offer
+    if previous_reply.endswith("…"):
+        return True
+    return bool(OFFER_PATTERN.search(previous_reply[-OFFER_TAIL_CHARS:]))
+
+
+def match_small_talk(text: str, previous_reply: str = None) -> Optional[str]:
+    """
+    Classify a message as small talk without an LLM.
+
+    Args:
+        text (str): The user's message.
+        previous_reply (str, optional): The bot's previous reply. A bare
+            acknowledgement answering its question or offer is not small talk.
+
+    Returns:
+        str | None: "greeting", "farewell", "thanks", "acknowledgement" or
+        "off_topic"; None if the message needs the agents.
+    """
+    normalized = _normalize(text)
+    if not normalized:
+        return None
+
+    if len(normalized.split()) <= MAX_SMALL_TALK_WORDS:
+        found = set()
+        remainder = normalized
+        for category in CATEGORY_PRECEDENCE:
+            remainder, count = _PHRASE_PATTERNS[category].subn(" ", remainder)
+            if count:
+                found.add(category)
+        if found and not (set(remainder.replace("'", " ").split()) - FILLER_WORDS):
+            category = next(category for category in CATEGORY_PRECEDENCE if category in found)
+            if category == "acknowledgement" and _expects_answer(previous_reply):
+                return None
+            return category
+
+    if OFF_TOPIC_PATTERN.search(text) and not CAREER_PATTERN.search(text):
+        return "off_topic"
+    return None
+
+
+def _first_name(user_id: int) -> str:
+    if user_id is None or not has_app_context():
+        return ""
+    from models import db, User
+    user = db.session.get(User, user_id)
+    return (user.name or "").split()[0] if user and user.name and user.name.strip() else ""
+
+
+def small_talk_response(category: str, user_id: int = None) -> str:
+    """Canned reply for a `match_small_talk` category (greetings and thanks use the user's first name)."""
+    name = _first_name(user_id) if category in ("greeting", "thanks") else ""
+    return RESPONSES[category].format(name=f" {name}" if name else "")
@@ -0,0 +1,184 @@
+import contextvars
+import copy
+import importlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from config import (
+    SPECULATION_CONFIDENCE_THRESHOLD,
+    SPECULATION_ENABLED,
+    SPECULATION_HISTORY,
+    SPECULATION_MAX_WASTED_PER_MINUTE,
+)
+from utils.llm_governor import TokenBucket, llm_context
+from utils.metrics import metrics
+
+# Agents that may run before the router has decided: no parsers needed and no
+# side effects (no DB writes or files), so a discarded run leaves nothing behind
+SPECULATIVE_AGENTS = {
+    "skill_analyzer": ("agents.skill_analyzer_agent", "skill_analyzer"),
+    "course_recommender": ("agents.course_recommender_agent", "course_recommender"),
+    "project_recommender": ("agents.project_recommender_agent", "project_recommender"),
+    "general": ("agents.general_agent", "general"),
+}
+
+# Cheap keyword predictor; covers every agent so an ambiguous message is detected
+AGENT_KEYWORDS = {
+    "course_recommender": re.compile(r"\b(courses?|certifications?|certificates?|moocs?|udemy|coursera)\b", re.I),
+    "project_recommender": re.compile(r"\b(projects?|portfolio)\b", re.I),
+    "skill_analyzer": re.compile(r"\b(skill gaps?|analy[sz]e my skills|my skills|strengths|weaknesses|upskill)\b", re.I),
+    "interview_coach": re.compile(r"\binterview", re.I),
+    "learning_path_advisor": re.compile(r"\b(roadmap|learning path|study plan)\b", re.I),
+    "resume_builder": re.compile(r"\b(resume|cv)\b", re.I),
+    "job_matcher": re.compile(r"\b(jobs? (?:fit|match)|which (?:jobs?|roles?|postings?))\b", re.I),
+}
+
+
+def keyword_agents(text: str) -> List[str]:
+    """Agents whose keywords appear in `text`, in order of first mention."""
+    positions = {}
+    for agent, pattern in AGENT_KEYWORDS.items():
+        match = pattern.search(text or "")
+        if match:
+            positions[agent] = match.start()
+    return sorted(positions, key=positions.get)
+
+
+def predict_agent(state: dict) -> Tuple[Optional[str], float]:
+    """
+    Guess the router's decision without an LLM call.
+
+    Signals:
+    - the last SPECULATION_HISTORY turns of this conversation all went to one agent;
+    - exactly one agent's keywords appear in the message.
+
+    Returns:
+        tuple: (agent name or None, confidence in [0, 1]).
+    """
+    text = state.get("input_text", "")
+    history = ((state.get("metadata") or {}).get("recent_agents") or [])[-SPECULATION_HISTORY:]
+    streak = history[-1] if len(history) == SPECULATION_HISTORY and len(set(history)) == 1 else None
+    keyword_hits = [agent for agent, pattern in AGENT_KEYWORDS.items() if pattern.search(text)]
+    keyword = keyword_hits[0] if len(keyword_hits) == 1 else None
+
+    if keyword and streak:
+        return (keyword, 0.95) if keyword == streak else (keyword, 0.6)
+    if keyword:
+        return keyword, 0.8
+    if streak and not keyword_hits:
+        return streak, 0.8
+    return None, 0.0
+
+
+class Speculation:
+    """A predicted agent running in the background while the router decides."""
+
+    def __init__(self, agent: str, future, cancel_event: threading.Event):
+        self.agent = agent
+        self.future = future
+        self.cancel_event = cancel_event
+        self.started = time.monotonic()
+
+
+class SpeculativeExecutor:
+    """
+    Runs the predicted agent concurrently with the router.
+
+    - Speculates only for SPECULATIVE_AGENTS, above the confidence threshold.
+    - Wrong guesses are cancelled: LLM calls not yet sent are dropped by the
+      governor (`cancel_event`), and the result of a running call is discarded.
+    - Wrong guesses draw from a wasted-call budget (SPECULATION_MAX_WASTED_PER_MINUTE);
+      when it is empty, speculation pauses until the budget refills.
+    - Publishes started/hit/miss/skipped counters and a hit-rate gauge.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = SPECULATION_ENABLED,
+        threshold: float = SPECULATION_CONFIDENCE_THRESHOLD,
+        max_wasted_per_minute: float = SPECULATION_MAX_WASTED_PER_MINUTE,
+        max_workers: int = 4,
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self._waste_budget = TokenBucket(rate=max_wasted_per_minute / 60.0, capacity=max(max_wasted_per_minute, 1.0))
+        self._budget_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculation")
+        self._hits = 0
+        self._misses = 0
+        metrics.register_gauge("speculation.hit_rate", self.hit_rate)
+
+    def hit_rate(self) -> Optional[float]:
+        total = self._hits + self._misses
+        return round(self._hits / total, 3) if total else None
+
+    def start(self, state: dict) -> Optional[Speculation]:
+        """Start the predicted agent on a copy of `state`, or return None if not worth it."""
+        if not self.enabled:
+            return None
+        agent, confidence = predict_agent(state)
+        if agent not in SPECULATIVE_AGENTS or confidence < self.threshold:
+            metrics.incr("speculation.skipped", reason="low_confidence")
+            return None
+        with self._budget_lock:
+            if self._waste_budget.time_until(1, time.monotonic()) > 0:
+                metrics.incr("speculation.skipped", reason="budget")
+                return None
+
+        module_name, func_name = SPECULATIVE_AGENTS[agent]
+        agent_fn = getattr(importlib.import_module(module_name), func_name)
+        cancel_event = threading.Event()
+        flask_app = current_app._get_current_object() if has_app_context() else None
+        snapshot = copy.deepcopy(state)
+
+        def run():
+            # Same LLM priority/user as the turn, plus the cancellation flag
+            with llm_context(cancel_event=cancel_event, speculative=True):
+                if flask_app is None:
+                    return agent_fn(snapshot)
+                with flask_app.app_context():
+                    return agent_fn(snapshot)
+
+        future = self._executor.submit(contextvars.copy_context().run, run)
+        metrics.incr("speculation.started", agent=agent)
+        return Speculation(agent, future, cancel_event)
+
+    def resolve(self, speculation: Optional[Speculation], routed_agents: Iterable[str]) -> Optional[dict]:
+        """
+        Settle a speculation against the router's decision (a hit if the
+        predicted agent is among the routed ones).
+
+        Returns:
+            dict | None: The agent's output state on a hit, else None (the caller
+            runs the routed agent normally).
+        """
+        if speculation is None:
+            return None
+
+        routed_agents = list(routed_agents or [])
+        if speculation.agent in routed_agents:
+            try:
+                result = speculation.future.result()
+            except Exception:
+                metrics.incr("speculation.failed", agent=speculation.agent)
+                return None
+            self._hits += 1
+            metrics.incr("speculation.hit", agent=speculation.agent)
+            return result
+
+        speculation.cancel_event.set()
+        speculation.future.cancel()
+        self._misses += 1
+        metrics.incr("speculation.miss", predicted=speculation.agent, routed=",".join(routed_agents) or "none")
+        with self._budget_lock:
+            self._waste_budget.take(1, time.monotonic())
+        return None
+
+
+# Shared executor used by the router node
+speculative_executor = SpeculativeExecutor()
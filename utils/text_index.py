@@ -0,0 +1,141 @@
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Word-ish tokens; keeps things like "c++", "c#", "node.js" and "ci/cd" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+# Small English stopword list — enough to keep chat filler out of the index
+STOPWORDS = frozenset("""
+a about all also an and any are as at be but by can could do does for from had has have he her him his how i
+if in into is it its just me my no not of on or our please she so some than that the their
+them then there these they this to up us was we were what when where which who why will
+with would you your yours i'm it's can't don't
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase and split text into index terms, dropping stopwords.
+
+    Args:
+        text (str): Raw text.
+
+    Returns:
+        List[str]: Index terms in order of appearance.
+    """
+    if not text:
+        return []
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Append-only Okapi BM25 index with NumPy scoring.
+
+    Documents are identified by their insertion position. Postings are kept per
+    term and materialized as NumPy arrays on first use after a change, so a query
+    costs one vectorized scatter-add per query term regardless of corpus size.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._vocab: Dict[str, int] = {}
+        self._postings: List[Tuple[List[int], List[int]]] = []
+        self._arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_len: List[int] = []
+        self._doc_len_array = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, text: str) -> int:
+        """
+        Index a document and return its position.
+
+        Args:
+            text (str): Document text.
+
+        Returns:
+            int: Document position (0-based insertion order).
+        """
+        doc_id = len(self._doc_len)
+        terms = Counter(tokenize(text))
+
+        for term, tf in terms.items():
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                term_id = len(self._postings)
+                self._vocab[term] = term_id
+                self._postings.append(([], []))
+            docs, tfs = self._postings[term_id]
+            docs.append(doc_id)
+            tfs.append(tf)
+            self._arrays.pop(term_id, None)
+
+        self._doc_len.append(sum(terms.values()))
+        return doc_id
+
+    def _term_arrays(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term_id)
+        if arrays is None:
+            docs, tfs = self._postings[term_id]
+            arrays = (np.asarray(docs, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+            self._arrays[term_id] = arrays
+        return arrays
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Compute BM25 scores of every indexed document for a query.
+
+        Args:
+            query (str): Query text.
+
+        Returns:
+            np.ndarray: Float32 array of shape (len(self),).
+        """
+        n_docs = len(self._doc_len)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        if n_docs == 0:
+            return scores
+
+        if len(self._doc_len_array) != n_docs:
+            self._doc_len_array = np.asarray(self._doc_len, dtype=np.float32)
+        doc_len = self._doc_len_array
+        avg_len = max(float(doc_len.mean()), 1.0)
+
+        for term in set(tokenize(query)):
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                continue
+            docs, tfs = self._term_arrays(term_id)
+            df = len(docs)
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            norm = tfs + self.k1 * (1.0 - self.b + self.b * doc_len[docs] / avg_len)
+            scores[docs] += idf * tfs * (self.k1 + 1.0) / norm
+
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Return the best-matching documents for a query.
+
+        Args:
+            query (str): Query text.
+            top_k (int): Maximum number of results.
+
+        Returns:
+            List[Tuple[int, float]]: (document position, score) pairs, best first,
+            excluding documents that share no terms with the query.
+        """
+        scores = self.scores(query)
+        if top_k <= 0 or not scores.any():
+            return []
+
+        top_k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ranked if scores[i] > 0]
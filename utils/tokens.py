@@ -0,0 +1,23 @@
+import math
+
+# Average number of characters per token for English text on Gemini/GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a piece of text.
+
+    This is a fast, dependency-free approximation (~4 characters per token)
+    used for prompt budgeting; it is not meant to match the provider's
+    billing counts exactly.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Approximate token count (0 for empty text).
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -0,0 +1,215 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Callable, List, Optional
+
+from config import TRACE_BACKUP_COUNT, TRACE_FILE, TRACE_MAX_BYTES, TRACING_ENABLED
+
+
+class Span:
+    """One timed operation of a trace; `attributes` holds JSON-serializable details."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "duration", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned outside a trace (or with tracing disabled) so callers needn't check."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+class Trace:
+    """All spans of one request; written as a single JSONL record when the root span ends."""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            # Background work outliving the request (e.g. a prefetch) is not recorded
+            if not self.closed:
+                self.spans.append(span)
+
+
+# Innermost open span of the current context (copied into worker threads
+# by LangGraph and by executors that run tasks via `contextvars.copy_context()`)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """
+    Span-based request tracing.
+
+    `trace(...)` opens the root span of a request; `span(...)` opens a child of
+    the innermost open span and is a no-op outside a trace, so library code can
+    be instrumented unconditionally. Finished traces are appended to a rotating
+    JSONL file (one line per trace, TRACE_MAX_BYTES × TRACE_BACKUP_COUNT).
+    Render them with `trace_viewer.py`.
+    """
+
+    def __init__(self, path: str = TRACE_FILE, enabled: bool = TRACING_ENABLED,
+                 max_bytes: int = TRACE_MAX_BYTES, backup_count: int = TRACE_BACKUP_COUNT):
+        self.path = path
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._logger = None
+        self._logger_lock = threading.Lock()
+
+    def _writer(self) -> logging.Logger:
+        with self._logger_lock:
+            if self._logger is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                handler = RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger(f"careergraph.traces.{id(self)}")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self._logger = logger
+            return self._logger
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """Open the root span of a new trace (nested calls just open a child span)."""
+        if not self.enabled or _current_span.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = Trace()
+        root = Span(trace, name, None, attributes)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            root.duration = time.time() - root.start
+            trace.add(root)
+            with trace._lock:
+                trace.closed = True
+                spans = list(trace.spans)
+            self._write(trace, root, spans)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Open a child span of the current span (no-op outside a trace)."""
+        parent = _current_span.get()
+        if parent is None:
+            yield _NOOP
+            return
+
+        span = Span(parent.trace, name, parent.span_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration = time.time() - span.start
+            parent.trace.add(span)
+
+    def current_span(self):
+        """The innermost open span (a no-op span outside a trace)."""
+        return _current_span.get() or _NOOP
+
+    def traced(self, name: str = None, **attributes) -> Callable:
+        """Decorator: run the function inside `span(name or function name)`."""
+        def decorator(fn):
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attributes):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _write(self, trace: Trace, root: Span, spans: List[Span]) -> None:
+        record = {
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "start": round(root.start, 6),
+            "duration": round(root.duration, 6),
+            "attributes": root.attributes,
+            "error": root.error,
+            "spans": [s.to_dict() for s in sorted(spans, key=lambda s: s.start)],
+        }
+        try:
+            self._writer().info(json.dumps(record, default=str))
+        except OSError:
+            # Tracing must never break a request
+            pass
+
+
+def traced_node(fn: Callable) -> Callable:
+    """Wrap a LangGraph node function in a `node:<name>` span."""
+    @functools.wraps(fn)
+    def wrapper(state):
+        # Parallel workers are told apart by the agent they run
+        attributes = {"agent": state.get("agent_action")} if fn.__name__ == "intent_worker" else {}
+        with tracer.span(f"node:{fn.__name__}", **attributes):
+            return fn(state)
+    return wrapper
+
+
+def traced_request(name: str) -> Callable:
+    """Flask view decorator: trace each POST to the view as a root span."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request, session
+            if request.method != "POST":
+                return view(*args, **kwargs)
+            with tracer.trace(name, path=request.path, user_id=session.get("user_id")):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Process-wide tracer
+tracer = Tracer()
@@ -0,0 +1,151 @@
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import has_app_context
+from sqlalchemy import func
+
+from config import QUOTA_ECONOMY_MODEL_OVERRIDES, QUOTA_ECONOMY_THRESHOLD, USER_DAILY_TOKEN_QUOTA
+from models import db, TokenUsage, User
+from utils.metrics import metrics
+
+# Reply when a user has used up today's token quota (no LLM calls are made)
+QUOTA_EXCEEDED_RESPONSE = (
+    "You've reached today's usage limit for AI responses 🙏. "
+    "It resets at midnight UTC — see you then!"
+)
+
+QUOTA_OK = "ok"
+QUOTA_ECONOMY = "economy"
+QUOTA_EXCEEDED = "exceeded"
+
+
+def economy_overrides(model_overrides: dict = None) -> dict:
+    """Model overrides of an economy-mode turn: QUOTA_ECONOMY_MODEL_OVERRIDES under `model_overrides`."""
+    return {**QUOTA_ECONOMY_MODEL_OVERRIDES, **(model_overrides or {})}
+
+
+def _today():
+    return datetime.utcnow().date()
+
+
+class UsageLedger:
+    """
+    Per-user LLM token accounting.
+
+    Every governed LLM call is recorded in memory (user from `llm_context`,
+    node, model, input/output tokens) and flushed at the end of the chat turn
+    or batch chunk into the daily `TokenUsage` rollup. Quota checks add the
+    calls not yet flushed to the stored totals.
+    """
+
+    def __init__(self, daily_quota: int = USER_DAILY_TOKEN_QUOTA,
+                 economy_threshold: float = QUOTA_ECONOMY_THRESHOLD):
+        self.daily_quota = daily_quota
+        self.economy_threshold = economy_threshold
+        self._lock = threading.Lock()
+        # (user_id, day, node, model) → [input tokens, output tokens, calls]
+        self._pending: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def record(self, user_id: Optional[int], node: Optional[str], model: str,
+               input_tokens: int, output_tokens: int) -> None:
+        """Add one LLM call to the pending usage."""
+        with self._lock:
+            entry = self._pending[(user_id, _today(), node, model)]
+            entry[0] += input_tokens
+            entry[1] += output_tokens
+            entry[2] += 1
+        metrics.incr("usage.tokens", input_tokens, direction="input", node=node or "-")
+        metrics.incr("usage.tokens", output_tokens, direction="output", node=node or "-")
+
+    def flush(self) -> int:
+        """
+        Write the pending usage into `TokenUsage` (needs an app context; without
+        one the usage stays pending). Returns the number of rows updated.
+        """
+        if not has_app_context():
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: [0, 0, 0])
+        if not pending:
+            return 0
+
+        try:
+            for (user_id, day, node, model), (input_tokens, output_tokens, calls) in pending.items():
+                row = TokenUsage.query.filter_by(user_id=user_id, day=day, node=node, model=model).first()
+                if row is None:
+                    row = TokenUsage(user_id=user_id, day=day, node=node, model=model,
+                                     input_tokens=0, output_tokens=0, calls=0)
+                    db.session.add(row)
+                row.input_tokens += input_tokens
+                row.output_tokens += output_tokens
+                row.calls += calls
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Keep the usage for the next flush
+            with self._lock:
+                for key, (input_tokens, output_tokens, calls) in pending.items():
+                    entry = self._pending[key]
+                    entry[0] += input_tokens
+                    entry[1] += output_tokens
+                    entry[2] += calls
+            metrics.incr("usage.flush_failed")
+            return 0
+        return len(pending)
+
+    def used_today(self, user_id: int) -> int:
+        """Input + output tokens of the user today (stored + pending)."""
+        today = _today()
+        with self._lock:
+            pending = sum(v[0] + v[1] for (uid, day, _, _), v in self._pending.items()
+                          if uid == user_id and day == today)
+        stored = db.session.query(
+            func.coalesce(func.sum(TokenUsage.input_tokens + TokenUsage.output_tokens), 0)
+        ).filter(TokenUsage.user_id == user_id, TokenUsage.day == today).scalar()
+        return int(stored) + pending
+
+    def quota_status(self, user_id: Optional[int]) -> Tuple[str, int]:
+        """
+        Return (status, tokens used today) for the user: QUOTA_OK, QUOTA_ECONOMY
+        (at least `economy_threshold` of the quota used) or QUOTA_EXCEEDED.
+        """
+        if not self.daily_quota or user_id is None:
+            return QUOTA_OK, 0
+        used = self.used_today(user_id)
+        if used >= self.daily_quota:
+            status = QUOTA_EXCEEDED
+        elif used >= self.daily_quota * self.economy_threshold:
+            status = QUOTA_ECONOMY
+        else:
+            status = QUOTA_OK
+        metrics.incr("quota.status", status=status)
+        return status, used
+
+    def top_users(self, days: int = 1, limit: int = 20) -> List[dict]:
+        """Heaviest users over the last `days` days (UTC), with a per-node breakdown."""
+        since = _today() - timedelta(days=days - 1)
+        rows = (
+            db.session.query(TokenUsage.user_id, User.email, TokenUsage.node,
+                             func.sum(TokenUsage.input_tokens), func.sum(TokenUsage.output_tokens),
+                             func.sum(TokenUsage.calls))
+            .outerjoin(User, User.id == TokenUsage.user_id)
+            .filter(TokenUsage.day >= since)
+            .group_by(TokenUsage.user_id, User.email, TokenUsage.node)
+            .all()
+        )
+        users = {}
+        for user_id, email, node, input_tokens, output_tokens, calls in rows:
+            user = users.setdefault(user_id, {"user_id": user_id, "email": email, "input_tokens": 0,
+                                              "output_tokens": 0, "calls": 0, "nodes": {}})
+            user["input_tokens"] += input_tokens
+            user["output_tokens"] += output_tokens
+            user["calls"] += calls
+            user["nodes"][node or "-"] = input_tokens + output_tokens
+        ranked = sorted(users.values(), key=lambda u: u["input_tokens"] + u["output_tokens"], reverse=True)
+        return ranked[:limit]
+
+
+# Shared by the chat app, the LLM wrapper and the offline runners
+usage_ledger = UsageLedger()